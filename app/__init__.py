@@ -2,12 +2,17 @@ import logging
 from flask import Flask
 from flask_restx import Api
 from flask_cors import CORS
-from app.extensions import bcrypt, jwt, db
+from app.extensions import jwt, db, response_cache, password_hasher, entity_cache, replica_router, \
+    request_profiler, amenity_index
 from app.api.v1.users import api as users_ns
 from app.api.v1.amenities import api as amenities_ns
 from app.api.v1.places import api as places_ns
 from app.api.v1.reviews import api as reviews_ns
 from app.api.v1.auth import api as auth_ns
+from app.api.v1.admin import api as admin_ns
+from app.commands import rebuild_search_index_command, recompute_ratings_command
+from app.persistence.pool import engine_options
+from app.encoding import output_json
 
 
 # Disable SQLAlchemy logging
@@ -19,17 +24,24 @@ def create_app(config_class="config.DevelopmentConfig"):
     app = Flask(__name__)
     app.config.from_object(config_class)
     app.config['SQLALCHEMY_ECHO'] = False
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config)
 
     # Initialize extensions
-    bcrypt.init_app(app)
+    password_hasher.init_app(app)
     jwt.init_app(app)
     db.init_app(app)
+    response_cache.init_app(app)
+    entity_cache.init_app(app)
+    amenity_index.init_app(app)
+    replica_router.init_app(app)
+    request_profiler.init_app(app)
 
     # Enable CORS for frontend
     CORS(app, resources={r"/api/*": {"origins": "*"}}, supports_credentials=True)
     
     # Create API instance
     api = Api(app, version='1.0', title='HBnB API', description='HBnB Application API', doc='/api/v1/docs')
+    api.representation('application/json')(output_json)
 
     # Register namespaces
     api.add_namespace(users_ns, path='/api/v1/users')
@@ -37,5 +49,10 @@ def create_app(config_class="config.DevelopmentConfig"):
     api.add_namespace(places_ns, path='/api/v1/places')
     api.add_namespace(reviews_ns, path='/api/v1/reviews')
     api.add_namespace(auth_ns, path='/api/v1/auth')
+    api.add_namespace(admin_ns, path='/api/v1/admin')
+
+    # Register maintenance commands (flask <command>)
+    app.cli.add_command(recompute_ratings_command)
+    app.cli.add_command(rebuild_search_index_command)
 
     return app
@@ -0,0 +1,96 @@
+import json
+from flask import current_app, request
+from flask_restx import Namespace, Resource
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from app.services import facade
+from app.extensions import db, entity_cache
+from app.persistence.pool import pool_metrics
+
+api = Namespace('admin', description='Administration operations')
+
+# Content types read one JSON record per line
+NDJSON_MIMETYPES = ('application/x-ndjson', 'application/jsonl')
+
+
+def read_records():
+    """Return the (index, record) pairs of a JSON array or NDJSON request body
+
+    NDJSON is read line by line from the request stream, so large uploads
+    are never parsed in one piece; the index of a record is its line number
+    starting at 0. A line that is not valid JSON is passed on as a
+    ValueError and reported as a failed record.
+    """
+    if request.mimetype in NDJSON_MIMETYPES:
+        def ndjson_records():
+            for index, line in enumerate(request.stream):
+                if not line.strip():
+                    continue
+                try:
+                    yield index, json.loads(line)
+                except ValueError:
+                    yield index, ValueError("Invalid JSON")
+        return ndjson_records()
+
+    records = request.get_json(silent=True)
+    if not isinstance(records, list):
+        raise ValueError("Body must be a JSON array, or NDJSON sent as application/x-ndjson")
+    return enumerate(records)
+
+
+@api.route('/import/<kind>')
+@api.param('kind', 'Type of records to import: amenities, places or reviews')
+class BulkImportResource(Resource):
+    @api.response(200, 'Import finished, see imported, failed and errors')
+    @api.response(400, 'Invalid import kind or body')
+    @api.response(401, 'Unauthorized')
+    @api.response(403, 'Admin privileges required')
+    @jwt_required()
+    def post(self, kind):
+        """Import amenities, places or reviews from a JSON array or NDJSON body (Admin only)"""
+        claims = get_jwt()
+        if not claims.get('is_admin', False):
+            return {'error': 'Admin privileges required'}, 403
+
+        try:
+            report = facade.bulk_import(
+                kind,
+                read_records(),
+                default_owner_id=get_jwt_identity(),
+                batch_size=current_app.config['BULK_IMPORT_BATCH_SIZE'],
+                max_errors=current_app.config['BULK_IMPORT_MAX_ERRORS']
+            )
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return report, 200
+
+
+@api.route('/entity-cache')
+class EntityCacheResource(Resource):
+    @api.response(200, 'Entity cache size and hit/miss counters per model')
+    @api.response(401, 'Unauthorized')
+    @api.response(403, 'Admin privileges required')
+    @jwt_required()
+    def get(self):
+        """Report the entity cache statistics of this process (Admin only)"""
+        claims = get_jwt()
+        if not claims.get('is_admin', False):
+            return {'error': 'Admin privileges required'}, 403
+        return {
+            'enabled': current_app.config['ENTITY_CACHE_ENABLED'],
+            'ttl': current_app.config['ENTITY_CACHE_TTL'],
+            'models': entity_cache.stats()
+        }, 200
+
+
+@api.route('/db-pool')
+class DatabasePoolResource(Resource):
+    @api.response(200, 'Connection pool state, checkout waits and timeouts')
+    @api.response(401, 'Unauthorized')
+    @api.response(403, 'Admin privileges required')
+    @jwt_required()
+    def get(self):
+        """Report the database connection pool metrics of this process (Admin only)"""
+        claims = get_jwt()
+        if not claims.get('is_admin', False):
+            return {'error': 'Admin privileges required'}, 403
+        return pool_metrics(db.engine), 200
@@ -1,6 +1,8 @@
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt
 from app.services import facade 
+from app.extensions import response_cache
+from app.api.v1.serializers import fields_parser, parse_fields, serializers
 
 api = Namespace('amenities', description='Amenity operations')
 
@@ -28,39 +30,41 @@ class AmenityList(Resource):
 
         try:
             new_amenity = facade.create_amenity(amenity_data)
-            return {
-                'id': new_amenity.id, 
-                'name': new_amenity.name
-            }, 201
+            return serializers.dump('amenity', new_amenity), 201
         except ValueError as e:
             return {'error': str(e)}, 400
 
+    @api.expect(fields_parser)
     @api.response(200, 'List of amenities retrieved successfully')
+    @api.response(400, 'Invalid fields')
+    @response_cache.cached('amenities')
     def get(self):
         """Retrieve a list of all amenities"""
-        all_amenities = facade.get_all_amenities()
-        return [
-            {
-                'id': amenity.id, 
-                'name': amenity.name
-            }
-            for amenity in all_amenities
-        ], 200
+        try:
+            serializer, projection = serializers.select('amenity', parse_fields(fields_parser.parse_args()['fields']))
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        all_amenities = facade.get_all_amenities(projection)
+        return serializer.dump_many(all_amenities), 200
         
 
 @api.route('/<amenity_id>')
 class AmenityResource(Resource):
+    @api.expect(fields_parser)
     @api.response(200, 'Amenity details retrieved successfully')
+    @api.response(400, 'Invalid fields')
     @api.response(404, 'Amenity not found')
+    @response_cache.cached('amenities')
     def get(self, amenity_id):
         """Get amenity details by ID"""
-        amenity = facade.get_amenity(amenity_id)
+        try:
+            serializer, projection = serializers.select('amenity', parse_fields(fields_parser.parse_args()['fields']))
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        amenity = facade.get_amenity(amenity_id, projection)
         if not amenity:
             return {'error': 'Amenity not found'}, 404
-        return {
-            'id': amenity.id, 
-            'name': amenity.name
-        }, 200
+        return serializer.dump(amenity), 200
 
     @jwt_required()
     @api.expect(amenity_model)
@@ -81,9 +85,6 @@ class AmenityResource(Resource):
             updated_amenity = facade.update_amenity(amenity_id, amenity_data)
             if not updated_amenity:
                 return {'error': "Amenity not found"}, 404
-            return {
-                'id': updated_amenity.id, 
-                'name': updated_amenity.name
-            }, 200
+            return serializers.dump('amenity', updated_amenity), 200
         except ValueError as e:
             return {'error': str(e)}, 400
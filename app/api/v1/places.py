@@ -1,6 +1,9 @@
+from flask import current_app
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from app.services import facade
+from app.extensions import response_cache
+from app.api.v1.serializers import fields_parser, parse_fields, serializers
 
 api = Namespace('places', description='Place operations')
 
@@ -12,18 +15,41 @@ place_model = api.model('Place', {
     'longitude': fields.Float(required=True, description='Longitude of the place')
 })
 
-def serialize_place(place):
-    """Helper function to serialize place with amenities"""
-    return {
-        'id': place.id,
-        'title': place.title,
-        'description': place.description,
-        'price': place.price,
-        'latitude': place.latitude,
-        'longitude': place.longitude,
-        'owner_id': place.owner.id,
-        'amenities': [{'id': amenity.id, 'name': amenity.name} for amenity in place.amenities]
-    }
+place_list_parser = api.parser()
+place_list_parser.add_argument('limit', type=int, location='args', help='Maximum number of places per page')
+place_list_parser.add_argument('cursor', type=str, location='args', help='Cursor returned as next_cursor by the previous page')
+place_list_parser.add_argument('min_price', type=float, location='args', help='Lowest price per night')
+place_list_parser.add_argument('max_price', type=float, location='args', help='Highest price per night')
+place_list_parser.add_argument('sort', type=str, location='args', help='Sort order: price (cheapest first) or -price')
+place_list_parser.add_argument('amenities', type=str, location='args', help='Comma-separated amenity ids the places must all have')
+place_list_parser.add_argument('fields', type=str, location='args', help='Comma-separated fields to return; only their columns are loaded')
+
+place_search_parser = api.parser()
+place_search_parser.add_argument('q', type=str, location='args', help='Words to find in place titles, descriptions and reviews')
+place_search_parser.add_argument('lat', type=float, location='args', help='Latitude of the search center')
+place_search_parser.add_argument('lng', type=float, location='args', help='Longitude of the search center')
+place_search_parser.add_argument('radius_km', type=float, location='args', help='Search radius in kilometers')
+place_search_parser.add_argument('min_lat', type=float, location='args', help='Southern edge of the bounding box')
+place_search_parser.add_argument('min_lng', type=float, location='args', help='Western edge of the bounding box')
+place_search_parser.add_argument('max_lat', type=float, location='args', help='Northern edge of the bounding box')
+place_search_parser.add_argument('max_lng', type=float, location='args', help='Eastern edge of the bounding box')
+place_search_parser.add_argument('limit', type=int, location='args', help='Maximum number of places returned')
+place_search_parser.add_argument('cursor', type=str, location='args', help='Cursor returned as next_cursor by the previous page (text and bounding box searches; text search pages may overlap or skip places when the data changes in between)')
+place_search_parser.add_argument('fields', type=str, location='args', help='Comma-separated fields to return; only their columns are loaded')
+
+place_reviews_parser = api.parser()
+place_reviews_parser.add_argument('limit', type=int, location='args', help='Maximum number of reviews per page')
+place_reviews_parser.add_argument('cursor', type=str, location='args', help='Cursor returned as next_cursor by the previous page')
+place_reviews_parser.add_argument('sort', type=str, location='args', help='Sort order: -created_at (default, newest first), created_at, -rating or rating')
+place_reviews_parser.add_argument('rating', type=int, location='args', help='Only reviews with this rating (1 to 5)')
+place_reviews_parser.add_argument('fields', type=str, location='args', help='Comma-separated fields to return; only their columns are loaded')
+
+def page_limit(requested):
+    """Resolve the requested page size against the configured bounds"""
+    limit = requested if requested is not None else current_app.config['DEFAULT_PAGE_SIZE']
+    if limit < 1 or limit > current_app.config['MAX_PAGE_SIZE']:
+        raise ValueError(f"Limit must be between 1 and {current_app.config['MAX_PAGE_SIZE']}")
+    return limit
 
 @api.route('/')
 class PlaceListResource(Resource):
@@ -39,71 +65,98 @@ class PlaceListResource(Resource):
 
         try:
             new_place = facade.create_place(place_data)
-            return {
-                'id': new_place.id,
-                'title': new_place.title,
-                'description': new_place.description,
-                'price': new_place.price,
-                'latitude': new_place.latitude,
-                'longitude': new_place.longitude,
-                'owner_id': new_place.owner.id,
-                "amenities": [{"id": amenity.id, "name": amenity.name} for amenity in new_place.amenities]
-            }, 201
+            return serializers.dump('place', new_place), 201
         except ValueError as e:
             return {'error': str(e)}, 400
 
+    @api.expect(place_list_parser)
     @api.response(200, 'List of places retrieved successfully')
+    @api.response(400, 'Invalid pagination or filter parameters')
+    @response_cache.cached('places')
+    def get(self):
+        args = place_list_parser.parse_args()
+        try:
+            limit = page_limit(args['limit'])
+            serializer, projection = serializers.select('place', parse_fields(args['fields']))
+            amenity_ids = [value.strip() for value in (args['amenities'] or '').split(',') if value.strip()]
+            places, next_cursor = facade.get_places_page(
+                limit, args['cursor'], args['min_price'], args['max_price'], args['sort'], projection, amenity_ids
+            )
+        except ValueError as e:
+            return {'error': str(e)}, 400
+
+        return {
+            'places': serializer.dump_many(places),
+            'next_cursor': next_cursor
+        }, 200
+
+@api.route('/search')
+class PlaceSearchResource(Resource):
+    @api.expect(place_search_parser)
+    @api.response(200, 'Matching places retrieved successfully')
+    @api.response(400, 'Invalid search parameters')
     def get(self):
-        all_places = facade.get_all_places()
-        return [{
-            'id': place.id,
-            'title': place.title,
-            'description': place.description,
-            'price': place.price,
-            'latitude': place.latitude,
-            'longitude': place.longitude,
-            'owner_id': place.owner.id,
-            "amenities": [{"id": amenity.id, "name": amenity.name} for amenity in place.amenities]
-        } for place in all_places], 200
+        """Find places matching words (q), near a point (lat, lng, radius_km) or inside a bounding box (min_lat, min_lng, max_lat, max_lng)"""
+        args = place_search_parser.parse_args()
+        radius = [args[key] for key in ('lat', 'lng', 'radius_km')]
+        bbox = [args[key] for key in ('min_lat', 'min_lng', 'max_lat', 'max_lng')]
+
+        try:
+            limit = page_limit(args['limit'])
+            serializer, projection = serializers.select('place', parse_fields(args['fields']))
+            if args['q'] is not None:
+                matches, next_cursor = facade.search_places_text(args['q'], limit, args['cursor'], projection)
+                dump = serializer.dump
+                places = [{**dump(place), 'relevance': relevance} for place, relevance in matches]
+                return {'places': places, 'next_cursor': next_cursor}, 200
+
+            if all(value is not None for value in radius):
+                matches = facade.search_places_within_radius(*radius, limit, projection)
+                dump = serializer.dump
+                places = [{**dump(place), 'distance_km': round(distance, 3)} for place, distance in matches]
+                return {'places': places, 'next_cursor': None}, 200
+
+            if all(value is not None for value in bbox):
+                matches, next_cursor = facade.search_places_in_bbox(*bbox, limit, args['cursor'], projection)
+                return {
+                    'places': serializer.dump_many(matches),
+                    'next_cursor': next_cursor
+                }, 200
+        except ValueError as e:
+            return {'error': str(e)}, 400
+
+        return {'error': 'Provide q, or lat, lng and radius_km, or min_lat, min_lng, max_lat and max_lng'}, 400
 
 @api.route('/<place_id>')
 class PlaceResource(Resource):
+    @api.expect(fields_parser)
     @api.response(200, 'Place details retrieved successfully')
+    @api.response(400, 'Invalid fields')
     @api.response(404, 'Place not found')
+    @response_cache.cached('places', 'reviews', 'amenities')
     def get(self, place_id):
-        place = facade.get_place(place_id)
+        try:
+            fields = parse_fields(fields_parser.parse_args()['fields'])
+            # reviews is not a place attribute: they are queried only when requested
+            with_reviews = fields is None or 'reviews' in fields
+            if fields is not None:
+                fields = [field for field in fields if field != 'reviews']
+            serializer, projection = serializers.select('place_detail', fields)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+
+        place, reviews, reviews_next_cursor = facade.get_place_detail(
+            place_id, current_app.config['DEFAULT_PAGE_SIZE'], projection, with_reviews
+        )
         if not place:
             return {'error': 'Place not found'}, 404
         
-        # Get reviews for this place
-        reviews = facade.get_reviews_by_place(place_id) or []
-        
-        return {
-            'id': place.id,
-            'title': place.title,
-            'description': place.description,
-            'price': place.price,
-            'latitude': place.latitude,
-            'longitude': place.longitude,
-            'owner_id': place.owner.id,
-            'owner': {
-                'id': place.owner.id,
-                'first_name': place.owner.first_name,
-                'last_name': place.owner.last_name
-            },
-            'amenities': [{'id': amenity.id, 'name': amenity.name} for amenity in place.amenities],
-            'reviews': [{
-                'id': review.id,
-                'text': review.text,
-                'rating': review.rating,
-                'created_at': review.created_at.isoformat(),
-                'user': {
-                    'id': review.user.id,
-                    'first_name': review.user.first_name,
-                    'last_name': review.user.last_name
-                }
-            } for review in reviews]
-        }, 200
+        place_data = serializer.dump(place)
+        if with_reviews:
+            # First page only: the following ones come from /places/<place_id>/reviews
+            place_data['reviews'] = serializers.dump_many('review_with_user', reviews)
+            place_data['reviews_next_cursor'] = reviews_next_cursor
+        return place_data, 200
 
     @api.expect(place_model)
     @api.response(200, 'Place updated successfully')
@@ -122,7 +175,7 @@ class PlaceResource(Resource):
         if not place:
             return {'error': 'Place not found'}, 404
         
-        if not is_admin and place.owner.id != current_user_id:
+        if not is_admin and place.owner_id != current_user_id:
             return {'error': 'Unauthorized action'}, 403
         
         if 'owner_id' in place_data:
@@ -130,16 +183,7 @@ class PlaceResource(Resource):
         
         try:
             updated_place = facade.update_place(place_id, place_data)
-            return {
-                'id': updated_place.id,
-                'title': updated_place.title,
-                'description': updated_place.description,
-                'price': updated_place.price,
-                'latitude': updated_place.latitude,
-                'longitude': updated_place.longitude,
-                'owner_id': updated_place.owner.id,
-                "amenities": [{"id": amenity.id, "name": amenity.name} for amenity in updated_place.amenities]
-            }, 200
+            return serializers.dump('place', updated_place), 200
         except ValueError as e:
             return {'error': str(e)}, 400
 
@@ -157,7 +201,7 @@ class PlaceResource(Resource):
         if not place:
             return {'error': 'Place not found'}, 404
         
-        if not is_admin and place.owner.id != current_user_id:
+        if not is_admin and place.owner_id != current_user_id:
             return {'error': 'Unauthorized action'}, 403
         
         success = facade.delete_place(place_id)
@@ -168,19 +212,27 @@ class PlaceResource(Resource):
 
 @api.route('/<place_id>/reviews')
 class PlaceReviewListResource(Resource):
+    @api.expect(place_reviews_parser)
     @api.response(200, 'List of reviews for the place retrieved successfully')
+    @api.response(400, 'Invalid pagination, filter or fields parameters')
     @api.response(404, 'Place not found')
     def get(self, place_id):
-        reviews = facade.get_reviews_by_place(place_id)
-        if reviews is None:
+        args = place_reviews_parser.parse_args()
+        try:
+            limit = page_limit(args['limit'])
+            serializer, projection = serializers.select('place_review', parse_fields(args['fields']))
+            page = facade.get_place_reviews_page(place_id, limit, args['cursor'], args['sort'], args['rating'], projection)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+
+        if page is None:
             return {'error': 'Place not found'}, 404
         
-        return [{
-            'id': review.id,
-            'text': review.text,
-            'rating': review.rating,
-            'user_id': review.user.id
-        } for review in reviews], 200
+        reviews, next_cursor = page
+        return {
+            'reviews': serializer.dump_many(reviews),
+            'next_cursor': next_cursor
+        }, 200
 
 @api.route('/<place_id>/amenities')
 class PlaceAmenityListResource(Resource):
@@ -199,7 +251,7 @@ class PlaceAmenityListResource(Resource):
         if not place:
             return {'error': 'Place not found'}, 404
         
-        if not is_admin and place.owner.id != current_user_id:
+        if not is_admin and place.owner_id != current_user_id:
             return {'error': 'Unauthorized action'}, 403
         
         data = api.payload
@@ -213,8 +265,7 @@ class PlaceAmenityListResource(Resource):
             return {'error': 'Amenity not found'}, 404
         
         try:
-            place.amenities.append(amenity)
-            place.save()
-            return serialize_place(place), 200
+            place = facade.add_amenity_to_place(place, amenity)
+            return serializers.dump('place', place), 200
         except Exception as e:
             return {'error': str(e)}, 400
@@ -1,6 +1,8 @@
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from app.services import facade
+from app.extensions import response_cache
+from app.api.v1.serializers import fields_parser, parse_fields, serializers
 
 api = Namespace('reviews', description='Review operations')
 
@@ -24,43 +26,38 @@ class ReviewListResource(Resource):
 
         try:
             new_review = facade.create_review(review_data)
-            return {
-                'id': new_review.id,
-                'text': new_review.text,
-                'rating': new_review.rating,
-                'user_id': new_review.user.id,
-                'place_id': new_review.place.id
-            }, 201
+            return serializers.dump('review', new_review), 201
         except ValueError as e:
             return {'error': str(e)}, 400
 
+    @api.expect(fields_parser)
     @api.response(200, 'List of reviews retrieved successfully')
+    @api.response(400, 'Invalid fields')
     def get(self):
-        all_reviews = facade.get_all_reviews()
-        return [{
-            'id': review.id,
-            'text': review.text,
-            'rating': review.rating,
-            'user_id': review.user.id,
-            'place_id': review.place.id
-        } for review in all_reviews], 200
+        try:
+            serializer, projection = serializers.select('review', parse_fields(fields_parser.parse_args()['fields']))
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        all_reviews = facade.get_all_reviews(projection)
+        return serializer.dump_many(all_reviews), 200
 
 @api.route('/<review_id>')
 class ReviewResource(Resource):
+    @api.expect(fields_parser)
     @api.response(200, 'Review details retrieved successfully')
+    @api.response(400, 'Invalid fields')
     @api.response(404, 'Review not found')
+    @response_cache.cached('reviews')
     def get(self, review_id):
-        review = facade.get_review(review_id)
+        try:
+            serializer, projection = serializers.select('review', parse_fields(fields_parser.parse_args()['fields']))
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        review = facade.get_review(review_id, projection)
         if not review:
             return {'error': 'Review not found'}, 404
         
-        return {
-            'id': review.id,
-            'text': review.text,
-            'rating': review.rating,
-            'user_id': review.user.id,
-            'place_id': review.place.id
-        }, 200
+        return serializer.dump(review), 200
 
     @api.expect(review_model)
     @api.response(200, 'Review updated successfully')
@@ -80,18 +77,12 @@ class ReviewResource(Resource):
         if not review:
             return {'error': 'Review not found'}, 404
         
-        if not is_admin and review.user.id != current_user_id:
+        if not is_admin and review.user_id != current_user_id:
             return {'error': 'Unauthorized action'}, 403
         
         try:
             updated_review = facade.update_review(review_id, review_data)
-            return {
-                'id': updated_review.id,
-                'text': updated_review.text,
-                'rating': updated_review.rating,
-                'user_id': updated_review.user.id,
-                'place_id': updated_review.place.id
-            }, 200
+            return serializers.dump('review', updated_review), 200
         except ValueError as e:
             return {'error': str(e)}, 400
 
@@ -111,7 +102,7 @@ class ReviewResource(Resource):
         if not review:
             return {'error': 'Review not found'}, 404
         
-        if not is_admin and review.user.id != current_user_id:
+        if not is_admin and review.user_id != current_user_id:
             return {'error': 'Unauthorized action'}, 403
         
         success = facade.delete_review(review_id)
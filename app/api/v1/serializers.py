@@ -0,0 +1,269 @@
+import threading
+from collections import OrderedDict
+from flask_restx import reqparse
+from sqlalchemy import inspect
+from app.models.user import User
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.review import Review
+
+# Compiled field subsets kept per serializer for ?fields= requests
+MAX_SUBSETS = 256
+
+
+class Nested:
+    """Field serializing a related object, or a list of them, with another serializer"""
+
+    def __init__(self, serializer, attribute, many=False):
+        self.serializer = serializer
+        self.attribute = attribute
+        self.many = many
+
+
+class Computed:
+    """Field computed from the instance by a property or a function
+
+    ``requires`` names the mapped attributes the computation reads, which a
+    projection of the serializer loads.
+    """
+
+    def __init__(self, source, requires=()):
+        self.source = source
+        self.requires = tuple(requires)
+
+
+class Serializer:
+    """Convert instances of a model to JSON-ready dicts
+
+    ``fields`` maps each output key to its source: the name of a mapped
+    attribute, a ``Computed`` field or a ``Nested`` field. The field access
+    is compiled once into a function building the dict literally. Mapped
+    columns and relationships are read straight from the instance
+    ``__dict__``, skipping the ORM attribute machinery; when one of them is
+    not loaded yet, the instance is serialized again through regular
+    attribute access, which loads it.
+
+    ``projection`` maps every attribute the fields read to ``None``, or
+    for relationships to the projection of the nested serializer, so that
+    repositories can load exactly those columns.
+    """
+
+    def __init__(self, name, model, fields, registry):
+        self.name = name
+        self.model = model
+        self.fields = dict(fields)
+        self._registry = registry
+        self._subsets = OrderedDict()  # sorted field names -> Serializer, least recently used first
+        self._subsets_lock = threading.Lock()
+        mapper = inspect(model)
+        self._mapped = set(mapper.column_attrs.keys()) | set(mapper.relationships.keys())
+        self.projection = self._projection(registry)
+        slow = self._compile(registry, direct=False)
+        fast = self._compile(registry, direct=True)
+
+        def dump(obj):
+            try:
+                return fast(obj)
+            except KeyError:
+                return slow(obj)
+        self.dump = dump
+
+    def dump_many(self, objects):
+        """Serialize an iterable of instances"""
+        dump = self.dump
+        return [dump(obj) for obj in objects]
+
+    def only(self, keys):
+        """Return a serializer of a subset of the fields, compiled once per subset
+
+        The ``MAX_SUBSETS`` most recently used subsets stay compiled, keyed
+        by their sorted field names so that the order and repetitions of
+        the requested keys do not matter.
+        """
+        keys = frozenset(keys)
+        unknown = keys - self.fields.keys()
+        if unknown:
+            raise ValueError(f"Unknown field(s): {', '.join(sorted(unknown))}. "
+                             f"Available fields: {', '.join(self.fields)}")
+        if keys == self.fields.keys():
+            return self
+        key = tuple(sorted(keys))
+        with self._subsets_lock:
+            subset = self._subsets.get(key)
+            if subset is not None:
+                self._subsets.move_to_end(key)
+                return subset
+        subset = Serializer(self.name, self.model,
+                            {name: source for name, source in self.fields.items() if name in keys}, self._registry)
+        with self._subsets_lock:
+            subset = self._subsets.setdefault(key, subset)
+            self._subsets.move_to_end(key)
+            while len(self._subsets) > MAX_SUBSETS:
+                self._subsets.popitem(last=False)
+        return subset
+
+    def _projection(self, registry):
+        """Build the tree of the mapped attributes read by the fields"""
+        projection = {}
+        for key, source in self.fields.items():
+            if isinstance(source, Nested):
+                _merge_projection(projection, {source.attribute: registry[source.serializer].projection})
+            elif isinstance(source, Computed):
+                _merge_projection(projection, dict.fromkeys(source.requires))
+            elif isinstance(source, str):
+                if source not in self._mapped:
+                    raise ValueError(f"Field {key!r} of {self.name} reads {source!r}, which is not mapped: "
+                                     f"declare it as Computed")
+                _merge_projection(projection, {source: None})
+        return projection
+
+    def _compile(self, registry, direct):
+        """Build the serializing function, reading mapped attributes from __dict__ if direct"""
+        namespace = {}
+        items = []
+        for index, (key, source) in enumerate(self.fields.items()):
+            attribute = source.attribute if isinstance(source, Nested) else \
+                source.source if isinstance(source, Computed) else source
+            if isinstance(attribute, str):
+                if not attribute.isidentifier():
+                    raise ValueError(f"Invalid attribute {attribute!r} for field {key!r} of {self.name}")
+                read = f"state[{attribute!r}]" if direct and attribute in self._mapped else f"obj.{attribute}"
+            if isinstance(source, Nested):
+                namespace[f'_dump{index}'] = registry[source.serializer].dump
+                if source.many:
+                    value = f"[_dump{index}(item) for item in {read}]"
+                else:
+                    value = f"(_dump{index}(item) if (item := {read}) is not None else None)"
+            elif isinstance(attribute, str):
+                value = read
+            elif isinstance(source, Computed) and callable(attribute):
+                namespace[f'_field{index}'] = attribute
+                value = f"_field{index}(obj)"
+            else:
+                raise TypeError(f"Field {key!r} of {self.name} must be an attribute name, Computed or Nested")
+            items.append(f"{key!r}: {value}")
+
+        source_code = f"def dump(obj):\n    state = obj.__dict__\n    return {{{', '.join(items)}}}\n"
+        exec(compile(source_code, f"<serializer {self.name}>", 'exec'), namespace)
+        return namespace['dump']
+
+
+def _merge_projection(projection, other):
+    """Add the attributes of another projection to a projection, merging nested ones"""
+    for key, nested in other.items():
+        if key not in projection:
+            projection[key] = nested
+        elif projection[key] is None or nested is None:
+            projection[key] = None  # Loaded in full
+        else:
+            merged = dict(projection[key])
+            _merge_projection(merged, nested)
+            projection[key] = merged
+
+
+class SerializerRegistry:
+    """Named serializers of the API, compiled when they are registered"""
+
+    def __init__(self):
+        self._serializers = {}
+
+    def register(self, name, model, fields):
+        """Compile and register a serializer; nested serializers must be registered first"""
+        if name in self._serializers:
+            raise ValueError(f"Serializer {name} is already registered")
+        serializer = Serializer(name, model, fields, self)
+        self._serializers[name] = serializer
+        return serializer
+
+    def __getitem__(self, name):
+        return self._serializers[name]
+
+    def dump(self, name, obj):
+        """Serialize one instance with a registered serializer"""
+        return self._serializers[name].dump(obj)
+
+    def dump_many(self, name, objects):
+        """Serialize instances with a registered serializer"""
+        return self._serializers[name].dump_many(objects)
+
+    def select(self, name, fields=None):
+        """Return the serializer for a ``fields`` parameter and the projection to load
+
+        Without ``fields`` every field is serialized and the projection is
+        None, leaving the repository to its default loading.
+        """
+        serializer = self._serializers[name]
+        if fields is None:
+            return serializer, None
+        serializer = serializer.only(fields)
+        return serializer, serializer.projection
+
+
+def parse_fields(value):
+    """Split a comma-separated ``fields`` parameter into field names, None when absent"""
+    if value is None:
+        return None
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    if not names:
+        raise ValueError("fields must name at least one field")
+    return names
+
+
+# Query string of the endpoints returning sparse fieldsets
+fields_parser = reqparse.RequestParser()
+fields_parser.add_argument('fields', type=str, location='args',
+                           help='Comma-separated fields to return; only their columns are loaded')
+
+
+serializers = SerializerRegistry()
+
+# ==================== USERS ====================
+serializers.register('user', User, {
+    'id': 'id', 'first_name': 'first_name', 'last_name': 'last_name', 'email': 'email', 'is_admin': 'is_admin',
+})
+# Public identity of an owner or reviewer
+serializers.register('user_summary', User, {'id': 'id', 'first_name': 'first_name', 'last_name': 'last_name'})
+
+# ==================== AMENITIES ====================
+serializers.register('amenity', Amenity, {'id': 'id', 'name': 'name'})
+
+# ==================== PLACES ====================
+PLACE_FIELDS = {
+    'id': 'id',
+    'title': 'title',
+    'description': 'description',
+    'price': 'price',
+    'latitude': 'latitude',
+    'longitude': 'longitude',
+    'owner_id': 'owner_id',
+    'amenities': Nested('amenity', 'amenities', many=True),
+    'review_count': 'review_count',
+    'average_rating': Computed('average_rating', requires=('review_count', 'rating_sum')),
+}
+serializers.register('place', Place, PLACE_FIELDS)
+serializers.register('place_detail', Place, {
+    **PLACE_FIELDS,
+    'owner': Nested('user_summary', 'owner'),
+    'rating_histogram': Computed('rating_histogram', requires=[f'rating_{star}_count' for star in range(1, 6)]),
+})
+
+# ==================== REVIEWS ====================
+serializers.register('review', Review, {
+    'id': 'id', 'text': 'text', 'rating': 'rating', 'user_id': 'user_id', 'place_id': 'place_id',
+})
+# Review listed under its place
+serializers.register('place_review', Review, {
+    'id': 'id',
+    'text': 'text',
+    'rating': 'rating',
+    'user_id': 'user_id',
+    'created_at': Computed(lambda review: review.created_at.isoformat(), requires=('created_at',)),
+})
+# Review shown on the place page with its author
+serializers.register('review_with_user', Review, {
+    'id': 'id',
+    'text': 'text',
+    'rating': 'rating',
+    'created_at': Computed(lambda review: review.created_at.isoformat(), requires=('created_at',)),
+    'user': Nested('user_summary', 'user'),
+})
@@ -2,6 +2,7 @@ from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from app.services.facade import HBnBFacade
 from app.services import facade
+from app.api.v1.serializers import fields_parser, parse_fields, serializers
 
 api = Namespace('users', description='User operations')
 
@@ -60,49 +61,40 @@ class UserList(Resource):
 
         try:
             new_user = facade.create_user(user_data)
-            return {
-                'id': new_user.id, 
-                'first_name': new_user.first_name, 
-                'last_name': new_user.last_name, 
-                'email': new_user.email,
-                'is_admin': new_user.is_admin
-            }, 201
+            return serializers.dump('user', new_user), 201
         except ValueError as e:
             return {'error': str(e)}, 400
         
     
+    @api.expect(fields_parser)
     @api.response(200, "all users are retrieved", [user_output_model])
+    @api.response(400, 'Invalid fields')
     def get(self):
-        all_users = facade.get_all_users()
-        return [
-            {
-                'id': user.id, 
-                'first_name': user.first_name, 
-                'last_name': user.last_name, 
-                'email': user.email,
-                'is_admin': user.is_admin
-            }
-            for user in all_users
-        ], 200
+        try:
+            serializer, projection = serializers.select('user', parse_fields(fields_parser.parse_args()['fields']))
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        all_users = facade.get_all_users(projection)
+        return serializer.dump_many(all_users), 200
     
 @api.route('/<user_id>')
 @api.param('user_id', "unique user id")
 class UserResource(Resource):
     
+    @api.expect(fields_parser)
     @api.response(200, 'User details retrieved successfully', user_output_model)
+    @api.response(400, 'Invalid fields')
     @api.response(404, 'User not found')
     def get(self, user_id):
         """Get user details by ID"""
-        user = facade.get_user(user_id)
+        try:
+            serializer, projection = serializers.select('user', parse_fields(fields_parser.parse_args()['fields']))
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        user = facade.get_user(user_id, projection)
         if not user:
             return {'error': 'User not found'}, 404
-        return {
-            'id': user.id, 
-            'first_name': user.first_name, 
-            'last_name': user.last_name, 
-            'email': user.email,
-            'is_admin': user.is_admin
-        }, 200
+        return serializer.dump(user), 200
     
     
     @api.expect(admin_user_update_model, validate=True)  
@@ -132,13 +124,7 @@ class UserResource(Resource):
                 updated_user = facade.update_user(user_id, user_data)
                 if not updated_user:
                     return {'error': "User not found"}, 404
-                return {
-                    'id': updated_user.id, 
-                    'first_name': updated_user.first_name, 
-                    'last_name': updated_user.last_name, 
-                    'email': updated_user.email,
-                    'is_admin': updated_user.is_admin
-                }, 200
+                return serializers.dump('user', updated_user), 200
             except ValueError as e:
                 return {'error': str(e)}, 400
         
@@ -156,12 +142,6 @@ class UserResource(Resource):
                 updated_user = facade.update_user(user_id, user_data)
                 if not updated_user:
                     return {'error': "User not found"}, 404
-                return {
-                    'id': updated_user.id, 
-                    'first_name': updated_user.first_name, 
-                    'last_name': updated_user.last_name, 
-                    'email': updated_user.email,
-                    'is_admin': updated_user.is_admin
-                }, 200
+                return serializers.dump('user', updated_user), 200
             except ValueError as e:
                 return {'error': str(e)}, 400
\ No newline at end of file
@@ -0,0 +1,190 @@
+import asyncio
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import make_url
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from app.extensions import db
+from app.persistence.replicas import ENGINES_KEY, RoutingSession
+
+# Async DBAPI driver of each supported database backend
+ASYNC_DRIVERS = {'sqlite': 'sqlite+aiosqlite', 'mysql': 'mysql+aiomysql'}
+# Paths whose GET and HEAD requests are served on the event loop
+ASYNC_READ_PREFIXES = ('/api/v1/places', '/api/v1/reviews', '/api/v1/amenities')
+# Reads run at once when the pool of the async engine has no fixed size
+DEFAULT_CONCURRENT_READS = 100
+
+
+def async_url(url):
+    """Return a database URL using the async driver of its backend"""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"Async mode does not support {backend} databases")
+    if backend == 'sqlite' and url.database in (None, '', ':memory:'):
+        raise ValueError("Async mode needs a SQLite database file: an in-memory database "
+                         "is private to the connection that created it")
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+def wsgi_environ(scope, body):
+    """Build the WSGI environ of an ASGI HTTP request"""
+    server_name, server_port = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server_name,
+        'SERVER_PORT': str(server_port),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': (scope.get('client') or ('', 0))[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            environ[name] = value
+            continue
+        key = f'HTTP_{name}'
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+def call_wsgi(wsgi_app, environ):
+    """Run a WSGI application to completion and return (status, headers, body)"""
+    response = {}
+
+    def start_response(status, headers, exc_info=None):
+        response['status'] = int(status.split(' ', 1)[0])
+        response['headers'] = headers
+
+    chunks = wsgi_app(environ, start_response)
+    try:
+        body = b''.join(chunks)
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+    return response['status'], response['headers'], body
+
+
+class AsyncReadApp:
+    """ASGI application serving the read endpoints with an async database engine
+
+    GET and HEAD requests under ``ASYNC_READ_PREFIXES`` run the regular
+    Flask views on the event loop, inside ``AsyncSession.run_sync``: the
+    request's ``db.session`` is the synchronous facade of an AsyncSession,
+    so every query the views, repositories and caches issue is awaited on
+    an async driver (aiomysql, aiosqlite) instead of holding a thread.
+    Thousands of slow reads then wait on one thread, bounded by the async
+    connection pool rather than by the number of worker threads.
+
+    At most ``ASGI_MAX_CONCURRENT_READS`` reads run at once, by default
+    as many as the pool has connections; the others wait their turn in
+    arrival order, so an overloaded server keeps a first-come first-served
+    latency instead of interleaving every pending request.
+
+    Every other request, including all writes, runs in a thread of a
+    ``ASGI_THREADS`` pool against the regular engines, exactly as under
+    WSGI. Both paths share the application's caches and indexes.
+
+    The async engines are created on the first request from the
+    application's database URLs and engine options, and disposed when the
+    ASGI server shuts down.
+    """
+
+    def __init__(self, app, read_prefixes=ASYNC_READ_PREFIXES):
+        self.app = app
+        self.read_prefixes = tuple(read_prefixes)
+        app.config.setdefault('ASGI_THREADS', 32)
+        app.config.setdefault('ASGI_MAX_CONCURRENT_READS', None)
+        self._executor = ThreadPoolExecutor(max_workers=app.config['ASGI_THREADS'],
+                                            thread_name_prefix='asgi-wsgi')
+        self._engines = None
+        self._sessions = None
+        self._read_slots = None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            raise ValueError(f"Unsupported ASGI scope type {scope['type']!r}")
+
+        body = bytearray()
+        while True:
+            message = await receive()
+            body += message.get('body', b'')
+            if not message.get('more_body', False):
+                break
+        environ = wsgi_environ(scope, bytes(body))
+
+        if scope['method'] in ('GET', 'HEAD') and scope['path'].startswith(self.read_prefixes):
+            status, headers, content = await self._serve_async(environ)
+        else:
+            loop = asyncio.get_running_loop()
+            status, headers, content = await loop.run_in_executor(self._executor, call_wsgi, self.app, environ)
+
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers],
+        })
+        await send({'type': 'http.response.body', 'body': content})
+
+    async def _serve_async(self, environ):
+        """Run a request on the event loop with an AsyncSession as db.session"""
+        if self._sessions is None:
+            self._create_engines()
+        async with self._read_slots, self._sessions() as session:
+            return await session.run_sync(self._call_with_session, environ)
+
+    def _call_with_session(self, sync_session, environ):
+        with self.app.app_context():
+            # The request reuses this application context, hence this scoped session
+            db.session.registry.set(sync_session)
+            return call_wsgi(self.app, environ)
+
+    def _create_engines(self):
+        """Create an async engine for the default bind and each of SQLALCHEMY_BINDS"""
+        config = self.app.config
+        options = dict(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+        options.pop('poolclass', None)  # Async engines need an asyncio-compatible pool
+        urls = {None: config['SQLALCHEMY_DATABASE_URI'], **(config.get('SQLALCHEMY_BINDS') or {})}
+        self._engines = {key: create_async_engine(async_url(url), **options) for key, url in urls.items()}
+        self._sessions = async_sessionmaker(
+            class_=AsyncSession, sync_session_class=RoutingSession, db=db, query_cls=db.Query,
+            info={ENGINES_KEY: {key: engine.sync_engine for key, engine in self._engines.items()}},
+        )
+        slots = config['ASGI_MAX_CONCURRENT_READS']
+        if slots is None:
+            pool = self._engines[None].pool
+            slots = pool.size() + max(pool._max_overflow, 0) if isinstance(pool, QueuePool) \
+                else DEFAULT_CONCURRENT_READS
+        self._read_slots = asyncio.Semaphore(slots)
+
+    async def _lifespan(self, receive, send):
+        """Dispose the async engines and the thread pool when the server stops"""
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def dispose(self):
+        """Close the connections of the async engines and stop the threads"""
+        for engine in (self._engines or {}).values():
+            await engine.dispose()
+        self._engines = self._sessions = self._read_slots = None
+        self._executor.shutdown(wait=False)
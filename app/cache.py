@@ -0,0 +1,131 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from urllib.parse import urlencode
+from flask import Response, current_app, has_app_context, request
+from app.encoding import dumps
+from app.persistence.replicas import replica_reads_may_be_stale
+
+
+class _CacheStore:
+    """Per-application storage of cached responses, bounded in size and age"""
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()  # key -> (etag, body, tags, stored_at)
+        self.generation = 0
+        self.lock = threading.Lock()
+
+
+class ResponseCache:
+    """In-process cache of JSON GET responses by URL, invalidated by tag, with strong ETags"""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Create the cache storage for an application from its configuration"""
+        app.config.setdefault('RESPONSE_CACHE_ENABLED', True)
+        app.config.setdefault('RESPONSE_CACHE_SIZE', 1024)
+        app.config.setdefault('RESPONSE_CACHE_TTL', 30)
+        app.extensions['response_cache'] = _CacheStore(
+            app.config['RESPONSE_CACHE_SIZE'], app.config['RESPONSE_CACHE_TTL']
+        )
+
+    def _store(self):
+        """Return the storage of the current application, if caching is on"""
+        if not has_app_context() or not current_app.config.get('RESPONSE_CACHE_ENABLED'):
+            return None
+        return current_app.extensions.get('response_cache')
+
+    def cached(self, *tags):
+        """Decorate a Resource GET method whose response depends on the given tags"""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                store = self._store()
+                if store is None:
+                    return view(*args, **kwargs)
+
+                key = self._request_key()
+                entry = self._lookup(store, key)
+                if entry is None:
+                    generation = store.generation
+                    result = view(*args, **kwargs)
+                    data, status = result if isinstance(result, tuple) else (result, 200)
+                    if status != 200:
+                        return result
+                    body = dumps(data) + "\n"
+                    entry = (hashlib.sha256(body.encode('utf-8')).hexdigest(), body)
+                    self._save(store, key, entry, tags, generation)
+                return self._respond(*entry)
+            return wrapper
+        return decorator
+
+    def invalidate(self, *tags):
+        """Drop every cached response depending on any of the given tags"""
+        store = self._store()
+        if store is None:
+            return
+        with store.lock:
+            store.generation += 1
+            stale = [key for key, entry in store.entries.items() if entry[2] & set(tags)]
+            for key in stale:
+                del store.entries[key]
+
+    def clear(self):
+        """Drop every cached response"""
+        store = self._store()
+        if store is None:
+            return
+        with store.lock:
+            store.generation += 1
+            store.entries.clear()
+
+    @staticmethod
+    def _request_key():
+        """Identify a request by its path and sorted query arguments"""
+        args = sorted(request.args.items(multi=True))
+        return f"{request.path}?{urlencode(args)}"
+
+    @staticmethod
+    def _lookup(store, key):
+        """Return the fresh (etag, body) stored under key, if any"""
+        with store.lock:
+            entry = store.entries.get(key)
+            if entry is None:
+                return None
+            etag, body, _, stored_at = entry
+            if time.monotonic() - stored_at > store.ttl:
+                del store.entries[key]
+                return None
+            store.entries.move_to_end(key)
+            return etag, body
+
+    @staticmethod
+    def _save(store, key, entry, tags, generation):
+        """Store a rendered response unless a write happened while rendering it
+
+        Responses read from a replica shortly after a write of this process
+        are not stored either, as the replica may not have applied it yet.
+        """
+        if replica_reads_may_be_stale():
+            return
+        with store.lock:
+            if store.generation != generation:
+                return
+            store.entries[key] = (*entry, set(tags), time.monotonic())
+            store.entries.move_to_end(key)
+            while len(store.entries) > store.max_entries:
+                store.entries.popitem(last=False)
+
+    @staticmethod
+    def _respond(etag, body):
+        """Build the 200 response, or a 304 when the client already has it"""
+        response = Response(body, status=200, mimetype='application/json')
+        response.set_etag(etag)
+        return response.make_conditional(request)
@@ -0,0 +1,22 @@
+import click
+from flask.cli import with_appcontext
+from app.services import facade
+
+
+# Rebuild the denormalized rating aggregates of places from the review table
+@click.command('recompute-ratings')
+@click.option('--place-id', default=None, help='Only recompute this place (default: every place)')
+@with_appcontext
+def recompute_ratings_command(place_id):
+    """Recompute review_count, rating_sum and the star histogram of places"""
+    updated = facade.recompute_place_ratings(place_id)
+    click.echo(f"✓ Recomputed rating aggregates for {updated} place(s)")
+
+
+# Create or rebuild the full-text indexes of the place search
+@click.command('rebuild-search-index')
+@with_appcontext
+def rebuild_search_index_command():
+    """Create missing full-text indexes and rebuild the SQLite FTS5 tables"""
+    tables = facade.rebuild_search_index()
+    click.echo(f"✓ Rebuilt the full-text index of {', '.join(tables)}")
@@ -0,0 +1,142 @@
+import hashlib
+import random
+from datetime import datetime, timedelta
+from itertools import islice
+from app.database.generate_hash import generate_bcrypt_hash
+from app.models.place import Place
+
+USER_COLUMNS = ('id', 'first_name', 'last_name', 'email', 'password', 'is_admin', 'created_at', 'updated_at')
+AMENITY_COLUMNS = ('id', 'name', 'name_key', 'created_at', 'updated_at')
+PLACE_COLUMNS = ('id', 'title', 'description', 'price', 'latitude', 'longitude', 'grid_cell',
+                 'review_count', 'rating_sum', 'rating_1_count', 'rating_2_count', 'rating_3_count',
+                 'rating_4_count', 'rating_5_count', 'owner_id', 'created_at', 'updated_at')
+REVIEW_COLUMNS = ('id', 'text', 'rating', 'user_id', 'place_id', 'created_at', 'updated_at')
+PLACE_AMENITY_COLUMNS = ('place_id', 'amenity_id')
+
+FIRST_NAMES = ('Ada', 'Alan', 'Grace', 'Linus', 'Margaret', 'Dennis', 'Barbara', 'Ken', 'Frances', 'Guido')
+LAST_NAMES = ('Lovelace', 'Turing', 'Hopper', 'Torvalds', 'Hamilton', 'Ritchie', 'Liskov', 'Thompson')
+PLACE_KINDS = ('Studio', 'Apartment', 'Loft', 'Villa', 'Cabin', 'Chalet', 'Penthouse', 'Cottage', 'House')
+ADJECTIVES = ('Cozy', 'Modern', 'Charming', 'Quiet', 'Sunny', 'Spacious', 'Historic', 'Rustic', 'Bright')
+WORDS = ('view', 'beach', 'garden', 'kitchen', 'wifi', 'quiet', 'central', 'balcony', 'pool', 'parking',
+         'clean', 'friendly', 'host', 'cozy', 'bright', 'spacious', 'terrace', 'mountain', 'city', 'lake')
+# Latitude and longitude bounds of the generated places: Albania, as in the initial data
+REGION = (39.6, 19.3, 42.6, 21.0)
+# Places generated and inserted together with their reviews and amenity links
+PLACE_BATCH = 1000
+
+
+class SyntheticDataGenerator:
+    """Generate consistent users, amenities, places and reviews for test databases
+
+    Rows are produced lazily, so any volume can be streamed into a
+    ``BatchLoader`` without holding it in memory. Ids are derived from the
+    seed and the row number, so every row can refer to any other without a
+    lookup table and the same seed always gives the same database.
+
+    The generated data satisfies the constraints of the schema: unique
+    emails and amenity names, at most one review per user and place, no
+    review of one's own place, and place rating aggregates matching the
+    reviews. Every user has the same password.
+    """
+
+    def __init__(self, users=1000, places=10000, amenities=50, reviews_per_place=5, amenities_per_place=3,
+                 seed=0, password='password123'):
+        if min(users, places, amenities, reviews_per_place, amenities_per_place) < 0:
+            raise ValueError("Row counts must not be negative")
+        if places and not users:
+            raise ValueError("Places need at least one user to own them")
+        if reviews_per_place >= max(users, 1):
+            raise ValueError("reviews_per_place must be lower than users: reviewers are distinct non-owners")
+        if amenities_per_place > amenities:
+            raise ValueError("amenities_per_place must not exceed amenities")
+        self.user_count = users
+        self.place_count = places
+        self.amenity_count = amenities
+        self.reviews_per_place = reviews_per_place
+        self.amenities_per_place = amenities_per_place
+        self.seed = seed
+        self.password = password
+        self.now = datetime.utcnow().replace(microsecond=0)
+
+    def row_id(self, kind, index):
+        """Return the UUID4-formatted id of the index-th row of a kind
+
+        The last 48 bits hold the index, which keeps the ids of a kind
+        unique; the others are a hash of the seed, kind and index.
+        """
+        value = bytearray(hashlib.blake2b(f"{self.seed}:{kind}:{index}".encode(), digest_size=10).digest()
+                          + index.to_bytes(6, 'big'))
+        value[6] = value[6] & 0x0F | 0x40  # version 4
+        value[8] = value[8] & 0x3F | 0x80  # RFC 4122 variant
+        text = value.hex()
+        return f"{text[:8]}-{text[8:12]}-{text[12:16]}-{text[16:20]}-{text[20:]}"
+
+    def users(self):
+        """Yield user rows"""
+        password = generate_bcrypt_hash(self.password)
+        for i in range(self.user_count):
+            created_at = self.now - timedelta(minutes=self.user_count - i)
+            yield (self.row_id('user', i), FIRST_NAMES[i % len(FIRST_NAMES)], LAST_NAMES[i % len(LAST_NAMES)],
+                   f"user{i}@example.com", password, False, created_at, created_at)
+
+    def amenities(self):
+        """Yield amenity rows"""
+        for i in range(self.amenity_count):
+            yield self.row_id('amenity', i), f"Amenity {i}", f"amenity {i}", self.now, self.now
+
+    def places(self):
+        """Yield (place row, review rows, place_amenity rows) for every place"""
+        rng = random.Random(self.seed)
+        min_lat, min_lng, max_lat, max_lng = REGION
+        amenity_ids = [self.row_id('amenity', i) for i in range(self.amenity_count)]
+        for i in range(self.place_count):
+            place_id = self.row_id('place', i)
+            latitude = round(rng.uniform(min_lat, max_lat), 6)
+            longitude = round(rng.uniform(min_lng, max_lng), 6)
+            created_at = self.now - timedelta(seconds=self.place_count - i)
+            owner = i % self.user_count
+
+            reviews, star_counts = [], [0] * 5
+            for j in range(self.reviews_per_place):
+                # Reviewers follow the owner in the user list: distinct, never the owner
+                rating = rng.randint(1, 5)
+                star_counts[rating - 1] += 1
+                reviews.append((self.row_id('review', i * self.reviews_per_place + j),
+                                ' '.join(rng.choices(WORDS, k=8)).capitalize(), rating,
+                                self.row_id('user', (owner + 1 + j) % self.user_count), place_id,
+                                created_at, created_at))
+            links = [(place_id, amenity_id) for amenity_id in rng.sample(amenity_ids, self.amenities_per_place)]
+
+            place = (place_id, f"{rng.choice(ADJECTIVES)} {rng.choice(PLACE_KINDS)} {i}",
+                     ' '.join(rng.choices(WORDS, k=16)).capitalize(), float(rng.randint(1000, 50000)) / 100,
+                     latitude, longitude, Place.grid_cell_for(latitude, longitude),
+                     len(reviews), sum(review[2] for review in reviews), *star_counts,
+                     self.row_id('user', owner), created_at, created_at)
+            yield place, reviews, links
+
+    def load(self, loader, progress=None):
+        """Insert every generated row through a BatchLoader and return the row counts
+
+        Places are inserted in batches, each followed by its reviews and
+        amenity links, so foreign keys always point to rows already loaded.
+        ``progress`` is called with the number of places loaded so far.
+        """
+        counts = {
+            'user': loader.insert_rows('user', USER_COLUMNS, self.users()),
+            'amenity': loader.insert_rows('amenity', AMENITY_COLUMNS, self.amenities()),
+            'place': 0, 'review': 0, 'place_amenity': 0,
+        }
+        places = self.places()
+        while True:
+            batch = list(islice(places, PLACE_BATCH))
+            if not batch:
+                break
+            counts['place'] += loader.insert_rows('place', PLACE_COLUMNS, (place for place, _, _ in batch))
+            counts['review'] += loader.insert_rows(
+                'review', REVIEW_COLUMNS, (review for _, reviews, _ in batch for review in reviews))
+            counts['place_amenity'] += loader.insert_rows(
+                'place_amenity', PLACE_AMENITY_COLUMNS, (link for _, _, links in batch for link in links))
+            if progress is not None:
+                progress(counts['place'])
+        loader.commit()
+        return counts
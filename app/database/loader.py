@@ -0,0 +1,204 @@
+import csv
+import re
+
+# Tokens changing the state of the SQL scanner
+SQL_TOKEN = re.compile(r"--|#|/\*|\*/|[;'\"`\\]")
+# Single-statement INSERT ... VALUES whose rows can be appended to another
+INSERT_VALUES = re.compile(
+    r"^(INSERT\s+(?:IGNORE\s+)?INTO\s+[`\w.]+\s*(?:\([^)]*\))?\s*VALUES)\s*(\(.*\))$", re.IGNORECASE | re.DOTALL)
+# CSV field standing for NULL, as written by MySQL's SELECT ... INTO OUTFILE
+CSV_NULL = '\\N'
+
+
+def split_sql_statements(lines):
+    """Yield the statements of SQL text read line by line
+
+    Semicolons end a statement only outside string literals, quoted
+    identifiers and comments. Comments (``-- ``, ``#`` and ``/* */``) are
+    dropped. Strings may escape quotes with a backslash or by doubling them.
+    """
+    statement = []  # Text of the current statement read so far
+    quote = None  # Quote character of the open literal or identifier
+    in_comment = False  # Inside a /* */ comment
+    for line in lines:
+        pos = 0  # Start of the text not yet added to the statement
+        skip_until = 0  # End of the last escape sequence
+        for match in SQL_TOKEN.finditer(line):
+            token, start, end = match.group(), match.start(), match.end()
+            if start < skip_until:
+                continue
+            if in_comment:
+                if token == '*/':
+                    in_comment = False
+                    pos = end
+            elif quote:
+                if token == '\\' and quote != '`':
+                    skip_until = end + 1
+                elif token == quote:
+                    if line[end:end + 1] == quote:
+                        skip_until = end + 1
+                    else:
+                        quote = None
+            elif token in ("'", '"', '`'):
+                quote = token
+            elif token == ';':
+                statement.append(line[pos:start])
+                text = ''.join(statement).strip()
+                if text:
+                    yield text
+                statement = []
+                pos = end
+            elif token == '/*':
+                statement.append(line[pos:start] + ' ')
+                in_comment = True
+            elif token == '#' or (token == '--' and line[end:end + 1] in ('', ' ', '\t', '\r', '\n')):
+                statement.append(line[pos:start] + '\n')
+                pos = len(line)
+                break
+        if not in_comment:
+            statement.append(line[pos:])
+    text = ''.join(statement).strip()
+    if text and not in_comment:
+        yield text
+
+
+class BatchLoader:
+    """Load SQL scripts and CSV files through a DB-API connection in batches
+
+    SQL scripts are read as a stream of statements. Consecutive INSERTs
+    into the same columns are merged into one multi-row INSERT of up to
+    ``batch_rows`` statements or ``max_statement_bytes`` bytes, so a dump
+    written one row per statement still loads a batch per round trip.
+    CSV files and generated rows are inserted with multi-row INSERTs of
+    ``batch_rows`` rows. The loader commits every ``commit_rows`` rows and
+    once at the end, keeping transactions short on multi-million-row loads.
+
+    ``placeholder`` is the parameter marker of the driver: ``%s`` for
+    mysql-connector and PyMySQL, ``?`` for sqlite3.
+    """
+
+    def __init__(self, connection, batch_rows=1000, commit_rows=50000, placeholder='%s',
+                 max_statement_bytes=1024 * 1024):
+        if batch_rows < 1 or commit_rows < 1:
+            raise ValueError("batch_rows and commit_rows must be positive")
+        self.connection = connection
+        self.cursor = connection.cursor()
+        self.batch_rows = batch_rows
+        self.commit_rows = commit_rows
+        self.placeholder = placeholder
+        self.max_statement_bytes = max_statement_bytes
+        self.statements = 0  # Statements sent to the server
+        self.rows = 0  # Rows or statements loaded
+        self._uncommitted = 0
+
+    # ==================== SQL SCRIPTS ====================
+    def execute_sql_file(self, file_path):
+        """Run every statement of a SQL file and return the number of statements read"""
+        with open(file_path, 'r', encoding='utf-8') as sql_file:
+            return self.execute_sql(sql_file)
+
+    def execute_sql(self, lines):
+        """Run the statements of SQL text read line by line, merging consecutive INSERTs"""
+        count = 0
+        head, values, size = None, [], 0
+        for statement in split_sql_statements(lines):
+            count += 1
+            match = INSERT_VALUES.match(statement)
+            if match and 'ON DUPLICATE KEY' in match.group(2).upper():
+                match = None
+            if match and head is not None and match.group(1).upper() == head.upper() \
+                    and len(values) < self.batch_rows and size + len(match.group(2)) < self.max_statement_bytes:
+                values.append(match.group(2))
+                size += len(match.group(2)) + 1
+                continue
+            self._execute_insert(head, values)
+            if match:
+                head, values, size = match.group(1), [match.group(2)], len(statement)
+            else:
+                head, values, size = None, [], 0
+                self._execute(statement)
+                self._loaded(1)
+        self._execute_insert(head, values)
+        self.commit()
+        return count
+
+    def _execute_insert(self, head, values):
+        """Send the merged rows of consecutive INSERT statements"""
+        if values:
+            self._execute(f"{head} {', '.join(values)}")
+            self._loaded(len(values))
+
+    # ==================== ROWS AND CSV FILES ====================
+    def insert_rows(self, table, columns, rows):
+        """Insert an iterable of row tuples with multi-row INSERTs, return the row count"""
+        columns = list(columns)
+        row_marks = f"({', '.join([self.placeholder] * len(columns))})"
+        head = f"INSERT INTO {self._quote(table)} ({', '.join(self._quote(column) for column in columns)}) VALUES "
+        full_batch_sql = head + ', '.join([row_marks] * self.batch_rows)
+
+        count = 0
+        batch = []
+        for row in rows:
+            if len(row) != len(columns):
+                raise ValueError(f"Row {count + len(batch) + 1} of {table} has {len(row)} values, "
+                                 f"expected {len(columns)}")
+            batch.extend(row)
+            if len(batch) == len(columns) * self.batch_rows:
+                self._execute(full_batch_sql, batch)
+                self._loaded(self.batch_rows)
+                count += self.batch_rows
+                batch = []
+        if batch:
+            remaining = len(batch) // len(columns)
+            self._execute(head + ', '.join([row_marks] * remaining), batch)
+            self._loaded(remaining)
+            count += remaining
+        return count
+
+    def load_csv_file(self, table, file_path):
+        """Insert the rows of a CSV file whose header names the columns, return the row count"""
+        with open(file_path, 'r', encoding='utf-8', newline='') as csv_file:
+            return self.load_csv(table, csv_file)
+
+    def load_csv(self, table, csv_file):
+        """Insert the rows of an open CSV file, reading ``\\N`` fields as NULL"""
+        reader = csv.reader(csv_file)
+        columns = next(reader, None)
+        if not columns:
+            raise ValueError(f"CSV data for {table} has no header row")
+        rows = (tuple(None if field == CSV_NULL else field for field in row) for row in reader if row)
+        count = self.insert_rows(table, columns, rows)
+        self.commit()
+        return count
+
+    # ==================== TRANSACTIONS ====================
+    def commit(self):
+        """Commit the rows loaded since the last commit"""
+        self.connection.commit()
+        self._uncommitted = 0
+
+    def close(self):
+        """Commit pending rows and close the cursor"""
+        self.commit()
+        self.cursor.close()
+
+    def _execute(self, statement, params=None):
+        if params is None:
+            self.cursor.execute(statement)
+        else:
+            self.cursor.execute(statement, params)
+        self.statements += 1
+
+    def _loaded(self, rows):
+        """Count loaded rows and commit once a full commit batch is pending"""
+        self.rows += rows
+        self._uncommitted += rows
+        if self._uncommitted >= self.commit_rows:
+            self.commit()
+
+    @staticmethod
+    def _quote(identifier):
+        """Quote a table or column name, which must be a plain identifier"""
+        if not re.fullmatch(r'\w+', identifier):
+            raise ValueError(f"Invalid identifier: {identifier!r}")
+        return f"`{identifier}`"
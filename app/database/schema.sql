@@ -27,6 +27,14 @@ CREATE TABLE place (
     price DECIMAL(10, 2) NOT NULL,
     latitude FLOAT,
     longitude FLOAT,
+    grid_cell INT NOT NULL,
+    review_count INT NOT NULL DEFAULT 0,
+    rating_sum INT NOT NULL DEFAULT 0,
+    rating_1_count INT NOT NULL DEFAULT 0,
+    rating_2_count INT NOT NULL DEFAULT 0,
+    rating_3_count INT NOT NULL DEFAULT 0,
+    rating_4_count INT NOT NULL DEFAULT 0,
+    rating_5_count INT NOT NULL DEFAULT 0,
     owner_id CHAR(36) NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
@@ -37,6 +45,7 @@ CREATE TABLE place (
 CREATE TABLE amenity (
     id CHAR(36) PRIMARY KEY,
     name VARCHAR(255) NOT NULL UNIQUE,
+    name_key VARCHAR(255) NOT NULL UNIQUE,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
 );
@@ -67,7 +76,15 @@ CREATE TABLE place_amenity (
 
 -- Create indexes for better query performance
 CREATE INDEX idx_place_owner_id ON place(owner_id);
+CREATE INDEX idx_place_created_at_id ON place(created_at, id);
+CREATE INDEX idx_place_price_id ON place(price, id);
+CREATE INDEX idx_place_grid_cell ON place(grid_cell, latitude, longitude);
 CREATE INDEX idx_review_user_id ON review(user_id);
-CREATE INDEX idx_review_place_id ON review(place_id);
+CREATE INDEX idx_review_place_created_at ON review(place_id, created_at, id);
+CREATE INDEX idx_review_place_rating ON review(place_id, rating, created_at, id);
 CREATE INDEX idx_place_amenity_place_id ON place_amenity(place_id);
 CREATE INDEX idx_place_amenity_amenity_id ON place_amenity(amenity_id);
+
+-- Full-text indexes of the place search (GET /api/v1/places/search?q=)
+CREATE FULLTEXT INDEX ft_place ON place(title, description);
+CREATE FULLTEXT INDEX ft_review ON review(text);
@@ -1,14 +1,21 @@
+import argparse
+import time
 import mysql.connector
 import os
 from pathlib import Path
+from app.database.loader import BatchLoader
+from app.database.generate_data import SyntheticDataGenerator
 
 class DatabaseSetup:
-    def __init__(self, host='localhost', user='root', password='', database='hbnb_db'):
+    def __init__(self, host='localhost', user='root', password='', database='hbnb_db',
+                 batch_rows=1000, commit_rows=50000):
         """Initialize database connection parameters"""
         self.host = host
         self.user = user
         self.password = password
         self.database = database
+        self.batch_rows = batch_rows  # rows per multi-row INSERT
+        self.commit_rows = commit_rows  # rows per transaction
         self.connection = None
         self.cursor = None
     
@@ -45,24 +52,59 @@ class DatabaseSetup:
             print(f"✗ Error selecting database: {err}")
             raise
     
+    def loader(self):
+        """Return a batch loader on the current connection"""
+        return BatchLoader(self.connection, batch_rows=self.batch_rows, commit_rows=self.commit_rows)
+
     def execute_sql_file(self, file_path):
-        """Execute SQL commands from a file"""
+        """Execute SQL commands from a file
+
+        The file is streamed statement by statement, consecutive INSERTs are
+        sent as multi-row INSERTs and rows are committed in batches.
+        """
         try:
-            with open(file_path, 'r') as sql_file:
-                sql_commands = sql_file.read()
-            
-            # Split by semicolon and execute each statement
-            statements = sql_commands.split(';')
-            for statement in statements:
-                statement = statement.strip()
-                if statement:
-                    self.cursor.execute(statement)
-            
-            self.connection.commit()
-            print(f"✓ Successfully executed SQL file: {file_path}")
+            loader = self.loader()
+            count = loader.execute_sql_file(file_path)
+            loader.close()
+            print(f"✓ Successfully executed SQL file: {file_path} "
+                  f"({count} statements in {loader.statements} round trips)")
         except Exception as err:
             print(f"✗ Error executing SQL file {file_path}: {err}")
             raise
+
+    def load_csv_file(self, table, file_path):
+        """Insert the rows of a CSV file whose header names the table columns"""
+        try:
+            loader = self.loader()
+            count = loader.load_csv_file(table, file_path)
+            loader.close()
+            print(f"✓ Loaded {count} rows into {table} from {file_path}")
+        except Exception as err:
+            print(f"✗ Error loading CSV file {file_path}: {err}")
+            raise
+
+    def generate_data(self, generator):
+        """Insert synthetic users, amenities, places and reviews
+
+        The generated rows are consistent by construction, so foreign key
+        and unique checks are suspended while they load.
+        """
+        print(f"\n--- Generating {generator.place_count} places ---")
+        start = time.perf_counter()
+        self.cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+        self.cursor.execute("SET UNIQUE_CHECKS = 0")
+        try:
+            loader = self.loader()
+            counts = generator.load(loader, progress=lambda places: print(
+                f"  {places}/{generator.place_count} places", end='\r', flush=True))
+            loader.close()
+        finally:
+            self.cursor.execute("SET UNIQUE_CHECKS = 1")
+            self.cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+        elapsed = time.perf_counter() - start
+        total = sum(counts.values())
+        print(f"✓ Generated {total} rows in {elapsed:.1f}s ({total / max(elapsed, 1e-9):.0f} rows/s): "
+              + ', '.join(f"{count} {table}" for table, count in counts.items()))
     
     def test_crud_operations(self):
         """Test CRUD operations on the created schema"""
@@ -162,16 +204,40 @@ class DatabaseSetup:
             self.connection.close()
         print("✓ Database connection closed")
 
+def parse_args():
+    """Read the connection settings and the optional data to load"""
+    parser = argparse.ArgumentParser(description="Create the HBnB schema and load its data")
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--user', default='root')
+    parser.add_argument('--password', default='root')
+    parser.add_argument('--database', default='hbnb_db')
+    parser.add_argument('--batch-rows', type=int, default=1000, help='rows per multi-row INSERT')
+    parser.add_argument('--commit-rows', type=int, default=50000, help='rows per transaction')
+    parser.add_argument('--csv', action='append', default=[], metavar='TABLE=PATH',
+                        help='load a CSV file with a header row into a table (repeatable)')
+    parser.add_argument('--places', type=int, default=0, help='synthetic places to generate')
+    parser.add_argument('--users', type=int, default=1000, help='synthetic users owning and reviewing them')
+    parser.add_argument('--amenities', type=int, default=50, help='synthetic amenities')
+    parser.add_argument('--reviews-per-place', type=int, default=5)
+    parser.add_argument('--amenities-per-place', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0, help='random seed of the synthetic data')
+    parser.add_argument('--skip-checks', action='store_true', help='skip the schema display and CRUD tests')
+    return parser.parse_args()
+
+
 def main():
+    args = parse_args()
     # Get the directory where this script is located
     script_dir = Path(__file__).parent
     
     # Initialize database setup
     db_setup = DatabaseSetup(
-        host='localhost',
-        user='root',
-        password='root',
-        database='hbnb_db'
+        host=args.host,
+        user=args.user,
+        password=args.password,
+        database=args.database,
+        batch_rows=args.batch_rows,
+        commit_rows=args.commit_rows
     )
     
     try:
@@ -193,12 +259,27 @@ def main():
             db_setup.execute_sql_file(str(initial_data_file))
         else:
             print(f"✗ Initial data file not found: {initial_data_file}")
-        
-        # Display table structure
-        db_setup.display_table_structure()
-        
-        # Test CRUD operations
-        db_setup.test_crud_operations()
+
+        # Load CSV fixtures and synthetic data
+        for csv_arg in args.csv:
+            table, _, csv_path = csv_arg.partition('=')
+            db_setup.load_csv_file(table, csv_path)
+        if args.places:
+            db_setup.generate_data(SyntheticDataGenerator(
+                users=args.users,
+                places=args.places,
+                amenities=args.amenities,
+                reviews_per_place=args.reviews_per_place,
+                amenities_per_place=args.amenities_per_place,
+                seed=args.seed
+            ))
+
+        if not args.skip_checks:
+            # Display table structure
+            db_setup.display_table_structure()
+
+            # Test CRUD operations
+            db_setup.test_crud_operations()
         
     except Exception as err:
         print(f"Setup failed: {err}")
@@ -28,15 +28,15 @@ SELECT 'place_amenity', COUNT(*) FROM place_amenity;
 -- VALUES (UUID(), 'John', 'Doe', 'john@example.com', 'hashedpassword123', FALSE);
 
 -- 2. Insert a place (requires valid owner_id)
--- INSERT INTO place (id, title, description, price, latitude, longitude, owner_id)
--- VALUES (UUID(), 'Beautiful Beach House', 'A cozy beach house', 150.00, 40.7128, -74.0060, '36c9050e-ddd3-4c3b-9731-9f487208bbc1');
+-- INSERT INTO place (id, title, description, price, latitude, longitude, grid_cell, owner_id)
+-- VALUES (UUID(), 'Beautiful Beach House', 'A cozy beach house', 150.00, 40.7128, -74.0060, 4706259, '36c9050e-ddd3-4c3b-9731-9f487208bbc1');
 
 -- ===== UPDATE OPERATIONS (uncomment to test) =====
 -- 1. Update user name
 -- UPDATE user SET first_name = 'Jane' WHERE email = 'john@example.com';
 
 -- 2. Update amenity name
--- UPDATE amenity SET name = 'High-Speed WiFi' WHERE name = 'WiFi';
+-- UPDATE amenity SET name = 'High-Speed WiFi', name_key = 'high-speed wifi' WHERE name = 'WiFi';
 
 -- ===== DELETE OPERATIONS (uncomment to test) =====
 -- 1. Delete a user (be careful with foreign keys!)
@@ -0,0 +1,39 @@
+import json
+from flask import current_app, make_response
+
+try:
+    import orjson
+except ImportError:  # Optional: fall back to the standard library encoder
+    orjson = None
+
+
+def dumps(data, indent=False):
+    """Encode data as a JSON string, with orjson when it is installed
+
+    orjson encodes several times faster than the json module and writes
+    compact JSON. Both encoders turn datetimes into ISO 8601 strings.
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(data, option=option).decode('utf-8')
+    if indent:
+        return json.dumps(data, indent=2, default=_default)
+    return json.dumps(data, separators=(',', ':'), default=_default)
+
+
+def _default(value):
+    """Encode the values the json module does not know, as orjson does"""
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def output_json(data, code, headers=None):
+    """Flask-RESTX representation of JSON responses using the fast encoder
+
+    Like the default representation, the body is indented in debug mode
+    and ends with a newline.
+    """
+    response = make_response(dumps(data, indent=current_app.debug) + "\n", code)
+    response.headers.extend(headers or {})
+    return response
@@ -1,7 +1,17 @@
-from flask_bcrypt import Bcrypt
 from flask_jwt_extended import JWTManager
 from flask_sqlalchemy import SQLAlchemy
+from app.cache import ResponseCache
+from app.passwords import PasswordHasher
+from app.profiling import RequestProfiler
+from app.persistence.amenity_index import AmenityIndex
+from app.persistence.entity_cache import EntityCache
+from app.persistence.replicas import ReplicaRouter, RoutingSession
 
-bcrypt = Bcrypt()
 jwt = JWTManager()
-db = SQLAlchemy()
\ No newline at end of file
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+response_cache = ResponseCache()
+password_hasher = PasswordHasher()
+entity_cache = EntityCache()
+amenity_index = AmenityIndex()
+replica_router = ReplicaRouter()
+request_profiler = RequestProfiler()
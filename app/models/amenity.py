@@ -1,11 +1,14 @@
 from app.models.base_model import BaseModel
 from app.extensions import db
+from sqlalchemy.orm import validates
 
 class Amenity(BaseModel):
     """Amenity model for database persistence"""
     __tablename__ = 'amenity'
 
     name = db.Column(db.String(50), nullable=False, unique=True)
+    # Lower-cased name backing the case-insensitive uniqueness check
+    name_key = db.Column(db.String(50), nullable=False, unique=True)
 
     def __init__(self, name):
         """Initialize a new amenity with a validated name"""
@@ -19,3 +22,15 @@ class Amenity(BaseModel):
         if len(name) > 50:
             raise ValueError("Amenity name must not exceed 50 characters")
         return name
+
+    @staticmethod
+    def normalize_name(name):
+        """Return the lookup key used for case-insensitive name comparisons"""
+        return name.lower()
+
+    @validates('name')
+    def validate_name_sqlalchemy(self, key, name):
+        """SQLAlchemy validator keeping name_key in sync with the name"""
+        name = self.validate_name(name)
+        self.name_key = self.normalize_name(name)
+        return name
@@ -1,4 +1,5 @@
 from app.extensions import db
+from app.persistence.unit_of_work import transaction
 import uuid
 from datetime import datetime
 
@@ -11,9 +12,9 @@ class BaseModel(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
     def save(self):
-        """Update the updated_at timestamp whenever the object is modified"""
-        self.updated_at = datetime.utcnow()
-        db.session.commit()
+        """Update the updated_at timestamp and commit, or join the current unit of work"""
+        with transaction():
+            self.updated_at = datetime.utcnow()
 
     def update(self, data):
         """Update the attributes of the object based on the provided dictionary"""
@@ -1,23 +1,46 @@
 from app.models.base_model import BaseModel
 from app.models.place_amenity import place_amenity
+from app.models.search_index import full_text_index
 from app.extensions import db
+from sqlalchemy.orm import validates
+
+# Size in degrees of the square cells of the spatial grid index
+GRID_CELL_DEGREES = 0.1
+GRID_ROWS = int(180 / GRID_CELL_DEGREES)
+GRID_COLUMNS = int(360 / GRID_CELL_DEGREES)
 
 class Place(BaseModel):
     """Place model for database persistence"""
     __tablename__ = 'place'
+    __table_args__ = (
+        db.Index('idx_place_created_at_id', 'created_at', 'id'),
+        db.Index('idx_place_price_id', 'price', 'id'),
+        db.Index('idx_place_grid_cell', 'grid_cell', 'latitude', 'longitude'),
+    )
 
     title = db.Column(db.String(100), nullable=False)
     description = db.Column(db.String(500))
     price = db.Column(db.Float, nullable=False)
     latitude = db.Column(db.Float, nullable=False)
     longitude = db.Column(db.Float, nullable=False)
+    # Row-major number of the grid cell containing the coordinates
+    grid_cell = db.Column(db.Integer, nullable=False)
+
+    # Denormalized rating aggregates maintained alongside review writes
+    review_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_sum = db.Column(db.Integer, nullable=False, default=0)
+    rating_1_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_2_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_3_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_4_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_5_count = db.Column(db.Integer, nullable=False, default=0)
 
         # Foreign key for owner relationship
-    owner_id = db.Column(db.String(36), db.ForeignKey('user.id'), nullable=False)
+    owner_id = db.Column(db.String(36), db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
 
-    # Relationships
-    owner = db.relationship('User', backref='places', lazy=True)
-    amenities = db.relationship('Amenity', secondary=place_amenity, lazy='subquery',
+    # Relationships; user.places is write-only, places are read through PlaceRepository queries
+    owner = db.relationship('User', lazy=True, backref=db.backref('places', lazy='write_only', passive_deletes=True))
+    amenities = db.relationship('Amenity', secondary=place_amenity, lazy='selectin',
                             backref=db.backref('places', lazy=True))
 
 
@@ -31,7 +54,6 @@ class Place(BaseModel):
         self.longitude = self.validate_longitude(longitude)
         if owner:
             self.owner = owner
-        self.reviews = []
 
     def validate_title(self, title):
         """Validate that the title is a non-empty string within length limits"""
@@ -65,12 +87,74 @@ class Place(BaseModel):
             raise ValueError("Longitude must be between -180.0 and 180.0")
         return float(longitude)
 
+    @staticmethod
+    def grid_row(latitude):
+        """Return the grid row containing the given latitude"""
+        return min(int((latitude + 90.0) / GRID_CELL_DEGREES), GRID_ROWS - 1)
+
+    @staticmethod
+    def grid_column(longitude):
+        """Return the grid column containing the given longitude"""
+        return min(int((longitude + 180.0) / GRID_CELL_DEGREES), GRID_COLUMNS - 1)
+
+    @classmethod
+    def grid_cell_for(cls, latitude, longitude):
+        """Return the grid cell number containing the given coordinates"""
+        return cls.grid_row(latitude) * GRID_COLUMNS + cls.grid_column(longitude)
+
+    @validates('latitude', 'longitude')
+    def validate_coordinates_sqlalchemy(self, key, value):
+        """SQLAlchemy validator keeping grid_cell in sync with the coordinates"""
+        if key == 'latitude':
+            value = self.validate_latitude(value)
+            latitude, longitude = value, self.longitude
+        else:
+            value = self.validate_longitude(value)
+            latitude, longitude = self.latitude, value
+        if latitude is not None and longitude is not None:
+            self.grid_cell = self.grid_cell_for(latitude, longitude)
+        return value
+
+    @property
+    def average_rating(self):
+        """Return the mean rating of the place, or None without reviews"""
+        if not self.review_count:
+            return None
+        return round(self.rating_sum / self.review_count, 2)
+
+    @property
+    def rating_histogram(self):
+        """Return the number of reviews per star rating"""
+        return {str(star): getattr(self, f'rating_{star}_count') or 0 for star in range(1, 6)}
+
+    def apply_rating_change(self, added=None, removed=None):
+        """Adjust the rating aggregates for a rating added to and/or removed from the place
+
+        The new values are SQL expressions relative to the stored ones, so
+        concurrent reviews cannot overwrite each other's increments. Call it
+        once per place per flush: a second call would replace the first.
+        """
+        deltas = {
+            'review_count': (added is not None) - (removed is not None),
+            'rating_sum': (added or 0) - (removed or 0),
+        }
+        if added != removed:
+            if added is not None:
+                deltas[f'rating_{added}_count'] = 1
+            if removed is not None:
+                deltas[f'rating_{removed}_count'] = -1
+
+        cls = type(self)
+        for column, delta in deltas.items():
+            if delta:
+                setattr(self, column, getattr(cls, column) + delta)
+
     def add_review(self, review):
-        """Add a review to the place"""
+        """Add a review to the place without loading its other reviews"""
         from app.models.review import Review
         if not isinstance(review, Review):
             raise ValueError("Review must be a valid Review instance")
-        self.reviews.append(review)
+        self.reviews.add(review)
 
     def add_amenity(self, amenity):
         """Add an amenity to the place"""
@@ -79,3 +163,7 @@ class Place(BaseModel):
             raise ValueError("Amenity must be a valid Amenity instance")
         if amenity not in self.amenities:
             self.amenities.append(amenity)
+
+
+# Text searched by GET /api/v1/places/search?q=
+full_text_index(Place.__table__, 'title', 'description')
@@ -1,20 +1,30 @@
 from app.models.base_model import BaseModel
+from app.models.search_index import full_text_index
 from app.extensions import db
 
 class Review(BaseModel):
     """Review model for database persistence"""
     __tablename__ = 'review'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'place_id', name='unique_user_place_review'),
+        # Pages of a place's reviews, newest or oldest first, and by rating
+        db.Index('idx_review_place_created_at', 'place_id', 'created_at', 'id'),
+        db.Index('idx_review_place_rating', 'place_id', 'rating', 'created_at', 'id'),
+    )
 
     text = db.Column(db.String(500), nullable=False)
     rating = db.Column(db.Integer, nullable=False)
 
         # Foreign keys
-    user_id = db.Column(db.String(36), db.ForeignKey('user.id'), nullable=False)
-    place_id = db.Column(db.String(36), db.ForeignKey('place.id'), nullable=False)
+    user_id = db.Column(db.String(36), db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
+    place_id = db.Column(db.String(36), db.ForeignKey('place.id', ondelete='CASCADE'), nullable=False)
 
-    # Relationships
-    user = db.relationship('User', backref='reviews', lazy=True)
-    place = db.relationship('Place', backref='reviews', lazy=True)
+    # Relationships; user.reviews and place.reviews are write-only: they are
+    # never loaded in full, reviews are read through ReviewRepository queries
+    user = db.relationship('User', lazy=True,
+                           backref=db.backref('reviews', lazy='write_only', passive_deletes=True))
+    place = db.relationship('Place', lazy=True,
+                            backref=db.backref('reviews', lazy='write_only', passive_deletes=True))
 
 
     def __init__(self, text, rating, place=None, user=None):
@@ -51,3 +61,7 @@ class Review(BaseModel):
                 value = self.validate_text(value)
             setattr(self, key, value)
         self.save()
+
+
+# Text searched by GET /api/v1/places/search?q=
+full_text_index(Review.__table__, 'text')
@@ -0,0 +1,67 @@
+from sqlalchemy import DDL, event, inspect, text
+from app.extensions import db
+
+# Columns of each table covered by its full-text index
+FULL_TEXT_COLUMNS = {}
+
+
+def fts_table(table_name):
+    """Name of the SQLite FTS5 table indexing a table"""
+    return f"{table_name}_fts"
+
+
+def full_text_index(table, *columns):
+    """Declare the full-text index of a table's text columns
+
+    MySQL gets a FULLTEXT index. SQLite has none, so an FTS5 table reading
+    its content from the indexed table is created with it, and triggers
+    keep it in step with every insert, delete and update of the columns.
+    """
+    FULL_TEXT_COLUMNS[table.name] = columns
+    db.Index(f'ft_{table.name}', *(table.c[column] for column in columns),
+             mysql_prefix='FULLTEXT').ddl_if(dialect='mysql')
+    for statement in sqlite_fts_statements(table.name, columns):
+        event.listen(table, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+    event.listen(table, 'before_drop',
+                 DDL(f"DROP TABLE IF EXISTS {fts_table(table.name)}").execute_if(dialect='sqlite'))
+
+
+def sqlite_fts_statements(table_name, columns):
+    """Return the statements creating the FTS5 table of a table and its triggers"""
+    fts = fts_table(table_name)
+    names = ', '.join(columns)
+    new = ', '.join(f"new.{column}" for column in columns)
+    old = ', '.join(f"old.{column}" for column in columns)
+    insert = f"INSERT INTO {fts}(rowid, {names}) VALUES (new.rowid, {new});"
+    delete = f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.rowid, {old});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({names}, content='{table_name}', "
+        f"tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER IF NOT EXISTS {table_name}_fts_insert AFTER INSERT ON {table_name} BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {table_name}_fts_delete AFTER DELETE ON {table_name} BEGIN {delete} END",
+        f"CREATE TRIGGER IF NOT EXISTS {table_name}_fts_update AFTER UPDATE OF {names} ON {table_name} "
+        f"BEGIN {delete} {insert} END",
+    ]
+
+
+def rebuild_full_text_indexes(connection):
+    """Create the missing full-text indexes of a database and rebuild the SQLite ones
+
+    Used on databases created before the indexes existed, and on SQLite
+    after a VACUUM, which may renumber the rowids the FTS5 tables refer to.
+    """
+    dialect = connection.dialect.name
+    for table_name, columns in FULL_TEXT_COLUMNS.items():
+        if dialect == 'mysql':
+            existing = {index['name'] for index in inspect(connection).get_indexes(table_name)}
+            if f'ft_{table_name}' not in existing:
+                connection.execute(text(f"ALTER TABLE {table_name} ADD FULLTEXT INDEX ft_{table_name} "
+                                        f"({', '.join(columns)})"))
+        elif dialect == 'sqlite':
+            for statement in sqlite_fts_statements(table_name, columns):
+                connection.execute(text(statement))
+            fts = fts_table(table_name)
+            connection.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+        else:
+            raise ValueError(f"Full-text search is not available on {dialect}")
+    return list(FULL_TEXT_COLUMNS)
@@ -1,5 +1,5 @@
 from app.models.base_model import BaseModel
-from app.extensions import db, bcrypt
+from app.extensions import db, password_hasher
 import re
 from sqlalchemy.orm import validates
 
@@ -79,12 +79,16 @@ class User(BaseModel):
 
     def hash_password(self, password):
         """Hash the password before storing it"""
-        self.password = bcrypt.generate_password_hash(password).decode('utf-8')
+        self.password = password_hasher.hash(password)
 
     def verify_password(self, password):
         """Verify the hashed password"""
-        return bcrypt.check_password_hash(self.password, password)
+        return password_hasher.verify(self.password, password)
+
+    def password_needs_rehash(self):
+        """Check whether the stored hash uses a different bcrypt work factor than configured"""
+        return password_hasher.needs_rehash(self.password)
 
     def add_place(self, place):
-        """Add a place to the user's list of places"""
-        self.places.append(place)
+        """Add a place to the user's places without loading the others"""
+        self.places.add(place)
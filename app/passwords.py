@@ -0,0 +1,70 @@
+import threading
+from contextlib import contextmanager
+import bcrypt as bcrypt_lib
+from flask import current_app, has_app_context
+
+
+class PasswordHasher:
+    """Runs bcrypt hashing and verification, at most ``BCRYPT_POOL_SIZE`` at once
+
+    bcrypt releases the GIL while it works, so hashes in several request
+    threads use several cores. Each hash still runs in, and blocks, the
+    calling thread; the per-application semaphore only caps how many run
+    at once, so during a login storm the other requests find a free core
+    and the excess logins wait for a slot. The work factor comes from
+    ``BCRYPT_LOG_ROUNDS``.
+    """
+
+    def __init__(self, app=None):
+        # Outside an application context, e.g. in scripts
+        self._default_slots = threading.BoundedSemaphore(4)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read the work factor and create the hashing slots of an application"""
+        app.config.setdefault('BCRYPT_LOG_ROUNDS', 12)
+        app.config.setdefault('BCRYPT_POOL_SIZE', 4)
+        app.extensions['password_hasher'] = threading.BoundedSemaphore(app.config['BCRYPT_POOL_SIZE'])
+
+    def _rounds(self):
+        """Return the configured bcrypt work factor"""
+        if has_app_context():
+            return current_app.config['BCRYPT_LOG_ROUNDS']
+        return 12
+
+    @contextmanager
+    def _slot(self):
+        """Wait for one of the current application's hashing slots"""
+        slots = current_app.extensions['password_hasher'] if has_app_context() else self._default_slots
+        with slots:
+            yield
+
+    def hash(self, password):
+        """Hash a password with the configured work factor"""
+        salt = bcrypt_lib.gensalt(self._rounds())
+        with self._slot():
+            hashed = bcrypt_lib.hashpw(password.encode('utf-8'), salt)
+        return hashed.decode('utf-8')
+
+    def verify(self, hashed, password):
+        """Check a password against a stored bcrypt hash"""
+        if not hashed:
+            return False
+        try:
+            with self._slot():
+                return bcrypt_lib.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+        except ValueError:
+            return False
+
+    @staticmethod
+    def cost_of(hashed):
+        """Return the work factor stored in a bcrypt hash ($2b$<cost>$...)"""
+        try:
+            return int(hashed.split('$')[2])
+        except (AttributeError, IndexError, ValueError):
+            return None
+
+    def needs_rehash(self, hashed):
+        """Tell whether a stored hash uses a different work factor than configured"""
+        return self.cost_of(hashed) != self._rounds()
@@ -1,3 +1,5 @@
+from sqlalchemy import select
+from app.extensions import db
 from app.persistence.repository import SQLAlchemyRepository
 
 
@@ -9,5 +11,11 @@ class AmenityRepository(SQLAlchemyRepository):
         super().__init__(Amenity)
 
     def get_amenity_by_name(self, name):
-        """Retrieve an amenity by its name"""
-        return self.model.query.filter_by(name=name).first()
+        """Retrieve an amenity by its name, ignoring case, with one indexed lookup"""
+        return self.model.query.filter_by(name_key=self.model.normalize_name(name)).first()
+
+    def get_existing_name_keys(self, name_keys):
+        """Return the subset of the given normalized names already taken"""
+        if not name_keys:
+            return set()
+        return set(db.session.scalars(select(self.model.name_key).where(self.model.name_key.in_(name_keys))))
@@ -0,0 +1,184 @@
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from app.persistence.replicas import replica_reads_may_be_stale
+
+# Keys of the cache bookkeeping kept in the session's info dictionary
+EVICTED_KEY = 'entity_cache_evicted'
+TAINTED_KEY = 'entity_cache_tainted'
+
+
+class _ModelCache:
+    """LRU storage of the column values of one model's rows"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.entries = OrderedDict()  # id -> (column values, stored_at)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+
+class EntityCache:
+    """Read-through cache of the committed column values of rows loaded by primary key"""
+
+    def __init__(self, app=None):
+        self._listening = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Create the per-model storage of an application from its configuration"""
+        app.config.setdefault('ENTITY_CACHE_ENABLED', False)
+        app.config.setdefault('ENTITY_CACHE_TTL', 60)
+        app.config.setdefault('ENTITY_CACHE_SIZES', {})
+        app.extensions['entity_cache'] = {
+            model_name: _ModelCache(capacity)
+            for model_name, capacity in app.config['ENTITY_CACHE_SIZES'].items()
+        }
+        if not self._listening:
+            event.listen(Session, 'after_flush', self._after_flush)
+            event.listen(Session, 'after_commit', self._after_commit)
+            event.listen(Session, 'after_soft_rollback', self._after_rollback)
+            self._listening = True
+
+    def _store(self, model):
+        """Return the storage of a model in the current application, if it is cached"""
+        if not has_app_context() or not current_app.config.get('ENTITY_CACHE_ENABLED'):
+            return None
+        return current_app.extensions.get('entity_cache', {}).get(model.__name__)
+
+    def load(self, session, model, obj_id):
+        """Return the cached row as an instance attached to the session, or None
+
+        Rows already in the session's identity map are left to
+        ``session.get``, which returns them without a query either.
+        """
+        store = self._store(model)
+        if store is None or obj_id is None:
+            return None
+        if model.__mapper__.identity_key_from_primary_key([obj_id]) in session.identity_map:
+            return None
+
+        with store.lock:
+            entry = store.entries.get(obj_id)
+            if entry is not None and time.monotonic() - entry[1] > current_app.config['ENTITY_CACHE_TTL']:
+                del store.entries[obj_id]
+                entry = None
+            if entry is None:
+                store.misses += 1
+                return None
+            store.entries.move_to_end(obj_id)
+            store.hits += 1
+            values = entry[0]
+
+        obj = model.__mapper__.class_manager.new_instance()
+        for key, value in values.items():
+            set_committed_value(obj, key, value)
+        make_transient_to_detached(obj)
+        return session.merge(obj, load=False)
+
+    def save(self, session, obj):
+        """Cache the column values of an instance just loaded from the database
+
+        Nothing is cached once the session's transaction has written, since
+        the loaded values may not be committed yet, nor while a lagging
+        replica may return a row this process has just changed.
+        """
+        store = self._store(type(obj))
+        if store is None or session.info.get(TAINTED_KEY) or obj in session.dirty \
+                or replica_reads_may_be_stale(session):
+            return
+        state = inspect(obj)
+        keys = [attribute.key for attribute in state.mapper.column_attrs]
+        if any(key not in state.dict for key in keys):
+            return
+        values = {key: state.dict[key] for key in keys}
+
+        with store.lock:
+            store.entries[state.identity[0]] = (values, time.monotonic())
+            store.entries.move_to_end(state.identity[0])
+            while len(store.entries) > store.capacity:
+                store.entries.popitem(last=False)
+                store.evictions += 1
+
+    def evict(self, session, model, *obj_ids):
+        """Drop rows written in the session's transaction, now and once it commits"""
+        session.info[TAINTED_KEY] = True
+        store = self._store(model)
+        if store is None:
+            return
+        session.info.setdefault(EVICTED_KEY, set()).update((model.__name__, obj_id) for obj_id in obj_ids)
+        self._discard(store, obj_ids)
+
+    def clear(self, session, model):
+        """Drop every cached row of a model, now and once the transaction commits
+
+        Used after bulk statements whose rows are not known individually.
+        """
+        session.info[TAINTED_KEY] = True
+        store = self._store(model)
+        if store is None:
+            return
+        session.info.setdefault(EVICTED_KEY, set()).add((model.__name__, None))
+        with store.lock:
+            store.entries.clear()
+
+    def stats(self):
+        """Return the size, capacity and hit/miss counters of every cached model"""
+        if not has_app_context():
+            return {}
+        stats = {}
+        for model_name, store in current_app.extensions.get('entity_cache', {}).items():
+            with store.lock:
+                lookups = store.hits + store.misses
+                stats[model_name] = {
+                    'size': len(store.entries),
+                    'capacity': store.capacity,
+                    'hits': store.hits,
+                    'misses': store.misses,
+                    'evictions': store.evictions,
+                    'hit_ratio': round(store.hits / lookups, 4) if lookups else None,
+                }
+        return stats
+
+    @staticmethod
+    def _discard(store, obj_ids):
+        """Remove rows from a model's storage"""
+        with store.lock:
+            for obj_id in obj_ids:
+                store.entries.pop(obj_id, None)
+
+    def _after_flush(self, session, flush_context):
+        """Evict the rows updated or deleted by a flush"""
+        for obj in list(session.dirty) + list(session.deleted):
+            identity = inspect(obj).identity
+            if identity is not None:
+                self.evict(session, type(obj), identity[0])
+
+    def _after_commit(self, session):
+        """Evict the rows of the committed transaction again, then allow caching"""
+        evicted = session.info.pop(EVICTED_KEY, set())
+        session.info.pop(TAINTED_KEY, None)
+        if not has_app_context():
+            return
+        stores = current_app.extensions.get('entity_cache', {})
+        for model_name, obj_id in evicted:
+            store = stores.get(model_name)
+            if store is None:
+                continue
+            if obj_id is None:
+                with store.lock:
+                    store.entries.clear()
+            else:
+                self._discard(store, [obj_id])
+
+    def _after_rollback(self, session, previous_transaction):
+        """Forget the bookkeeping of a rolled back transaction"""
+        session.info.pop(EVICTED_KEY, None)
+        session.info.pop(TAINTED_KEY, None)
@@ -1,20 +1,337 @@
-from app.persistence.repository import SQLAlchemyRepository
+import heapq
+import math
+from sqlalchemy import and_, delete, func, insert, or_, select, text, update
+from sqlalchemy.orm import joinedload, selectinload
+from app.extensions import amenity_index, db, entity_cache
+from app.persistence.repository import SQLAlchemyRepository, decode_cursor, encode_cursor, projection_options
+
+# Mean Earth radius used by the haversine distance
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = EARTH_RADIUS_KM * math.pi / 180
+# Above this many grid-cell ranges a search scans the whole latitude band instead
+MAX_GRID_RANGES = 64
+# Amenity filters matching at most this many places are sent to SQL as an id list
+MAX_FILTER_IDS = 1000
+# Largest number of (sort key, id) rows read at once when walking the list for an amenity filter
+MAX_SCAN_ROWS = 10000
+# Share of the best matching review in the relevance of a place
+REVIEW_MATCH_WEIGHT = 0.5
+
+# Per-dialect queries yielding (place_id, place_score, review_score) rows for
+# the places and reviews matching :query, scored higher for better matches
+TEXT_MATCHES = {
+    'mysql': """
+        SELECT id AS place_id, MATCH(title, description) AGAINST (:query IN NATURAL LANGUAGE MODE) AS place_score,
+               0 AS review_score
+        FROM place WHERE MATCH(title, description) AGAINST (:query IN NATURAL LANGUAGE MODE)
+        UNION ALL
+        SELECT place_id, 0, MATCH(text) AGAINST (:query IN NATURAL LANGUAGE MODE)
+        FROM review WHERE MATCH(text) AGAINST (:query IN NATURAL LANGUAGE MODE)""",
+    # bm25() is negative, lower for better matches; title hits weigh twice description hits
+    'sqlite': """
+        SELECT place.id AS place_id, -bm25(place_fts, 2.0, 1.0) AS place_score, 0 AS review_score
+        FROM place_fts JOIN place ON place.rowid = place_fts.rowid WHERE place_fts MATCH :query
+        UNION ALL
+        SELECT review.place_id, 0, -bm25(review_fts)
+        FROM review_fts JOIN review ON review.rowid = review_fts.rowid WHERE review_fts MATCH :query""",
+}
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Return the great-circle distance between two points in kilometers"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def radius_bounding_box(latitude, longitude, radius_km):
+    """Return (min_lat, min_lng, max_lat, max_lng) enclosing a circle
+
+    The box wraps across the antimeridian when min_lng > max_lng.
+    """
+    d_lat = radius_km / KM_PER_DEGREE
+    min_lat, max_lat = latitude - d_lat, latitude + d_lat
+    if min_lat <= -90.0 or max_lat >= 90.0:
+        # The circle contains a pole: every longitude is in range
+        return max(min_lat, -90.0), -180.0, min(max_lat, 90.0), 180.0
+
+    d_lng = d_lat / math.cos(math.radians(max(abs(min_lat), abs(max_lat))))
+    if d_lng >= 180.0:
+        return min_lat, -180.0, max_lat, 180.0
+
+    min_lng, max_lng = longitude - d_lng, longitude + d_lng
+    if min_lng < -180.0:
+        min_lng += 360.0
+    if max_lng > 180.0:
+        max_lng -= 360.0
+    return min_lat, min_lng, max_lat, max_lng
 
 
 class PlaceRepository(SQLAlchemyRepository):
     """Repository for Place-specific database operations"""
-    
+
     def __init__(self):
         from app.models.place import Place
         super().__init__(Place)
 
+    def eager_options(self):
+        """Load amenities for a whole page of places in one extra query"""
+        return [selectinload(self.model.amenities)]
+
+    def get_detail(self, place_id, projection=None):
+        """Retrieve a place with its owner and amenities joined in, in one statement
+
+        With a projection, only its columns and relationships are joined.
+        """
+        if projection is None:
+            options = [joinedload(self.model.owner), joinedload(self.model.amenities)]
+        else:
+            options = projection_options(self.model, projection, loader=joinedload)
+        return self.model.query.options(*options).filter_by(id=place_id).one_or_none()
+
     def get_places_by_owner(self, owner_id):
         """Retrieve all places owned by a specific user"""
-        return self.model.query.filter_by(owner_id=owner_id).all()
+        return self._query().filter_by(owner_id=owner_id).all()
+
+    def delete(self, obj_id):
+        """Delete a place and, with one statement, its reviews, which are never loaded"""
+        from app.models.review import Review
+        db.session.execute(delete(Review).where(Review.place_id == obj_id))
+        super().delete(obj_id)
 
     def get_places_by_price_range(self, min_price, max_price):
         """Retrieve places within a specific price range"""
-        return self.model.query.filter(
+        return self._query().filter(
             self.model.price >= min_price,
             self.model.price <= max_price
         ).all()
+
+    def get_places_page(self, limit, cursor=None, min_price=None, max_price=None, sort=None, projection=None,
+                        amenity_ids=None):
+        """Retrieve a page of places, optionally filtered by price and amenities, and sorted
+
+        ``sort`` is ``None`` for creation order, ``'price'`` for cheapest
+        first or ``'-price'`` for most expensive first; price ordering walks
+        the (price, id) index. A ``projection`` limits the loaded attributes.
+        Places must have every amenity of ``amenity_ids``: the amenity
+        bitmap index selects them, or SQL when the index is disabled.
+        """
+        filters = []
+        if min_price is not None:
+            filters.append(self.model.price >= min_price)
+        if max_price is not None:
+            filters.append(self.model.price <= max_price)
+        sort_column = self.model.price if sort in ('price', '-price') else self.model.created_at
+        descending = sort == '-price'
+
+        if amenity_ids:
+            match = amenity_index.matching(db.session, amenity_ids)
+            if match is None:
+                filters.append(self.model.id.in_(self._having_amenities(amenity_ids)))
+            elif match.count == 0:
+                return [], None
+            elif match.count <= MAX_FILTER_IDS:
+                filters.append(self.model.id.in_(list(match.place_ids())))
+            else:
+                return self._matching_page(match, limit, cursor, filters, sort_column, descending, projection)
+
+        query = self._query(projection, columns=[sort_column.key]).filter(*filters)
+        return self.get_page(limit, cursor, query=query, sort_columns=[sort_column], descending=descending)
+
+    def _matching_page(self, match, limit, cursor, filters, sort_column, descending, projection):
+        """Walk the list order reading only (sort key, id) and keep the places of an amenity match
+
+        Used when many places match, so few rows are read past each one;
+        the scanned chunk doubles while the matches are sparse.
+        """
+        keys = db.session.query(sort_column, self.model.id).filter(*filters)
+        found, chunk = [], limit + 1
+        while True:
+            rows, cursor = self.get_page(chunk, cursor, query=keys, sort_columns=[sort_column], descending=descending)
+            found.extend(row for row in rows if row.id in match)
+            if len(found) > limit or cursor is None:
+                break
+            chunk = min(chunk * 2, MAX_SCAN_ROWS)
+
+        next_cursor = None
+        if len(found) > limit:
+            found = found[:limit]
+            next_cursor = encode_cursor([getattr(found[-1], sort_column.key), found[-1].id])
+        if not found:
+            return [], None
+        places = self._query(projection).filter(self.model.id.in_([row.id for row in found])).all()
+        by_id = {place.id: place for place in places}
+        return [by_id[row.id] for row in found if row.id in by_id], next_cursor
+
+    @staticmethod
+    def _having_amenities(amenity_ids):
+        """Select the ids of the places linked to every amenity"""
+        from app.models.place_amenity import place_amenity
+
+        return select(place_amenity.c.place_id).where(
+            place_amenity.c.amenity_id.in_(amenity_ids)
+        ).group_by(place_amenity.c.place_id).having(
+            func.count(place_amenity.c.amenity_id) == len(set(amenity_ids)))
+
+    def bulk_insert(self, rows, amenity_links=()):
+        """Insert places and their (place_id, amenity_id) links with one executemany each"""
+        from app.models.place_amenity import place_amenity
+
+        db.session.execute(insert(self.model.__table__), rows)
+        if amenity_links:
+            db.session.execute(insert(place_amenity), [
+                {'place_id': place_id, 'amenity_id': amenity_id} for place_id, amenity_id in amenity_links
+            ])
+            amenity_index.record_links(db.session, amenity_links)
+
+    def get_owner_ids(self, place_ids):
+        """Map each existing place id to its owner id, with one query"""
+        if not place_ids:
+            return {}
+        return dict(db.session.execute(
+            select(self.model.id, self.model.owner_id).where(self.model.id.in_(place_ids))
+        ).all())
+
+    def recompute_rating_aggregates(self, place_id=None):
+        """Rebuild the rating aggregates of one or every place from the review table
+
+        Returns the number of places updated.
+        """
+        from app.models.review import Review
+
+        def review_stat(expression, *conditions):
+            return select(expression).where(Review.place_id == self.model.id, *conditions).scalar_subquery()
+
+        values = {
+            'review_count': review_stat(func.count(Review.id)),
+            'rating_sum': review_stat(func.coalesce(func.sum(Review.rating), 0)),
+        }
+        for star in range(1, 6):
+            values[f'rating_{star}_count'] = review_stat(func.count(Review.id), Review.rating == star)
+
+        statement = update(self.model).values(**values)
+        if place_id is not None:
+            statement = statement.where(self.model.id == place_id)
+        result = db.session.execute(statement.execution_options(synchronize_session=False))
+        if place_id is not None:
+            entity_cache.evict(db.session, self.model, place_id)
+        else:
+            entity_cache.clear(db.session, self.model)
+        return result.rowcount
+
+    def get_places_in_bbox(self, min_lat, min_lng, max_lat, max_lng, limit, cursor=None, projection=None):
+        """Retrieve a page of places inside a bounding box"""
+        query = self._query(projection, columns=['created_at']).filter(self._bbox_filter(min_lat, min_lng, max_lat, max_lng))
+        return self.get_page(limit, cursor, query=query)
+
+    def get_places_within_radius(self, latitude, longitude, radius_km, limit, projection=None):
+        """Retrieve the nearest places within a radius as (place, distance_km) pairs
+
+        Candidates come from an index range scan over the grid cells covering
+        the circle, reading only id and coordinates. The exact haversine
+        distance then filters and ranks them before full rows are loaded.
+        """
+        box = radius_bounding_box(latitude, longitude, radius_km)
+        candidates = db.session.query(
+            self.model.id, self.model.latitude, self.model.longitude
+        ).filter(self._bbox_filter(*box))
+
+        in_range = []
+        for place_id, place_lat, place_lng in candidates:
+            distance = haversine_km(latitude, longitude, place_lat, place_lng)
+            if distance <= radius_km:
+                in_range.append((distance, place_id))
+        nearest = heapq.nsmallest(limit, in_range)
+        if not nearest:
+            return []
+
+        places = self._query(projection).filter(self.model.id.in_([place_id for _, place_id in nearest])).all()
+        by_id = {place.id: place for place in places}
+        return [(by_id[place_id], distance) for distance, place_id in nearest if place_id in by_id]
+
+    def search_text(self, terms, limit, cursor=None, projection=None):
+        """Retrieve a page of (place, relevance) pairs matching words, best first, and the next cursor
+
+        Places match on their title and description through the full-text
+        index of the database, and on the text of their reviews. The
+        relevance adds the place's own score to a share of its best review's
+        score, rounded so that pages compare equal scores alike; the cursor
+        is the (relevance, id) of the last place.
+
+        Scores are computed from the statistics of the whole index, so a
+        write between two pages may shift places across the cursor: pages
+        are not stable across writes.
+        """
+        dialect = db.session.get_bind().dialect.name
+        if dialect not in TEXT_MATCHES:
+            raise ValueError(f"Full-text search is not available on {dialect}")
+        if dialect == 'sqlite':
+            # Quoted FTS5 strings: any word may match, operators in the input stay literal
+            query = ' OR '.join(f'"{term}"' for term in terms)
+        else:
+            query = ' '.join(terms)
+
+        relevance = "ROUND(SUM(place_score) + :review_weight * MAX(review_score), 6)"
+        params = {'query': query, 'review_weight': REVIEW_MATCH_WEIGHT, 'limit': limit + 1}
+        having = ""
+        if cursor:
+            values = decode_cursor(cursor)
+            if len(values) != 2 or not isinstance(values[0], (int, float)) or not isinstance(values[1], str):
+                raise ValueError("Invalid cursor")
+            params['after_relevance'], params['after_id'] = values
+            having = (f"HAVING {relevance} < :after_relevance "
+                      f"OR ({relevance} = :after_relevance AND place_id > :after_id)")
+
+        rows = db.session.execute(text(
+            f"SELECT place_id, {relevance} AS relevance FROM ({TEXT_MATCHES[dialect]}) AS matches "
+            f"GROUP BY place_id {having} ORDER BY relevance DESC, place_id LIMIT :limit"
+        ), params).all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor([rows[-1].relevance, rows[-1].place_id])
+        if not rows:
+            return [], None
+
+        places = self._query(projection).filter(self.model.id.in_([row.place_id for row in rows])).all()
+        by_id = {place.id: place for place in places}
+        return [(by_id[row.place_id], row.relevance) for row in rows if row.place_id in by_id], next_cursor
+
+    def rebuild_text_index(self):
+        """Create missing full-text indexes and rebuild the SQLite ones, return the tables indexed"""
+        from app.models.search_index import rebuild_full_text_indexes
+
+        return rebuild_full_text_indexes(db.session.connection())
+
+    def _bbox_filter(self, min_lat, min_lng, max_lat, max_lng):
+        """Exact bounding-box predicate prefixed by grid_cell ranges for the index"""
+        from app.models.place import GRID_COLUMNS
+
+        if min_lng <= max_lng:
+            longitude = self.model.longitude.between(min_lng, max_lng)
+            column_spans = [(self.model.grid_column(min_lng), self.model.grid_column(max_lng))]
+        else:
+            longitude = or_(self.model.longitude >= min_lng, self.model.longitude <= max_lng)
+            # Listed west-most first so consecutive rows merge into one range
+            column_spans = [(0, self.model.grid_column(max_lng)),
+                            (self.model.grid_column(min_lng), GRID_COLUMNS - 1)]
+
+        first_row, last_row = self.model.grid_row(min_lat), self.model.grid_row(max_lat)
+        ranges = []
+        for row in range(first_row, last_row + 1):
+            for first_column, last_column in column_spans:
+                start, end = row * GRID_COLUMNS + first_column, row * GRID_COLUMNS + last_column
+                if ranges and ranges[-1][1] + 1 == start:
+                    ranges[-1] = (ranges[-1][0], end)
+                else:
+                    ranges.append((start, end))
+
+        if len(ranges) > MAX_GRID_RANGES:
+            # Too many disjoint cells: scan the whole latitude band instead
+            ranges = [(first_row * GRID_COLUMNS, (last_row + 1) * GRID_COLUMNS - 1)]
+
+        grid_cell = or_(*[self.model.grid_cell.between(start, end) for start, end in ranges])
+        return and_(grid_cell, self.model.latitude.between(min_lat, max_lat), longitude)
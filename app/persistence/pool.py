@@ -0,0 +1,110 @@
+import threading
+import time
+from sqlalchemy import exc, make_url
+from sqlalchemy.pool import QueuePool
+
+
+# Engine options only understood by QueuePool
+QUEUE_POOL_OPTIONS = ('pool_size', 'max_overflow', 'pool_timeout')
+
+
+class _PoolMetrics:
+    """Counters of connection checkouts, waits and timeouts of one pool"""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.timeouts = 0
+        self.connects = 0
+        self.lock = threading.Lock()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool recording how long checkouts wait for a connection
+
+    The wait covers the time spent blocked on a saturated pool as well as
+    opening a new connection when the pool grows, which is what a request
+    pays before it can run its first query.
+    """
+
+    def __init__(self, creator, **kw):
+        super().__init__(creator, **kw)
+        self.metrics = _PoolMetrics()
+        self._in_checkout = threading.local()
+
+    def _do_get(self):
+        # QueuePool._do_get retries by calling itself: time only the outer call
+        if getattr(self._in_checkout, 'active', False):
+            return super()._do_get()
+
+        self._in_checkout.active = True
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            self._in_checkout.active = False
+            waited = time.perf_counter() - start
+            with self.metrics.lock:
+                self.metrics.checkouts += 1
+                self.metrics.wait_seconds += waited
+                self.metrics.max_wait_seconds = max(self.metrics.max_wait_seconds, waited)
+                self.metrics.timeouts += timed_out
+
+    def _create_connection(self):
+        with self.metrics.lock:
+            self.metrics.connects += 1
+        return super()._create_connection()
+
+
+def engine_options(config):
+    """Return the engine options of an application, using the instrumented pool by default
+
+    SQLite in-memory databases keep the single static connection
+    Flask-SQLAlchemy gives them, so the queue sizing options are dropped.
+    """
+    options = dict(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        for key in QUEUE_POOL_OPTIONS:
+            options.pop(key, None)
+        return options
+    options.setdefault('poolclass', InstrumentedQueuePool)
+    return options
+
+
+def pool_metrics(engine):
+    """Describe the live state and counters of an engine's connection pool"""
+    pool = engine.pool
+    metrics = {'pool_class': type(pool).__name__, 'status': pool.status()}
+    if not isinstance(pool, QueuePool):
+        return metrics
+
+    capacity = pool.size() + max(pool._max_overflow, 0)
+    metrics.update({
+        'size': pool.size(),
+        'max_overflow': pool._max_overflow,
+        'checked_out': pool.checkedout(),
+        'checked_in': pool.checkedin(),
+        'overflow': max(pool.overflow(), 0),
+        'utilization': round(pool.checkedout() / capacity, 4) if capacity else None,
+        'timeout': pool._timeout,
+        'recycle': pool._recycle,
+        'pre_ping': pool._pre_ping,
+    })
+    if isinstance(pool, InstrumentedQueuePool):
+        with pool.metrics.lock:
+            checkouts = pool.metrics.checkouts
+            metrics.update({
+                'checkouts': checkouts,
+                'connects': pool.metrics.connects,
+                'timeouts': pool.metrics.timeouts,
+                'wait_ms_total': round(pool.metrics.wait_seconds * 1000, 3),
+                'wait_ms_avg': round(pool.metrics.wait_seconds * 1000 / checkouts, 3) if checkouts else None,
+                'wait_ms_max': round(pool.metrics.max_wait_seconds * 1000, 3),
+            })
+    return metrics
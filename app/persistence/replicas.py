@@ -0,0 +1,223 @@
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from flask import current_app, g, has_app_context, has_request_context
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from flask_sqlalchemy.session import Session as FlaskSession
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Keys of the routing state kept in the session's info dictionary
+ROUTE_KEY = 'replica_engine'
+ENGINES_KEY = 'bind_engines'
+STALE_KEY = 'replica_reads_may_be_stale'
+WROTE_KEY = 'replica_router_wrote'
+# Flags of the current request kept in flask.g
+REQUEST_WROTE_FLAG = '_replica_router_wrote'
+REQUEST_STALE_FLAG = '_replica_reads_may_be_stale'
+# Number of remembered writers above which expired entries are pruned
+MAX_TRACKED_WRITERS = 10000
+
+
+class RoutingSession(FlaskSession):
+    """Session sending the queries of replica-routed reads to the replica engine
+
+    Flushes and statements that write always use the bind Flask-SQLAlchemy
+    picks, so objects loaded from the replica are written to the primary.
+
+    A session created with ``info={ENGINES_KEY: engines}`` uses those
+    engines, by bind key, instead of the application's: app.asgi passes
+    the synchronous facades of its async engines. Every model lives on
+    the default bind.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        replica = self.info.get(ROUTE_KEY)
+        if replica is not None and bind is None and not self._flushing \
+                and not getattr(clause, 'is_dml', False):
+            return replica
+        if bind is None and ENGINES_KEY in self.info:
+            return self.info[ENGINES_KEY][None]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def bind_engine(self, bind_key):
+        """Return the engine of a bind key used by this session"""
+        engines = self.info.get(ENGINES_KEY)
+        return (engines if engines is not None else self._db.engines)[bind_key]
+
+
+def replica_reads_may_be_stale(session=None):
+    """Tell whether data read in this session or request may predate a recent write
+
+    Caches check it before storing what they read: a lagging replica may
+    still return a row this process has just changed and evicted.
+    """
+    if session is not None and session.info.get(STALE_KEY):
+        return True
+    return has_request_context() and g.get(REQUEST_STALE_FLAG, False)
+
+
+class _RouterState:
+    """Per-application record of recent writes"""
+
+    def __init__(self):
+        self.last_write = float('-inf')  # monotonic time of the last write of this process
+        self.writers = {}  # identity -> monotonic time of its last write
+        self.lock = threading.Lock()
+
+
+class ReplicaRouter:
+    """Route the read methods of the facade to a read replica
+
+    ``REPLICA_BIND`` names the entry of ``SQLALCHEMY_BINDS`` holding the
+    replica; when it is unset every query goes to the primary. Facade read
+    methods decorated with ``read_only`` query the replica, unless:
+
+    * they run inside a unit of work, or the session has unflushed changes;
+    * the current request has already written;
+    * the current JWT identity wrote less than ``READ_YOUR_WRITES_SECONDS``
+      ago, so clients read their own writes despite the replication lag.
+
+    Writes are recorded when a transaction that executed INSERT, UPDATE or
+    DELETE statements commits. The record lives in each process, so the
+    window only holds while the client stays on the worker it wrote through.
+
+    Within the window after any write of this process, rows and responses
+    read from the replica are not cached, since the replica may not have
+    caught up with the invalidation yet.
+    """
+
+    def __init__(self, app=None):
+        self._listening = False
+        self.identity_loader = _jwt_identity
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Create the write record of an application and check its replica bind"""
+        app.config.setdefault('REPLICA_BIND', None)
+        app.config.setdefault('READ_YOUR_WRITES_SECONDS', 5)
+        bind = app.config['REPLICA_BIND']
+        if bind is not None and bind not in (app.config.get('SQLALCHEMY_BINDS') or {}):
+            raise ValueError(f"REPLICA_BIND {bind!r} is not a key of SQLALCHEMY_BINDS")
+        app.extensions['replica_router'] = _RouterState()
+        if not self._listening:
+            event.listen(Session, 'do_orm_execute', self._on_execute)
+            event.listen(Session, 'after_flush', self._after_flush)
+            event.listen(Session, 'after_commit', self._after_commit)
+            event.listen(Session, 'after_soft_rollback', self._after_rollback)
+            self._listening = True
+
+    @contextmanager
+    def reads(self, session):
+        """Route the queries of a block to the replica when it is safe to"""
+        replica = self._replica_for(session)
+        if replica is None or session.info.get(ROUTE_KEY) is not None:
+            yield session
+            return
+
+        state = current_app.extensions['replica_router']
+        stale = time.monotonic() - state.last_write < current_app.config['READ_YOUR_WRITES_SECONDS']
+        if stale and has_request_context():
+            setattr(g, REQUEST_STALE_FLAG, True)
+        session.info[ROUTE_KEY] = replica
+        session.info[STALE_KEY] = stale
+        try:
+            yield session
+        finally:
+            session.info.pop(ROUTE_KEY, None)
+            session.info.pop(STALE_KEY, None)
+
+    def read_only(self, method):
+        """Decorate a service read method so that it may query the replica"""
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            # Imported here: the session class of db is defined in this module
+            from app.extensions import db
+            with self.reads(db.session()):
+                return method(*args, **kwargs)
+        return wrapper
+
+    def _replica_for(self, session):
+        """Return the replica engine if the session may read from it, else None"""
+        if not has_app_context():
+            return None
+        bind = current_app.config.get('REPLICA_BIND')
+        state = current_app.extensions.get('replica_router')
+        if bind is None or state is None:
+            return None
+        # Imported here: unit_of_work imports db from the extensions
+        from app.persistence.unit_of_work import DEPTH_KEY
+        if session.info.get(DEPTH_KEY) or session.info.get(WROTE_KEY) \
+                or session.new or session.dirty or session.deleted:
+            return None
+        if has_request_context() and g.get(REQUEST_WROTE_FLAG, False):
+            return None
+        identity = self._identity()
+        if identity is not None:
+            with state.lock:
+                written_at = state.writers.get(identity)
+            if written_at is not None and \
+                    time.monotonic() - written_at < current_app.config['READ_YOUR_WRITES_SECONDS']:
+                return None
+        return session.bind_engine(bind)
+
+    def _identity(self):
+        """Return the identity whose writes are tracked for the current request"""
+        if not has_request_context():
+            return None
+        return self.identity_loader()
+
+    def _record_write(self):
+        """Remember that this process, the current request and its identity wrote"""
+        if not has_app_context():
+            return
+        state = current_app.extensions.get('replica_router')
+        if state is None or current_app.config.get('REPLICA_BIND') is None:
+            return
+        now = time.monotonic()
+        identity = self._identity()
+        if has_request_context():
+            setattr(g, REQUEST_WROTE_FLAG, True)
+        with state.lock:
+            state.last_write = now
+            if identity is None:
+                return
+            state.writers[identity] = now
+            if len(state.writers) > MAX_TRACKED_WRITERS:
+                window = current_app.config['READ_YOUR_WRITES_SECONDS']
+                for writer, written_at in list(state.writers.items()):
+                    if now - written_at >= window:
+                        del state.writers[writer]
+
+    def _on_execute(self, orm_execute_state):
+        """Mark the transaction as written by INSERT, UPDATE or DELETE statements"""
+        if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+            orm_execute_state.session.info[WROTE_KEY] = True
+
+    def _after_flush(self, session, flush_context):
+        """Mark the transaction as written by a flush"""
+        session.info[WROTE_KEY] = True
+
+    def _after_commit(self, session):
+        """Record the write of a committed transaction"""
+        if session.info.pop(WROTE_KEY, False):
+            self._record_write()
+
+    def _after_rollback(self, session, previous_transaction):
+        """Forget the writes of a rolled back transaction"""
+        session.info.pop(WROTE_KEY, None)
+
+
+def _jwt_identity():
+    """Return the identity of a valid JWT sent with the request, or None
+
+    Public endpoints do not verify tokens, so the token is checked here; a
+    missing or invalid one just leaves the request anonymous.
+    """
+    try:
+        verify_jwt_in_request(optional=True)
+        return get_jwt_identity()
+    except Exception:
+        return None
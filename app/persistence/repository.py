@@ -1,5 +1,28 @@
 from abc import ABC, abstractmethod
-from app.extensions import db
+import base64
+import binascii
+import json
+from datetime import datetime
+from sqlalchemy import and_, inspect, insert, or_, select
+from sqlalchemy.orm import MANYTOONE, lazyload, load_only, selectinload
+from app.extensions import db, entity_cache
+
+
+# Encode the sort-key values of the last row of a page into an opaque cursor
+def encode_cursor(values):
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+# Decode a cursor produced by encode_cursor back into its list of values
+def decode_cursor(cursor):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+    except (ValueError, UnicodeError, binascii.Error):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
 
 
 # Abstract base class defining the repository interface for data persistence
@@ -81,32 +104,193 @@ class InMemoryRepository(Repository):
         return next((obj for obj in self._storage.values() if getattr(obj, attr_name) == attr_value), None)
 
 
+# Relationship loading strategies that never load the collection, only query it
+COLLECTION_QUERIES = ('write_only', 'dynamic')
+
+
+# Build loader options loading only the attributes of a projection
+def projection_options(model, projection, columns=(), loader=selectinload):
+    """Return loader options loading only the attributes of a projection
+
+    A projection maps attribute names to None, or, for relationships, to
+    the projection of the related model (None loads it in full). Only the
+    listed columns are selected, plus the primary key, the extra
+    ``columns`` and the foreign keys of many-to-one relationships.
+    Relationships in the projection are loaded with ``loader``, by default
+    one SELECT ... IN query each; the others are left lazy, even when
+    eager by default. Write-only collections are never loaded.
+    """
+    mapper = inspect(model)
+    keys = set(columns) | {mapper.get_property_by_column(column).key for column in mapper.primary_key}
+    options = []
+    for key, nested in projection.items():
+        if key in mapper.relationships:
+            relationship = mapper.relationships[key]
+            if relationship.lazy in COLLECTION_QUERIES:
+                raise ValueError(f"{model.__name__}.{key} is write-only: query it through its repository")
+            if relationship.direction is MANYTOONE:
+                keys.update(mapper.get_property_by_column(column).key for column in relationship.local_columns)
+            option = loader(relationship.class_attribute)
+            if nested is not None:
+                option = option.options(*projection_options(relationship.mapper.class_, nested, loader=loader))
+            options.append(option)
+        elif key in mapper.column_attrs:
+            keys.add(key)
+        else:
+            raise ValueError(f"{model.__name__} has no mapped attribute {key!r}")
+    options.extend(lazyload(relationship.class_attribute)
+                   for key, relationship in mapper.relationships.items()
+                   if key not in projection and relationship.lazy not in COLLECTION_QUERIES)
+    return [load_only(*(mapper.column_attrs[key].class_attribute for key in sorted(keys))), *options]
+
+
 class SQLAlchemyRepository(Repository):
+    """Repository staging its writes in the session
+
+    add, update, delete and bulk_insert never commit: the changes are
+    committed by the enclosing unit of work (see app.persistence.unit_of_work).
+    """
+
     def __init__(self, model):
         self.model = model
 
     def add(self, obj):
         db.session.add(obj)
-        db.session.commit()
 
-    def get(self, obj_id):
-        return self.model.query.get(obj_id)
-
-    def get_all(self):
-        return self.model.query.all()
+    def eager_options(self):
+        """Loader options applied to every query issued by this repository
+
+        Subclasses return ``selectinload``/``joinedload`` options for the
+        relationships their serializers always touch, so that listing N rows
+        costs a fixed number of queries instead of one per row.
+        """
+        return []
+
+    def load_options(self, projection=None, columns=()):
+        """Loader options of a projection, or the repository's eager loads without one
+
+        ``columns`` names attributes loaded on top of the projection, such
+        as the sort keys a page cursor is built from.
+        """
+        if projection is None:
+            return self.eager_options()
+        return projection_options(self.model, projection, columns)
+
+    def _query(self, projection=None, columns=()):
+        """Base query for the model loading a projection, or with the eager loads applied"""
+        return self.model.query.options(*self.load_options(projection, columns))
+
+    def get(self, obj_id, projection=None):
+        """Retrieve an object by id, from the entity cache when it holds the row
+
+        With a projection only its attributes are loaded on a cache miss;
+        such partial rows are never cached.
+        """
+        obj = entity_cache.load(db.session, self.model, obj_id)
+        if obj is None:
+            obj = db.session.get(self.model, obj_id, options=self.load_options(projection))
+            if obj is not None:
+                entity_cache.save(db.session, obj)
+        return obj
+
+    def get_row(self, obj_id):
+        """Retrieve an object by id with its columns only, leaving every relationship lazy"""
+        obj = entity_cache.load(db.session, self.model, obj_id)
+        if obj is None:
+            obj = db.session.get(self.model, obj_id, options=[lazyload('*')])
+            if obj is not None:
+                entity_cache.save(db.session, obj)
+        return obj
+
+    def get_for_update(self, obj_id):
+        """Reload an object by id from the database, locking its row until the transaction ends
+
+        The instance already in the session, possibly read from a replica
+        earlier in the request, is overwritten with the current row.
+        """
+        return db.session.get(self.model, obj_id, populate_existing=True, with_for_update=True)
+
+    def get_all(self, projection=None):
+        return self._query(projection).all()
+
+    def get_page(self, limit, cursor=None, query=None, sort_columns=None, descending=False):
+        """Retrieve one keyset-paginated page and the cursor of the next page
+
+        Rows are ordered by ``sort_columns`` (``created_at`` by default) with
+        ``id`` as tie-breaker, so each page is an index range scan that costs
+        the same no matter how deep the client has walked.
+        """
+        if query is None:
+            query = self._query()
+        columns = list(sort_columns or [self.model.created_at]) + [self.model.id]
+
+        if cursor:
+            values = decode_cursor(cursor)
+            if len(values) != len(columns):
+                raise ValueError("Invalid cursor")
+            values = [self._cursor_value(column, value) for column, value in zip(columns, values)]
+            query = query.filter(self._keyset_after(columns, values, descending))
+
+        order = [column.desc() if descending else column.asc() for column in columns]
+        rows = query.order_by(*order).limit(limit + 1).all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor([getattr(last, column.key) for column in columns])
+        return rows, next_cursor
+
+    @staticmethod
+    def _cursor_value(column, value):
+        """Convert a decoded cursor value back to the column's Python type"""
+        try:
+            if isinstance(column.type, db.DateTime):
+                return datetime.fromisoformat(value)
+            if isinstance(column.type, db.Float):
+                return float(value)
+            if isinstance(column.type, db.Integer):
+                if isinstance(value, bool) or not isinstance(value, int):
+                    raise ValueError("Invalid cursor")
+                return value
+        except (TypeError, ValueError):
+            raise ValueError("Invalid cursor")
+        if not isinstance(value, str):
+            raise ValueError("Invalid cursor")
+        return value
+
+    @staticmethod
+    def _keyset_after(columns, values, descending):
+        """Build the row-value predicate selecting rows strictly after the cursor"""
+        clauses = []
+        for i, column in enumerate(columns):
+            equal = [columns[j] == values[j] for j in range(i)]
+            beyond = column < values[i] if descending else column > values[i]
+            clauses.append(and_(*equal, beyond))
+        return or_(*clauses)
+
+    def bulk_insert(self, rows):
+        """Insert column-value dicts with one executemany"""
+        db.session.execute(insert(self.model.__table__), rows)
+
+    def get_existing_ids(self, ids):
+        """Return the subset of the given ids that exist, with one query"""
+        if not ids:
+            return set()
+        return set(db.session.scalars(select(self.model.id).where(self.model.id.in_(ids))))
 
     def update(self, obj_id, data):
         obj = self.get(obj_id)
         if obj:
             for key, value in data.items():
                 setattr(obj, key, value)
-            db.session.commit()
+            entity_cache.evict(db.session, self.model, obj_id)
 
     def delete(self, obj_id):
         obj = self.get(obj_id)
         if obj:
             db.session.delete(obj)
-            db.session.commit()
+            entity_cache.evict(db.session, self.model, obj_id)
 
     def get_by_attribute(self, attr_name, attr_value):
         return self.model.query.filter_by(**{attr_name: attr_value}).first()
\ No newline at end of file
@@ -1,3 +1,6 @@
+from sqlalchemy import bindparam, exists, insert, select, tuple_, update
+from sqlalchemy.orm import joinedload
+from app.extensions import db, entity_cache
 from app.persistence.repository import SQLAlchemyRepository
 
 
@@ -10,8 +13,85 @@ class ReviewRepository(SQLAlchemyRepository):
 
     def get_reviews_by_rating(self, rating):
         """Retrieve all reviews with a specific rating"""
-        return self.model.query.filter_by(rating=rating).all()
+        return self._filter_by_rating(self.model.query, rating).all()
 
-    def get_reviews_by_place(self, place_id):
-        """Retrieve all reviews for a specific place"""
-        return self.model.query.filter_by(place_id=place_id).all()
+    @staticmethod
+    def _filter_by_rating(query, rating):
+        """Keep the reviews with exactly the given rating"""
+        return query.filter_by(rating=rating)
+
+    def get_reviews_by_place(self, place_id, projection=None):
+        """Retrieve all reviews for a specific place along with their authors, or a projection of them"""
+        if projection is not None:
+            return self._query(projection).filter_by(place_id=place_id).all()
+        return self._query().options(joinedload(self.model.user)).filter_by(place_id=place_id).all()
+
+    def get_reviews_by_user(self, user_id):
+        """Retrieve all reviews written by a specific user"""
+        return self._query().filter_by(user_id=user_id).all()
+
+    def get_place_reviews_page(self, place_id, limit, cursor=None, sort=None, rating=None, projection=None):
+        """Retrieve a page of a place's reviews and the cursor of the next page
+
+        ``sort`` is ``None`` or ``'-created_at'`` for newest first,
+        ``'created_at'`` for oldest first, ``'-rating'`` for best rated
+        (then newest) first or ``'rating'`` for worst rated (then oldest)
+        first. Every order walks the (place_id, created_at, id) or
+        (place_id, rating, created_at, id) index. Without a projection the
+        authors are joined in.
+        """
+        if projection is None:
+            query = self._query().options(joinedload(self.model.user))
+        else:
+            query = self._query(projection, columns=['created_at', 'rating'])
+        query = query.filter_by(place_id=place_id)
+        if rating is not None:
+            query = self._filter_by_rating(query, rating)
+
+        sort_columns = [self.model.created_at]
+        if sort in ('rating', '-rating'):
+            sort_columns.insert(0, self.model.rating)
+        descending = sort is None or sort.startswith('-')
+        return self.get_page(limit, cursor, query=query, sort_columns=sort_columns, descending=descending)
+
+    def user_has_reviewed_place(self, user_id, place_id):
+        """Check whether a user already reviewed a place using the (user_id, place_id) unique index"""
+        return db.session.query(
+            exists().where(self.model.user_id == user_id, self.model.place_id == place_id)
+        ).scalar()
+
+    def get_reviewed_pairs(self, pairs):
+        """Return the (user_id, place_id) pairs among the given ones that already have a review"""
+        if not pairs:
+            return set()
+        columns = tuple_(self.model.user_id, self.model.place_id)
+        return set(db.session.execute(select(self.model.user_id, self.model.place_id).where(
+            columns.in_(list(pairs)))).all())
+
+    def bulk_insert(self, rows):
+        """Insert reviews and add their ratings to the place aggregates
+
+        The aggregates of all places touched by the batch are incremented with
+        one executemany UPDATE, relative to the stored values.
+        """
+        from app.models.place import Place
+
+        deltas = {}
+        for row in rows:
+            delta = deltas.setdefault(row['place_id'], {
+                'b_place_id': row['place_id'], 'b_count': 0, 'b_sum': 0,
+                **{f'b_{star}': 0 for star in range(1, 6)}
+            })
+            delta['b_count'] += 1
+            delta['b_sum'] += row['rating']
+            delta[f"b_{row['rating']}"] += 1
+
+        place = Place.__table__.c
+        increment = update(Place.__table__).where(place.id == bindparam('b_place_id')).values(
+            review_count=place.review_count + bindparam('b_count'),
+            rating_sum=place.rating_sum + bindparam('b_sum'),
+            **{f'rating_{star}_count': place[f'rating_{star}_count'] + bindparam(f'b_{star}') for star in range(1, 6)}
+        )
+        db.session.execute(insert(self.model.__table__), rows)
+        db.session.execute(increment, list(deltas.values()))
+        entity_cache.evict(db.session, Place, *deltas)
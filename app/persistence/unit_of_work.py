@@ -0,0 +1,66 @@
+from contextlib import contextmanager
+from functools import wraps
+from app.extensions import db
+
+# Keys of the unit-of-work state kept in the session's info dictionary
+DEPTH_KEY = 'unit_of_work_depth'
+CALLBACKS_KEY = 'unit_of_work_callbacks'
+
+
+@contextmanager
+def transaction():
+    """Run a block as one unit of work: one flush and one commit at the end
+
+    Repositories only stage their changes in the session; the outermost
+    ``transaction()`` block commits them all at once, or rolls them all
+    back when an exception escapes. Nested blocks join the outermost one,
+    so a facade method called from a caller-defined batch commits with the
+    batch instead of on its own.
+    """
+    session = db.session()
+    depth = session.info.get(DEPTH_KEY, 0)
+    session.info[DEPTH_KEY] = depth + 1
+    if depth == 0:
+        session.info[CALLBACKS_KEY] = []
+    try:
+        yield session
+    except BaseException:
+        session.info[DEPTH_KEY] = depth
+        if depth == 0:
+            session.info.pop(CALLBACKS_KEY, None)
+            session.rollback()
+        raise
+
+    session.info[DEPTH_KEY] = depth
+    if depth > 0:
+        return
+    callbacks = session.info.pop(CALLBACKS_KEY, [])
+    try:
+        session.commit()
+    except BaseException:
+        session.rollback()
+        raise
+    for callback, args in callbacks:
+        callback(*args)
+
+
+def transactional(method):
+    """Decorate a service method so that it runs inside a unit of work"""
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        with transaction():
+            return method(*args, **kwargs)
+    return wrapper
+
+
+def after_commit(callback, *args):
+    """Call callback(*args) once the current unit of work has committed
+
+    Outside a unit of work the callback runs immediately. Callbacks of a
+    unit of work that rolls back are dropped.
+    """
+    session = db.session()
+    if session.info.get(DEPTH_KEY):
+        session.info[CALLBACKS_KEY].append((callback, args))
+    else:
+        callback(*args)
@@ -0,0 +1,135 @@
+import inspect
+import json
+import logging
+import time
+from functools import wraps
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Child of the application logger, which Flask attaches a stderr handler to
+logger = logging.getLogger('app.requests')
+
+
+class _RequestStats:
+    """Queries, database time and facade calls of one request"""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.facade_calls = []  # [name, queries, db seconds] of each outermost facade call
+        self.facade_depth = 0
+
+
+class RequestProfiler:
+    """Measure the queries and database time of every request
+
+    Engine events count the statements each request executes and the time
+    spent running them. The totals are sent back in a ``Server-Timing``
+    header, which browsers show in their network panel:
+
+        Server-Timing: db;desc="4 queries";dur=3.2, total;dur=11.8
+
+    With ``REQUEST_LOG_ENABLED`` every request is also logged as one JSON
+    line on the ``app.requests`` logger. Requests slower than
+    ``SLOW_REQUEST_MS`` are logged as warnings naming the route and the
+    facade methods they called, with the queries each of them issued.
+    """
+
+    def __init__(self, app=None):
+        self._listening = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Hook the profiler into the requests of an application"""
+        app.config.setdefault('REQUEST_PROFILING_ENABLED', True)
+        app.config.setdefault('REQUEST_LOG_ENABLED', False)
+        app.config.setdefault('SLOW_REQUEST_MS', 500)
+        if app.config['REQUEST_LOG_ENABLED'] and logger.level == logging.NOTSET:
+            logger.setLevel(logging.INFO)
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        if not self._listening:
+            event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+            self._listening = True
+
+    def traced(self, cls):
+        """Decorate a service class so that requests record its public method calls"""
+        for name, method in list(vars(cls).items()):
+            if not name.startswith('_') and inspect.isfunction(method):
+                setattr(cls, name, self._trace(f"{cls.__name__}.{name}", method))
+        return cls
+
+    @staticmethod
+    def _trace(name, method):
+        """Wrap a method so that its outermost calls are attributed their queries"""
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            stats = g.get('_request_stats') if has_request_context() else None
+            if stats is None or stats.facade_depth:
+                return method(*args, **kwargs)
+            queries, db_seconds = stats.queries, stats.db_seconds
+            stats.facade_depth += 1
+            try:
+                return method(*args, **kwargs)
+            finally:
+                stats.facade_depth -= 1
+                stats.facade_calls.append([name, stats.queries - queries, stats.db_seconds - db_seconds])
+        return wrapper
+
+    @staticmethod
+    def _before_request():
+        if current_app.config['REQUEST_PROFILING_ENABLED']:
+            g._request_stats = _RequestStats()
+
+    @staticmethod
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if has_request_context() and g.get('_request_stats') is not None:
+            context._request_profiler_start = time.perf_counter()
+
+    @staticmethod
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, '_request_profiler_start', None)
+        if start is None or not has_request_context():
+            return
+        stats = g.get('_request_stats')
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += time.perf_counter() - start
+
+    def _after_request(self, response):
+        """Add the Server-Timing header and log the request"""
+        stats = g.pop('_request_stats', None)
+        if stats is None:
+            return response
+        total_ms = (time.perf_counter() - stats.started_at) * 1000
+        db_ms = stats.db_seconds * 1000
+        response.headers.add(
+            'Server-Timing', f'db;desc="{stats.queries} queries";dur={db_ms:.1f}, total;dur={total_ms:.1f}')
+
+        slow = total_ms >= current_app.config['SLOW_REQUEST_MS']
+        if not slow and not current_app.config['REQUEST_LOG_ENABLED']:
+            return response
+        record = {
+            'method': request.method,
+            'route': request.url_rule.rule if request.url_rule else None,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': stats.queries,
+            'db_ms': round(db_ms, 3),
+            'total_ms': round(total_ms, 3),
+            'facade': [{'method': name, 'queries': queries, 'db_ms': round(seconds * 1000, 3)}
+                       for name, queries, seconds in stats.facade_calls],
+        }
+        if current_app.config['REQUEST_LOG_ENABLED']:
+            logger.info(json.dumps(record))
+        if slow:
+            calls = ', '.join(f"{call['method']} ({call['queries']} queries, {call['db_ms']:.1f} ms)"
+                              for call in record['facade']) or 'no facade call'
+            logger.warning("Slow request %s %s took %.1f ms with %d queries (%.1f ms in the database): %s",
+                           record['method'], record['route'] or record['path'], total_ms,
+                           stats.queries, db_ms, calls)
+        return response
@@ -0,0 +1,211 @@
+import uuid
+from datetime import datetime
+from sqlalchemy.exc import IntegrityError
+from app.models.place import Place
+from app.models.review import Review
+from app.models.amenity import Amenity
+from app.persistence.unit_of_work import transaction
+
+# Record kinds accepted by the bulk import, with the name of one record
+IMPORT_KINDS = {'amenities': 'amenity', 'places': 'place', 'reviews': 'review'}
+
+
+class BulkImporter:
+    """Validate uploaded records and insert them in batched transactions
+
+    Every record goes through its model's constructor, so the import applies
+    the same validators as the API. References to other rows (owners,
+    places, users and amenities) are checked with one query per batch. The
+    valid rows of a batch are then inserted with executemany in a single
+    transaction. If that transaction hits a constraint, the batch is
+    retried row by row, so only the offending rows are rejected.
+
+    ``import_records`` returns a report holding the number of imported and
+    failed records and, for each of the first ``max_errors`` failures, the
+    record index and the error message.
+    """
+
+    def __init__(self, facade, batch_size=1000, max_errors=1000):
+        self.facade = facade
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+
+    def import_records(self, kind, records, default_owner_id=None):
+        """Import (index, record) pairs of one kind and return the report
+
+        A record may be an exception instance, standing for a record that
+        could not be parsed; it is reported as failed.
+        """
+        if kind not in IMPORT_KINDS:
+            raise ValueError(f"Import kind must be one of: {', '.join(IMPORT_KINDS)}")
+
+        record_name = IMPORT_KINDS[kind]
+        build = getattr(self, f'_build_{record_name}')
+        steps = (getattr(self, f'_lookup_{kind}'), getattr(self, f'_check_{record_name}'),
+                 getattr(self, f'_insert_{kind}'))
+        report = {'kind': kind, 'imported': 0, 'failed': 0, 'errors': []}
+        seen = set()  # Unique keys of the records accepted so far
+
+        batch = []
+        for index, record in records:
+            try:
+                if isinstance(record, Exception):
+                    raise record
+                if not isinstance(record, dict):
+                    raise ValueError("Record must be a JSON object")
+                batch.append((index, build(record, default_owner_id)))
+            except (TypeError, ValueError) as e:
+                self._fail(report, index, e)
+            if len(batch) >= self.batch_size:
+                self._flush(batch, steps, seen, report)
+                batch = []
+        if batch:
+            self._flush(batch, steps, seen, report)
+        report['errors'].sort(key=lambda error: error['index'])
+        return report
+
+    def _flush(self, batch, steps, seen, report):
+        """Check the references of a batch and insert its valid rows"""
+        lookup, check, insert = steps
+        known = lookup([entry for _, entry in batch])
+        valid = []
+        for index, entry in batch:
+            error = check(entry, known, seen)
+            if error:
+                self._fail(report, index, ValueError(error))
+            else:
+                valid.append((index, entry))
+                seen.add(entry['key'])
+        if not valid:
+            return
+
+        try:
+            with transaction():
+                insert([entry for _, entry in valid])
+            report['imported'] += len(valid)
+        except IntegrityError:
+            # A concurrent write or an unchecked constraint: isolate the failing rows
+            for index, entry in valid:
+                try:
+                    with transaction():
+                        insert([entry])
+                    report['imported'] += 1
+                except IntegrityError:
+                    seen.discard(entry['key'])
+                    self._fail(report, index, ValueError("Record conflicts with existing data"))
+
+    def _fail(self, report, index, error):
+        """Count a rejected record and keep its error while under the reporting cap"""
+        report['failed'] += 1
+        if len(report['errors']) < self.max_errors:
+            report['errors'].append({'index': index, 'error': str(error)})
+
+    @staticmethod
+    def _column_values(obj, **values):
+        """Return the column values of a validated, unsaved model instance
+
+        Explicit ``values`` override the instance attributes; columns left
+        empty fall back to their scalar default.
+        """
+        now = datetime.utcnow()
+        row = {}
+        for column in obj.__table__.columns:
+            value = values[column.key] if column.key in values else getattr(obj, column.key)
+            if value is None and column.default is not None and column.default.is_scalar:
+                value = column.default.arg
+            row[column.key] = value
+        row['id'] = row['id'] or str(uuid.uuid4())
+        row['created_at'] = row['updated_at'] = now
+        return row
+
+    @staticmethod
+    def _reference(record, key):
+        """Return a required id field of a record"""
+        value = record.get(key)
+        if not value or not isinstance(value, str):
+            raise ValueError(f"{key} is required and must be a string")
+        return value
+
+    # ==================== AMENITIES ====================
+    def _build_amenity(self, record, default_owner_id):
+        amenity = Amenity(name=record.get('name'))
+        return {'row': self._column_values(amenity), 'key': amenity.name_key}
+
+    def _lookup_amenities(self, entries):
+        return self.facade.amenity_repo.get_existing_name_keys({entry['key'] for entry in entries})
+
+    def _check_amenity(self, entry, taken, seen):
+        if entry['key'] in taken or entry['key'] in seen:
+            return f"Amenity with name {entry['row']['name']} already exists"
+        return None
+
+    def _insert_amenities(self, entries):
+        self.facade.amenity_repo.bulk_insert([entry['row'] for entry in entries])
+
+    # ==================== PLACES ====================
+    def _build_place(self, record, default_owner_id):
+        place = Place(
+            title=record.get('title'),
+            description=record.get('description', ''),
+            price=record.get('price'),
+            latitude=record.get('latitude'),
+            longitude=record.get('longitude')
+        )
+        owner_id = record.get('owner_id') or default_owner_id
+        if not owner_id or not isinstance(owner_id, str):
+            raise ValueError("owner_id is required and must be a string")
+        amenity_ids = record.get('amenity_ids', [])
+        if not isinstance(amenity_ids, list) or not all(isinstance(value, str) for value in amenity_ids):
+            raise ValueError("amenity_ids must be a list of strings")
+        row = self._column_values(place, owner_id=owner_id)
+        return {'row': row, 'key': row['id'], 'amenity_ids': list(dict.fromkeys(amenity_ids))}
+
+    def _lookup_places(self, entries):
+        owners = self.facade.user_repo.get_existing_ids({entry['row']['owner_id'] for entry in entries})
+        amenities = self.facade.amenity_repo.get_existing_ids(
+            {amenity_id for entry in entries for amenity_id in entry['amenity_ids']})
+        return owners, amenities
+
+    def _check_place(self, entry, known, seen):
+        owners, amenities = known
+        if entry['row']['owner_id'] not in owners:
+            return "Owner not found"
+        missing = [amenity_id for amenity_id in entry['amenity_ids'] if amenity_id not in amenities]
+        if missing:
+            return f"Amenity not found: {missing[0]}"
+        return None
+
+    def _insert_places(self, entries):
+        links = [(entry['row']['id'], amenity_id) for entry in entries for amenity_id in entry['amenity_ids']]
+        self.facade.place_repo.bulk_insert([entry['row'] for entry in entries], links)
+
+    # ==================== REVIEWS ====================
+    def _build_review(self, record, default_owner_id):
+        review = Review(text=record.get('text'), rating=record.get('rating'))
+        user_id = self._reference(record, 'user_id')
+        place_id = self._reference(record, 'place_id')
+        row = self._column_values(review, user_id=user_id, place_id=place_id)
+        return {'row': row, 'key': (user_id, place_id)}
+
+    def _lookup_reviews(self, entries):
+        keys = {entry['key'] for entry in entries}
+        users = self.facade.user_repo.get_existing_ids({user_id for user_id, _ in keys})
+        owners = self.facade.place_repo.get_owner_ids({place_id for _, place_id in keys})
+        reviewed = self.facade.review_repo.get_reviewed_pairs(keys)
+        return users, owners, reviewed
+
+    def _check_review(self, entry, known, seen):
+        users, owners, reviewed = known
+        user_id, place_id = entry['key']
+        if user_id not in users:
+            return "User not found"
+        if place_id not in owners:
+            return "Place not found"
+        if owners[place_id] == user_id:
+            return "You cannot review your own place"
+        if entry['key'] in reviewed or entry['key'] in seen:
+            return "You have already reviewed this place"
+        return None
+
+    def _insert_reviews(self, entries):
+        self.facade.review_repo.bulk_insert([entry['row'] for entry in entries])
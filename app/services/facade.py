@@ -1,3 +1,4 @@
+import re
 from app.persistence.repository import InMemoryRepository
 from app.persistence.user_repository import UserRepository
 from app.persistence.place_repository import PlaceRepository
@@ -7,8 +8,21 @@ from app.models.user import User
 from app.models.amenity import Amenity
 from app.models.place import Place
 from app.models.review import Review
+from app.services.bulk_import import BulkImporter
+from app.extensions import response_cache, replica_router, request_profiler
+from app.persistence.unit_of_work import after_commit, transactional
 
+# Largest radius accepted by the nearby-places search
+MAX_SEARCH_RADIUS_KM = 500
+# Orderings accepted by the place list (None keeps creation order)
+PLACE_SORT_KEYS = (None, 'price', '-price')
+# Orderings accepted by the reviews of a place (None is newest first)
+REVIEW_SORT_KEYS = (None, 'created_at', '-created_at', 'rating', '-rating')
+# Most words of a full-text search query
+MAX_SEARCH_TERMS = 10
 
+
+@request_profiler.traced
 class HBnBFacade:
     def __init__(self):
         self.user_repo = UserRepository()
@@ -17,6 +31,7 @@ class HBnBFacade:
         self.amenity_repo = AmenityRepository()
 
     # ==================== USER METHODS ====================
+    @transactional
     def create_user(self, user_data):
         """Create a new user with hashed password"""
         user_exists = self.get_user_by_email(user_data.get('email'))
@@ -27,18 +42,37 @@ class HBnBFacade:
         self.user_repo.add(user)
         return user
 
-    def get_user(self, user_id):
+    @replica_router.read_only
+    def get_user(self, user_id, projection=None):
         """Retrieve a user by ID"""
-        return self.user_repo.get(user_id)
+        return self.user_repo.get(user_id, projection)
 
+    @replica_router.read_only
     def get_user_by_email(self, email):
         """Retrieve a user by email"""
         return self.user_repo.get_user_by_email(email)
 
-    def get_all_users(self):
+    def authenticate_user(self, email, password):
+        """Return the user matching the credentials, or None
+
+        A hash made with another bcrypt work factor than the configured one
+        is replaced on successful login, while the plain password is known.
+        """
+        # Read from the primary: a replica may lag behind a just created account
+        user = self.user_repo.get_user_by_email(email)
+        if not user or not user.verify_password(password):
+            return None
+        if user.password_needs_rehash():
+            user.hash_password(password)
+            user.save()
+        return user
+
+    @replica_router.read_only
+    def get_all_users(self, projection=None):
         """Retrieve all users"""
-        return self.user_repo.get_all()
+        return self.user_repo.get_all(projection)
 
+    @transactional
     def update_user(self, user_id, user_data):
         """Update user information"""
         user = self.get_user(user_id)
@@ -55,32 +89,37 @@ class HBnBFacade:
             del user_data['password']
         
         self.user_repo.update(user_id, user_data)
+        # Owner and reviewer names are embedded in place details
+        after_commit(response_cache.invalidate, 'places')
         return user
 
     # ==================== AMENITY METHODS ====================
+    @transactional
     def create_amenity(self, amenity_data):
         """Create a new amenity"""
         amenity_name = amenity_data.get('name')
         if not amenity_name:
             raise ValueError("Amenity name is required")
         
-        existing_amenities = self.get_all_amenities()
-        for amenity in existing_amenities:
-            if amenity.name.lower() == amenity_name.lower():
-                raise ValueError(f"Amenity with name {amenity_name} already exists")
+        if self.amenity_repo.get_amenity_by_name(amenity_name):
+            raise ValueError(f"Amenity with name {amenity_name} already exists")
         
         amenity = Amenity(**amenity_data)
         self.amenity_repo.add(amenity)
+        after_commit(response_cache.invalidate, 'amenities')
         return amenity
 
-    def get_all_amenities(self):
+    @replica_router.read_only
+    def get_all_amenities(self, projection=None):
         """Retrieve all amenities"""
-        return self.amenity_repo.get_all()
+        return self.amenity_repo.get_all(projection)
 
-    def get_amenity(self, amenity_id):
+    @replica_router.read_only
+    def get_amenity(self, amenity_id, projection=None):
         """Retrieve an amenity by ID"""
-        return self.amenity_repo.get(amenity_id)
+        return self.amenity_repo.get(amenity_id, projection)
 
+    @transactional
     def update_amenity(self, amenity_id, amenity_data):
         """Update an amenity"""
         amenity = self.get_amenity(amenity_id)
@@ -89,15 +128,16 @@ class HBnBFacade:
         
         new_name = amenity_data.get('name')
         if new_name:
-            existing_amenities = self.get_all_amenities()
-            for other_amenity in existing_amenities:
-                if other_amenity.name.lower() == new_name.lower() and other_amenity.id != amenity_id:
-                    raise ValueError(f"Amenity with name {new_name} already exists")
+            other_amenity = self.amenity_repo.get_amenity_by_name(new_name)
+            if other_amenity and other_amenity.id != amenity_id:
+                raise ValueError(f"Amenity with name {new_name} already exists")
         
         self.amenity_repo.update(amenity_id, amenity_data)
+        after_commit(response_cache.invalidate, 'amenities', 'places')
         return amenity
 
     # ==================== PLACE METHODS ====================
+    @transactional
     def create_place(self, place_data):
         """Create a new place"""
         owner_id = place_data.get('owner_id')
@@ -123,16 +163,101 @@ class HBnBFacade:
             owner=owner
         )
         self.place_repo.add(place)
+        after_commit(response_cache.invalidate, 'places')
         return place
 
-    def get_place(self, place_id):
+    @replica_router.read_only
+    def get_place(self, place_id, projection=None):
         """Retrieve a place by ID"""
-        return self.place_repo.get(place_id)
+        return self.place_repo.get(place_id, projection)
+
+    @replica_router.read_only
+    def get_place_detail(self, place_id, review_limit, projection=None, with_reviews=True):
+        """Retrieve a place with its owner and amenities, and its latest reviews with their authors
 
-    def get_all_places(self):
+        Returns (place, reviews, cursor of the next page of reviews), or
+        (None, [], None) when the place does not exist. The place comes with
+        one statement and the first ``review_limit`` reviews with another,
+        however many there are.
+        """
+        place = self.place_repo.get_detail(place_id, projection)
+        if place is None or not with_reviews:
+            return place, [], None
+        return (place, *self.review_repo.get_place_reviews_page(place_id, review_limit))
+
+    @replica_router.read_only
+    def get_all_places(self, projection=None):
         """Retrieve all places"""
-        return self.place_repo.get_all()
+        return self.place_repo.get_all(projection)
+
+    @replica_router.read_only
+    def get_places_page(self, limit, cursor=None, min_price=None, max_price=None, sort=None, projection=None,
+                        amenity_ids=None):
+        """Retrieve a page of places and the cursor of the following page
+
+        ``projection`` is the attribute tree of a sparse fieldset: only
+        those columns and relationships are loaded. With ``amenity_ids``,
+        only places having all of those amenities are listed.
+        """
+        for price in (min_price, max_price):
+            if price is not None and price < 0:
+                raise ValueError("Price filters must not be negative")
+        if min_price is not None and max_price is not None and min_price > max_price:
+            raise ValueError("min_price must not be greater than max_price")
+        if sort not in PLACE_SORT_KEYS:
+            raise ValueError(f"Sort must be one of: {', '.join(key for key in PLACE_SORT_KEYS if key)}")
+        if amenity_ids:
+            unknown = set(amenity_ids) - self.amenity_repo.get_existing_ids(set(amenity_ids))
+            if unknown:
+                raise ValueError(f"Unknown amenity id(s): {', '.join(sorted(unknown))}")
+        return self.place_repo.get_places_page(limit, cursor, min_price, max_price, sort, projection, amenity_ids)
+
+    @replica_router.read_only
+    def search_places_within_radius(self, latitude, longitude, radius_km, limit, projection=None):
+        """Retrieve the places nearest to a point as (place, distance_km) pairs"""
+        self._validate_coordinates(latitude, longitude)
+        if not isinstance(radius_km, (int, float)) or radius_km <= 0:
+            raise ValueError("Radius must be a positive number")
+        if radius_km > MAX_SEARCH_RADIUS_KM:
+            raise ValueError(f"Radius must not exceed {MAX_SEARCH_RADIUS_KM} km")
+        return self.place_repo.get_places_within_radius(latitude, longitude, radius_km, limit, projection)
+
+    @replica_router.read_only
+    def search_places_in_bbox(self, min_lat, min_lng, max_lat, max_lng, limit, cursor=None, projection=None):
+        """Retrieve a page of places inside a bounding box
+
+        A box whose min_lng is greater than its max_lng crosses the antimeridian.
+        """
+        self._validate_coordinates(min_lat, min_lng)
+        self._validate_coordinates(max_lat, max_lng)
+        if min_lat > max_lat:
+            raise ValueError("min_lat must not be greater than max_lat")
+        return self.place_repo.get_places_in_bbox(min_lat, min_lng, max_lat, max_lng, limit, cursor, projection)
 
+    @replica_router.read_only
+    def search_places_text(self, query, limit, cursor=None, projection=None):
+        """Retrieve a page of (place, relevance) pairs matching the words of a query, best first"""
+        terms = re.findall(r'\w+', query or '')
+        if not terms:
+            raise ValueError("Search query must contain at least one word")
+        if len(terms) > MAX_SEARCH_TERMS:
+            raise ValueError(f"Search query must not contain more than {MAX_SEARCH_TERMS} words")
+        return self.place_repo.search_text(terms, limit, cursor, projection)
+
+    @transactional
+    def rebuild_search_index(self):
+        """Create missing full-text indexes and rebuild the SQLite ones"""
+        return self.place_repo.rebuild_text_index()
+
+    @staticmethod
+    def _validate_coordinates(latitude, longitude):
+        """Validate a search point against the geographic ranges"""
+        if not isinstance(latitude, (int, float)) or not -90.0 <= latitude <= 90.0:
+            raise ValueError("Latitude must be between -90.0 and 90.0")
+        if not isinstance(longitude, (int, float)) or not -180.0 <= longitude <= 180.0:
+            raise ValueError("Longitude must be between -180.0 and 180.0")
+
+    @transactional
     def update_place(self, place_id, place_data):
         """Update a place"""
         place = self.get_place(place_id)
@@ -147,8 +272,10 @@ class HBnBFacade:
             del place_data['owner_id']
         
         self.place_repo.update(place_id, place_data)
+        after_commit(response_cache.invalidate, 'places')
         return place
 
+    @transactional
     def delete_place(self, place_id):
         """Delete a place"""
         place = self.get_place(place_id)
@@ -156,9 +283,19 @@ class HBnBFacade:
             return False
         
         self.place_repo.delete(place_id)
+        after_commit(response_cache.invalidate, 'places', 'reviews')
         return True
 
+    @transactional
+    def add_amenity_to_place(self, place, amenity):
+        """Attach an amenity to a place"""
+        place.add_amenity(amenity)
+        place.save()
+        after_commit(response_cache.invalidate, 'places')
+        return place
+
     # ==================== REVIEW METHODS ====================
+    @transactional
     def create_review(self, review_data):
         """Create a new review"""
         user_id = review_data.get('user_id')
@@ -173,18 +310,16 @@ class HBnBFacade:
         if not user:
             raise ValueError("User not found")
         
-        place = self.get_place(place_id)
+        # The place's rating columns are updated; its amenities are not needed
+        place = self.place_repo.get_row(place_id)
         if not place:
             raise ValueError("Place not found")
         
-        if place.owner.id == user_id:
+        if place.owner_id == user_id:
             raise ValueError("You cannot review your own place")
         
-        existing_reviews = self.get_reviews_by_place(place_id)
-        if existing_reviews:
-            for review in existing_reviews:
-                if review.user.id == user_id:
-                    raise ValueError("You have already reviewed this place")
+        if self.review_repo.user_has_reviewed_place(user_id, place_id):
+            raise ValueError("You have already reviewed this place")
         
         text = review_data.get('text')
         rating = review_data.get('rating')
@@ -195,28 +330,48 @@ class HBnBFacade:
             place=place,
             user=user
         )
+        place.apply_rating_change(added=review.rating)
         self.review_repo.add(review)
         place.add_review(review)
+        after_commit(response_cache.invalidate, 'reviews', 'places')
         return review
 
-    def get_review(self, review_id):
+    @replica_router.read_only
+    def get_review(self, review_id, projection=None):
         """Retrieve a review by ID"""
-        return self.review_repo.get(review_id)
+        return self.review_repo.get(review_id, projection)
 
-    def get_all_reviews(self):
+    @replica_router.read_only
+    def get_all_reviews(self, projection=None):
         """Retrieve all reviews"""
-        return self.review_repo.get_all()
+        return self.review_repo.get_all(projection)
 
-    def get_reviews_by_place(self, place_id):
+    @replica_router.read_only
+    def get_reviews_by_place(self, place_id, projection=None):
         """Retrieve all reviews for a specific place"""
         place = self.get_place(place_id)
         if not place:
             return None
-        return place.reviews
+        return self.review_repo.get_reviews_by_place(place_id, projection)
 
+    @replica_router.read_only
+    def get_place_reviews_page(self, place_id, limit, cursor=None, sort=None, rating=None, projection=None):
+        """Retrieve a page of a place's reviews and the next cursor, or None when the place does not exist"""
+        if sort not in REVIEW_SORT_KEYS:
+            raise ValueError(f"Sort must be one of: {', '.join(key for key in REVIEW_SORT_KEYS if key)}")
+        if rating is not None and not 1 <= rating <= 5:
+            raise ValueError("Rating must be between 1 and 5")
+        reviews, next_cursor = self.review_repo.get_place_reviews_page(place_id, limit, cursor, sort, rating, projection)
+        # Reviews imply their place exists; only an empty page needs checking
+        if not reviews and not self.place_repo.get_existing_ids([place_id]):
+            return None
+        return reviews, next_cursor
+
+    @transactional
     def update_review(self, review_id, review_data):
         """Update a review"""
-        review = self.get_review(review_id)
+        # The rating delta must come from the primary's current row
+        review = self.review_repo.get_for_update(review_id)
         if not review:
             return None
         
@@ -239,17 +394,51 @@ class HBnBFacade:
             review_data['place'] = new_place
             del review_data['place_id']
         
+        old_place, old_rating = review.place, review.rating
+        new_place = review_data.get('place', old_place)
+        new_rating = review_data.get('rating', old_rating)
+        if new_place is old_place:
+            if new_rating != old_rating:
+                old_place.apply_rating_change(added=new_rating, removed=old_rating)
+        else:
+            old_place.apply_rating_change(removed=old_rating)
+            new_place.apply_rating_change(added=new_rating)
+        
         self.review_repo.update(review_id, review_data)
+        after_commit(response_cache.invalidate, 'reviews', 'places')
         return review
 
+    @transactional
     def delete_review(self, review_id):
         """Delete a review"""
-        review = self.get_review(review_id)
+        # The rating removed must come from the primary's current row
+        review = self.review_repo.get_for_update(review_id)
         if not review:
             return False
         
-        if review.place and review in review.place.reviews:
-            review.place.reviews.remove(review)
+        if review.place:
+            review.place.apply_rating_change(removed=review.rating)
         
         self.review_repo.delete(review_id)
+        after_commit(response_cache.invalidate, 'reviews', 'places')
         return True
+
+    # ==================== BULK IMPORT METHODS ====================
+    def bulk_import(self, kind, records, default_owner_id=None, batch_size=1000, max_errors=1000):
+        """Import amenities, places or reviews in batches and return a per-row report
+
+        ``records`` yields (index, record) pairs; places without an owner_id
+        are owned by ``default_owner_id``.
+        """
+        importer = BulkImporter(self, batch_size, max_errors)
+        report = importer.import_records(kind, records, default_owner_id)
+        if report['imported']:
+            after_commit(response_cache.invalidate, kind, 'places')
+        return report
+
+    @transactional
+    def recompute_place_ratings(self, place_id=None):
+        """Rebuild place rating aggregates from the reviews and return the number of places updated"""
+        updated = self.place_repo.recompute_rating_aggregates(place_id)
+        after_commit(response_cache.invalidate, 'places')
+        return updated
@@ -0,0 +1,12 @@
+"""ASGI entry point: the application of run.py with its read endpoints served asynchronously
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+
+GET requests for places, reviews and amenities query the database through
+an async driver on the event loop; other requests run in a thread pool.
+See app.asgi.AsyncReadApp.
+"""
+from app.asgi import AsyncReadApp
+from run import app as flask_app
+
+app = AsyncReadApp(flask_app)
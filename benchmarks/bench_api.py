@@ -0,0 +1,443 @@
+"""Benchmark every HBnB API endpoint against a database seeded at realistic scale
+
+The database is filled with synthetic users, places, reviews and amenities
+through batched inserts. Every endpoint of app/api/v1 is then driven
+through the Flask test client. For each endpoint the script reports p50,
+p95 and p99 latency, SQL queries per request and peak resident memory, and
+writes the results to a JSON baseline. A later run can be compared against
+that baseline to catch regressions between commits.
+
+Usage:
+    python benchmarks/bench_api.py --places 10000 --output benchmarks/baseline.json
+    python benchmarks/bench_api.py --places 10000 --compare benchmarks/baseline.json
+    python benchmarks/bench_api.py --database-url mysql+mysqlconnector://... --places 1000000 --reviews-per-place 10
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event, insert, select
+from config import TestingConfig
+from app import create_app, db
+from app.extensions import password_hasher
+from app.models.user import User
+from app.models.place import Place
+from app.models.review import Review
+from app.models.amenity import Amenity
+from app.models.place_amenity import place_amenity
+
+ADMIN_EMAIL = "bench-admin@example.com"
+PASSWORD = "bench-password"
+BATCH_SIZE = 5000
+# Synthetic places are spread over this (min_lat, min_lng, max_lat, max_lng) region
+REGION = (35.0, -10.0, 60.0, 30.0)
+# Endpoints returning a whole table run fewer iterations
+FULL_SCAN_ITERATIONS = 5
+# Records sent per admin bulk import request
+IMPORT_SIZE = 100
+
+
+# ==================== SEEDING ====================
+
+
+def build_app(database_url, response_cache, entity_cache):
+    """Create an app for the benchmark database"""
+    config = type('ApiBenchConfig', (TestingConfig,), {
+        'SQLALCHEMY_DATABASE_URI': database_url,
+        'RESPONSE_CACHE_ENABLED': response_cache,
+        'ENTITY_CACHE_ENABLED': entity_cache,
+    })
+    return create_app(config_class=config)
+
+
+def insert_batches(table, rows):
+    """Insert rows with one executemany per batch"""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == BATCH_SIZE:
+            db.session.execute(insert(table), batch)
+            batch = []
+    if batch:
+        db.session.execute(insert(table), batch)
+    db.session.commit()
+
+
+def seed(places, reviews_per_place, users, amenities, seed_value):
+    """Fill an empty schema with synthetic rows and an admin user"""
+    rng = random.Random(seed_value)
+    now = datetime.utcnow()
+    password = password_hasher.hash(PASSWORD)
+
+    user_ids = [str(uuid.uuid4()) for _ in range(users)]
+    insert_batches(User.__table__, (
+        {'id': user_id, 'first_name': f"User{i}", 'last_name': "Bench", 'email': f"user{i}@example.com",
+         'password': password, 'is_admin': False, 'created_at': now, 'updated_at': now}
+        for i, user_id in enumerate(user_ids)
+    ))
+    admin = User(first_name="Bench", last_name="Admin", email=ADMIN_EMAIL, password=PASSWORD, is_admin=True)
+    db.session.add(admin)
+    db.session.commit()
+
+    amenity_ids = [str(uuid.uuid4()) for _ in range(amenities)]
+    insert_batches(Amenity.__table__, (
+        {'id': amenity_id, 'name': f"Amenity {i}", 'name_key': f"amenity {i}",
+         'created_at': now, 'updated_at': now}
+        for i, amenity_id in enumerate(amenity_ids)
+    ))
+
+    min_lat, min_lng, max_lat, max_lng = REGION
+
+    def place_rows():
+        for i in range(places):
+            latitude = round(rng.uniform(min_lat, max_lat), 6)
+            longitude = round(rng.uniform(min_lng, max_lng), 6)
+            created_at = now - timedelta(seconds=places - i)
+            ratings = [rng.randint(1, 5) for _ in range(reviews_per_place)]
+            row = {
+                'id': str(uuid.uuid4()), 'title': f"Place {i}", 'description': "Synthetic benchmark place",
+                'price': float(rng.randint(10, 500)), 'latitude': latitude, 'longitude': longitude,
+                'grid_cell': Place.grid_cell_for(latitude, longitude), 'owner_id': user_ids[i % users],
+                'created_at': created_at, 'updated_at': created_at,
+                'review_count': len(ratings), 'rating_sum': sum(ratings),
+            }
+            for star in range(1, 6):
+                row[f'rating_{star}_count'] = ratings.count(star)
+            yield row, ratings
+
+    place_batch, review_batch, link_batch = [], [], []
+
+    def flush():
+        db.session.execute(insert(Place.__table__), place_batch)
+        if review_batch:
+            db.session.execute(insert(Review.__table__), review_batch)
+        if link_batch:
+            db.session.execute(insert(place_amenity), link_batch)
+        db.session.commit()
+        place_batch.clear()
+        review_batch.clear()
+        link_batch.clear()
+
+    for i, (row, ratings) in enumerate(place_rows()):
+        place_batch.append(row)
+        # Reviewers follow the owner in the user list: distinct, never the owner
+        for j, rating in enumerate(ratings):
+            review_batch.append({
+                'id': str(uuid.uuid4()), 'text': f"Review {j} of place {i}", 'rating': rating,
+                'user_id': user_ids[(i + 1 + j) % users], 'place_id': row['id'],
+                'created_at': row['created_at'], 'updated_at': row['created_at'],
+            })
+        for amenity_id in rng.sample(amenity_ids, min(3, len(amenity_ids))):
+            link_batch.append({'place_id': row['id'], 'amenity_id': amenity_id})
+        if len(place_batch) == BATCH_SIZE:
+            flush()
+            print(f"  seeded {i + 1}/{places} places", flush=True)
+    if place_batch:
+        flush()
+
+
+def sample_ids(model, count):
+    """Return up to count ids of existing rows"""
+    return list(db.session.scalars(select(model.id).limit(count)))
+
+
+# ==================== SCENARIOS ====================
+
+
+def scenarios(run_id):
+    """Return the requests to benchmark as (name, method, prepare, record, iterations)
+
+    ``prepare(ctx, i)`` returns the path and keyword arguments of request i;
+    ``record(ctx, data)`` keeps ids created by write requests for later ones.
+    ``iterations`` is None for the default count.
+    """
+    def keep(key):
+        def record(ctx, data):
+            if isinstance(data, dict) and 'id' in data:
+                ctx.setdefault(key, []).append(data['id'])
+        return record
+
+    def pick(ctx, key, i):
+        values = ctx[key]
+        return values[i % len(values)]
+
+    def import_records(kind, i):
+        if kind == 'amenities':
+            return [{'name': f"Imported {run_id} {i} {n}"} for n in range(IMPORT_SIZE)]
+        return [{'title': f"Imported place {i} {n}", 'description': "", 'price': 90.0,
+                 'latitude': 45.0 + n / 1000, 'longitude': 5.0} for n in range(IMPORT_SIZE)]
+
+    return [
+        # Reads
+        ('auth.protected', 'GET', lambda ctx, i: ('/api/v1/auth/protected', {'headers': ctx['headers']}), None, None),
+        ('users.list', 'GET', lambda ctx, i: ('/api/v1/users/', {}), None, FULL_SCAN_ITERATIONS),
+        ('users.detail', 'GET', lambda ctx, i: (f"/api/v1/users/{pick(ctx, 'users', i)}", {}), None, None),
+        ('amenities.list', 'GET', lambda ctx, i: ('/api/v1/amenities/', {}), None, None),
+        ('amenities.detail', 'GET', lambda ctx, i: (f"/api/v1/amenities/{pick(ctx, 'amenities', i)}", {}), None, None),
+        ('places.list', 'GET', lambda ctx, i: ('/api/v1/places/', {}), None, None),
+        ('places.list_next_page', 'GET',
+         lambda ctx, i: ('/api/v1/places/', {'query_string': {'cursor': ctx['cursor']}}), None, None),
+        ('places.list_price_filter', 'GET',
+         lambda ctx, i: ('/api/v1/places/', {'query_string': {'min_price': 100, 'max_price': 200, 'sort': 'price'}}),
+         None, None),
+        ('places.list_amenity_filter', 'GET',
+         lambda ctx, i: ('/api/v1/places/', {'query_string': {'amenities': pick(ctx, 'amenities', i)}}), None, None),
+        ('places.list_two_amenities', 'GET',
+         lambda ctx, i: ('/api/v1/places/', {'query_string': {'amenities': ','.join(
+             (pick(ctx, 'amenities', i), pick(ctx, 'amenities', i + 1)))}}), None, None),
+        ('places.list_fields', 'GET',
+         lambda ctx, i: ('/api/v1/places/', {'query_string': {'fields': 'id,title,price'}}), None, None),
+        # Seeded titles read "Place <n>" and reviews "Review <j> of place <n>": a number matches a few places
+        ('places.search_text', 'GET',
+         lambda ctx, i: ('/api/v1/places/search', {'query_string': {'q': str(i + 1)}}), None, None),
+        ('places.search_radius', 'GET',
+         lambda ctx, i: ('/api/v1/places/search', {'query_string': dict(zip(
+             ('lat', 'lng'), pick(ctx, 'centers', i)), radius_km=25)}), None, None),
+        ('places.search_bbox', 'GET',
+         lambda ctx, i: ('/api/v1/places/search', {'query_string': dict(zip(
+             ('min_lat', 'min_lng'), [c - 0.5 for c in pick(ctx, 'centers', i)]), **dict(zip(
+             ('max_lat', 'max_lng'), [c + 0.5 for c in pick(ctx, 'centers', i)])))}), None, None),
+        ('places.detail', 'GET', lambda ctx, i: (f"/api/v1/places/{pick(ctx, 'places', i)}", {}), None, None),
+        ('places.reviews', 'GET', lambda ctx, i: (f"/api/v1/places/{pick(ctx, 'places', i)}/reviews", {}), None, None),
+        ('places.reviews_by_rating', 'GET', lambda ctx, i: (f"/api/v1/places/{pick(ctx, 'places', i)}/reviews", {
+            'query_string': {'sort': '-rating'}}), None, None),
+        ('places.reviews_rating_filter', 'GET', lambda ctx, i: (f"/api/v1/places/{pick(ctx, 'places', i)}/reviews", {
+            'query_string': {'rating': 1 + i % 5}}), None, None),
+        ('places.reviews_fields', 'GET', lambda ctx, i: (f"/api/v1/places/{pick(ctx, 'places', i)}/reviews", {
+            'query_string': {'fields': 'id,rating'}}), None, None),
+        ('reviews.list', 'GET', lambda ctx, i: ('/api/v1/reviews/', {}), None, FULL_SCAN_ITERATIONS),
+        ('reviews.detail', 'GET', lambda ctx, i: (f"/api/v1/reviews/{pick(ctx, 'reviews', i)}", {}), None, None),
+        ('admin.entity_cache', 'GET', lambda ctx, i: ('/api/v1/admin/entity-cache', {'headers': ctx['headers']}),
+         None, None),
+        ('admin.db_pool', 'GET', lambda ctx, i: ('/api/v1/admin/db-pool', {'headers': ctx['headers']}), None, None),
+        # Writes
+        ('auth.login', 'POST',
+         lambda ctx, i: ('/api/v1/auth/login', {'json': {'email': ADMIN_EMAIL, 'password': PASSWORD}}), None, None),
+        ('users.create', 'POST', lambda ctx, i: ('/api/v1/users/', dict(headers=ctx['headers'], json={
+            'first_name': "New", 'last_name': "User", 'email': f"new-{run_id}-{i}@example.com",
+            'password': PASSWORD})), keep('new_users'), None),
+        ('users.update', 'PUT', lambda ctx, i: (f"/api/v1/users/{pick(ctx, 'new_users', i)}", dict(
+            headers=ctx['headers'], json={'first_name': f"Renamed{i}"})), None, None),
+        ('amenities.create', 'POST', lambda ctx, i: ('/api/v1/amenities/', dict(
+            headers=ctx['headers'], json={'name': f"New {run_id} {i}"})), keep('new_amenities'), None),
+        ('amenities.update', 'PUT', lambda ctx, i: (f"/api/v1/amenities/{pick(ctx, 'new_amenities', i)}", dict(
+            headers=ctx['headers'], json={'name': f"Renamed {run_id} {i}"})), None, None),
+        ('places.create', 'POST', lambda ctx, i: ('/api/v1/places/', dict(headers=ctx['headers'], json={
+            'title': f"New place {i}", 'description': "", 'price': 120.0,
+            'latitude': 45.0, 'longitude': 5.0})), keep('new_places'), None),
+        ('places.update', 'PUT', lambda ctx, i: (f"/api/v1/places/{pick(ctx, 'new_places', i)}", dict(
+            headers=ctx['headers'], json={'title': f"Updated place {i}", 'price': 130.0,
+                                          'latitude': 45.0, 'longitude': 5.0})), None, None),
+        ('places.add_amenity', 'POST', lambda ctx, i: (f"/api/v1/places/{pick(ctx, 'new_places', i)}/amenities", dict(
+            headers=ctx['headers'], json={'amenity_id': pick(ctx, 'amenities', i)})), None, None),
+        ('reviews.create', 'POST', lambda ctx, i: ('/api/v1/reviews/', dict(headers=ctx['headers'], json={
+            'text': "Benchmark review", 'rating': 1 + i % 5,
+            'place_id': pick(ctx, 'places', i)})), keep('new_reviews'), None),
+        ('reviews.update', 'PUT', lambda ctx, i: (f"/api/v1/reviews/{pick(ctx, 'new_reviews', i)}", dict(
+            headers=ctx['headers'], json={'text': "Updated review", 'rating': 5 - i % 5})), None, None),
+        # Review imports are left out: each needs a user and place pair not reviewed yet
+        ('admin.import_amenities', 'POST', lambda ctx, i: ('/api/v1/admin/import/amenities', dict(
+            headers=ctx['headers'], json=import_records('amenities', i))), None, FULL_SCAN_ITERATIONS),
+        ('admin.import_places', 'POST', lambda ctx, i: ('/api/v1/admin/import/places', dict(
+            headers=ctx['headers'], json=import_records('places', i))), None, FULL_SCAN_ITERATIONS),
+        # Deletes consume the rows created above, one per request
+        ('reviews.delete', 'DELETE', lambda ctx, i: (f"/api/v1/reviews/{ctx['new_reviews'][i]}", {'headers': ctx['headers']}), None, None),
+        ('places.delete', 'DELETE', lambda ctx, i: (f"/api/v1/places/{ctx['new_places'][i]}", {'headers': ctx['headers']}), None, None),
+    ]
+
+
+# ==================== MEASUREMENT ====================
+
+
+def peak_rss_mb():
+    """Return the peak resident set size of this process in megabytes"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def percentile(quantiles, rank):
+    """Return the given percentile (1-99) from statistics.quantiles(n=100)"""
+    return round(quantiles[rank - 1] * 1000, 3)
+
+
+def measure(app, client, engine, ctx, scenario, iterations, warmup):
+    """Run one scenario and return its statistics"""
+    name, method, prepare, record, scenario_iterations = scenario
+    iterations = min(iterations, scenario_iterations or iterations)
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    latencies, queries, failures = [], [], 0
+    path = None
+    for i in range(warmup + iterations):
+        path, kwargs = prepare(ctx, i)
+        statements.clear()
+        event.listen(engine, 'before_cursor_execute', count)
+        start = time.perf_counter()
+        response = client.open(path, method=method, **kwargs)
+        elapsed = time.perf_counter() - start
+        event.remove(engine, 'before_cursor_execute', count)
+
+        if response.status_code >= 400:
+            failures += 1
+        if record:
+            record(ctx, response.get_json(silent=True))
+        if i >= warmup:
+            latencies.append(elapsed)
+            queries.append(len(statements))
+
+    quantiles = statistics.quantiles(latencies, n=100, method='inclusive') if len(latencies) > 1 else latencies * 99
+    return {
+        'method': method,
+        'path': path,
+        'iterations': len(latencies),
+        'failures': failures,
+        'p50_ms': percentile(quantiles, 50),
+        'p95_ms': percentile(quantiles, 95),
+        'p99_ms': percentile(quantiles, 99),
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 3),
+        'queries_per_request': round(statistics.fmean(queries), 2),
+        'max_queries': max(queries),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+    }
+
+
+def prepare_context(app, client):
+    """Log in as the benchmark admin and collect ids for the scenarios"""
+    response = client.post('/api/v1/auth/login', json={'email': ADMIN_EMAIL, 'password': PASSWORD})
+    assert response.status_code == 200, response.get_data(as_text=True)
+    ctx = {'headers': {'Authorization': f"Bearer {response.get_json()['access_token']}"}}
+
+    with app.app_context():
+        ctx['users'] = sample_ids(User, 200)
+        ctx['amenities'] = sample_ids(Amenity, 200)
+        ctx['places'] = sample_ids(Place, 2000)
+        ctx['reviews'] = sample_ids(Review, 200)
+        ctx['centers'] = [(place.latitude, place.longitude) for place in
+                          db.session.scalars(select(Place).where(Place.id.in_(ctx['places'][:50])))]
+
+    first_page = client.get('/api/v1/places/').get_json()
+    ctx['cursor'] = first_page['next_cursor']
+    return ctx
+
+
+def git_commit():
+    """Return the current commit hash, if the script runs inside a git checkout"""
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path, threshold):
+    """Print endpoints slower or chattier than the baseline and return their number"""
+    with open(baseline_path) as baseline_file:
+        baseline = json.load(baseline_file)['endpoints']
+
+    regressions = 0
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        for metric in ('p95_ms', 'queries_per_request'):
+            if previous[metric] and current[metric] > previous[metric] * (1 + threshold):
+                regressions += 1
+                print(f"REGRESSION {name} {metric}: {previous[metric]} -> {current[metric]}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--places', type=int, default=10000, help='Number of places to seed')
+    parser.add_argument('--reviews-per-place', type=int, default=10, help='Reviews seeded for every place')
+    parser.add_argument('--users', type=int, help='Number of users to seed (default: places / 10)')
+    parser.add_argument('--amenities', type=int, default=30, help='Number of amenities to seed')
+    parser.add_argument('--iterations', type=int, default=50, help='Measured requests per endpoint')
+    parser.add_argument('--warmup', type=int, default=3, help='Unmeasured requests per endpoint')
+    parser.add_argument('--database-url', help='Database to benchmark (default: a temporary SQLite file)')
+    parser.add_argument('--no-seed', action='store_true', help='Reuse the data already in --database-url')
+    parser.add_argument('--response-cache', action='store_true', help='Enable the in-process response cache')
+    parser.add_argument('--entity-cache', action='store_true', help='Enable the entity cache of primary-key lookups')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed of the synthetic data')
+    parser.add_argument('--output', help='Write the results to this JSON file')
+    parser.add_argument('--compare', help='Baseline JSON file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Tolerated slowdown before reporting (0.2 = 20%%)')
+    args = parser.parse_args()
+
+    users = args.users or max(args.places // 10, args.reviews_per_place + 2)
+    if users <= args.reviews_per_place:
+        parser.error("--users must be greater than --reviews-per-place")
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_url = args.database_url or f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        app = build_app(database_url, args.response_cache, args.entity_cache)
+        client = app.test_client()
+
+        with app.app_context():
+            engine = db.engine
+            if not args.no_seed:
+                db.drop_all()
+                db.create_all()
+                print(f"Seeding {args.places} places, {args.places * args.reviews_per_place} reviews, "
+                      f"{users} users, {args.amenities} amenities")
+                start = time.perf_counter()
+                seed(args.places, args.reviews_per_place, users, args.amenities, args.seed)
+                print(f"Seeded in {time.perf_counter() - start:.1f}s")
+        seeded_rss = round(peak_rss_mb(), 1)
+
+        ctx = prepare_context(app, client)
+        run_id = uuid.uuid4().hex[:8]
+        results = {}
+        print(f"{'endpoint':<28} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'queries':>8} {'rss MB':>8}")
+        for scenario in scenarios(run_id):
+            result = measure(app, client, engine, ctx, scenario, args.iterations, args.warmup)
+            results[scenario[0]] = result
+            flag = f"  ({result['failures']} failed)" if result['failures'] else ""
+            print(f"{scenario[0]:<28} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f} "
+                  f"{result['queries_per_request']:>8} {result['peak_rss_mb']:>8}{flag}")
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.utcnow().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'database': engine.dialect.name,
+            'places': args.places,
+            'reviews_per_place': args.reviews_per_place,
+            'users': users,
+            'amenities': args.amenities,
+            'iterations': args.iterations,
+            'response_cache': args.response_cache,
+            'entity_cache': args.entity_cache,
+            'seeded_rss_mb': seeded_rss,
+            'peak_rss_mb': round(peak_rss_mb(), 1),
+        },
+        'endpoints': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(report, output_file, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
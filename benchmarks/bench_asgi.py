@@ -0,0 +1,289 @@
+"""Benchmark read throughput at high concurrency: threaded WSGI server vs async ASGI mode
+
+The same application serves a mix of read requests (place list, place
+detail, place reviews, review detail, amenity list) in two modes, each in
+its own server process:
+
+* sync: the threaded Werkzeug server that ``app.run`` starts, one thread
+  per connection, querying through the regular engine;
+* async: ``asgi.py``'s AsyncReadApp under uvicorn, with the read endpoints
+  querying an async engine on the event loop.
+
+An asyncio load generator keeps ``--clients`` keep-alive connections busy
+for ``--duration`` seconds and reports requests per second, latency
+percentiles and errors for each mode, with the peak thread count and
+resident memory of the server during the run.
+
+By default the data is generated into a throwaway SQLite file. SQLite
+queries are local, so ``--db-latency-ms`` makes every statement wait like
+a round trip to a database server: the sync mode waits in the request
+thread, as a blocking driver does, the async mode in aiosqlite's
+connection thread while the event loop serves other requests. A real
+networked database is benchmarked with --database-url.
+
+Usage:
+    python benchmarks/bench_asgi.py --clients 500 --duration 15 --db-latency-ms 2
+    python benchmarks/bench_asgi.py --database-url mysql+pymysql://root:root@db/hbnb_db --no-seed
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from sqlalchemy import event, select
+from sqlalchemy.engine import Engine
+from config import TestingConfig
+from app import create_app, db
+from app.database.generate_data import SyntheticDataGenerator
+from app.database.loader import BatchLoader
+from app.models.place import Place
+from app.models.review import Review
+
+MODES = ('sync', 'async')
+# Time given to a server process to start listening
+STARTUP_TIMEOUT = 30
+
+
+def build_app(database_url, pool_size, response_cache):
+    """Create the application both modes serve"""
+    return create_app(config_class=type('AsgiBenchConfig', (TestingConfig,), {
+        'SQLALCHEMY_DATABASE_URI': database_url,
+        'SQLALCHEMY_ENGINE_OPTIONS': {'pool_size': pool_size, 'max_overflow': pool_size * 2, 'pool_timeout': 60},
+        'RESPONSE_CACHE_ENABLED': response_cache,
+        'REQUEST_PROFILING_ENABLED': False,
+    }))
+
+
+def seed(directory, places):
+    """Generate places, reviews and amenities into a SQLite file and return its URL"""
+    database_path = os.path.join(directory, 'asgi.db')
+    database_url = f"sqlite:///{database_path}"
+    app = build_app(database_url, pool_size=1, response_cache=False)
+    with app.app_context():
+        db.create_all(bind_key=None)
+    connection = sqlite3.connect(database_path)
+    SyntheticDataGenerator(users=max(places // 10, 10), places=places, amenities=30, reviews_per_place=5,
+                           amenities_per_place=3).load(BatchLoader(connection, placeholder='?'))
+    connection.close()
+    return database_url
+
+
+def request_paths(database_url, count, seed_value):
+    """Return a shuffled mix of read requests on sampled places and reviews"""
+    app = build_app(database_url, pool_size=1, response_cache=False)
+    rng = random.Random(seed_value)
+    with app.app_context():
+        place_ids = db.session.scalars(select(Place.id).limit(count)).all()
+        review_ids = db.session.scalars(select(Review.id).limit(count)).all()
+    paths = ['/api/v1/places/?limit=20', '/api/v1/amenities/']
+    paths += [f'/api/v1/places/{place_id}' for place_id in place_ids]
+    paths += [f'/api/v1/places/{place_id}/reviews?limit=10' for place_id in place_ids]
+    paths += [f'/api/v1/reviews/{review_id}' for review_id in review_ids]
+    rng.shuffle(paths)
+    return paths
+
+
+def add_statement_latency(seconds):
+    """Make every statement on new SQLite connections wait, as a database server round trip would"""
+    def wait(statement):
+        time.sleep(seconds)
+
+    @event.listens_for(Engine, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        if hasattr(dbapi_connection, 'run_async'):  # aiosqlite: runs in its connection thread
+            dbapi_connection.run_async(lambda connection: connection.set_trace_callback(wait))
+        else:
+            dbapi_connection.set_trace_callback(wait)
+
+
+def serve(mode, port, database_url, pool_size, response_cache, db_latency_ms):
+    """Run one server until it is killed (the body of the server subprocess)"""
+    if db_latency_ms:
+        add_statement_latency(db_latency_ms / 1000)
+    app = build_app(database_url, pool_size, response_cache)
+    if mode == 'sync':
+        from werkzeug.serving import make_server
+        server = make_server('127.0.0.1', port, app, threaded=True)
+        server.socket.listen(4096)  # As many pending connections as uvicorn accepts
+        server.serve_forever()
+    else:
+        import uvicorn
+        from app.asgi import AsyncReadApp
+        uvicorn.run(AsyncReadApp(app), host='127.0.0.1', port=port, log_level='warning', backlog=4096)
+
+
+def free_port():
+    """Return a TCP port nothing listens on"""
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+def start_server(mode, args, database_url):
+    """Start a server subprocess and wait until it accepts connections"""
+    port = free_port()
+    command = [sys.executable, os.path.abspath(__file__), '--serve', mode, '--port', str(port),
+               '--database-url', database_url, '--pool-size', str(args.pool_size),
+               '--db-latency-ms', str(args.db_latency_ms)]
+    if args.response_cache:
+        command.append('--response-cache')
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return process, port
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f"The {mode} server did not start within {STARTUP_TIMEOUT}s")
+
+
+async def fetch(connection, port, path):
+    """Send one GET on a keep-alive connection, reconnecting when needed; return (status, connection)"""
+    if connection is None:
+        connection = await asyncio.open_connection('127.0.0.1', port, limit=2 ** 20)
+    reader, writer = connection
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\n\r\n".encode('ascii'))
+    await writer.drain()
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("Connection closed by the server")
+    length, keep_alive = 0, True
+    while (line := await reader.readline()) not in (b'\r\n', b''):
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+        elif name.lower() == 'connection' and value.strip().lower() == 'close':
+            keep_alive = False
+    await reader.readexactly(length)
+    if not keep_alive:
+        writer.close()
+        connection = None
+    return int(status_line.split()[1]), connection
+
+
+async def client(port, paths, offset, stop_at, measure_from, latencies, errors):
+    """Request paths in turn until stop_at, recording the latencies after measure_from"""
+    connection = None
+    index = offset
+    while (now := time.perf_counter()) < stop_at:
+        path = paths[index % len(paths)]
+        index += 1
+        try:
+            status, connection = await fetch(connection, port, path)
+        except (OSError, asyncio.IncompleteReadError, ConnectionError):
+            if connection is not None:
+                connection[1].close()
+            connection = None
+            if now >= measure_from:
+                errors.append('connection')
+            continue
+        if now >= measure_from:
+            if status == 200:
+                latencies.append(time.perf_counter() - now)
+            else:
+                errors.append(status)
+    if connection is not None:
+        connection[1].close()
+
+
+async def sample_usage(pid, stop_at, peak):
+    """Record the peak thread count and resident memory of the server until stop_at"""
+    while time.perf_counter() < stop_at:
+        threads, rss = process_usage(pid)
+        if threads is None:
+            return
+        peak['threads'] = max(peak.get('threads', 0), threads)
+        peak['rss'] = max(peak.get('rss', 0), rss)
+        await asyncio.sleep(0.5)
+
+
+async def load(port, pid, paths, clients, duration, warmup):
+    """Drive a server with concurrent clients and return (latencies, errors, peak usage)"""
+    latencies, errors, peak = [], [], {}
+    start = time.perf_counter()
+    measure_from, stop_at = start + warmup, start + warmup + duration
+    await asyncio.gather(sample_usage(pid, stop_at, peak),
+                         *(client(port, paths, offset * 7, stop_at, measure_from, latencies, errors)
+                           for offset in range(clients)))
+    return latencies, errors, peak
+
+
+def process_usage(pid):
+    """Return the thread count and resident memory in MB of a process, from /proc on Linux"""
+    try:
+        with open(f'/proc/{pid}/status') as status:
+            fields = dict(line.split(':', 1) for line in status)
+    except OSError:
+        return None, None
+    return int(fields['Threads']), int(fields['VmRSS'].split()[0]) / 1024
+
+
+def percentile(latencies, rank):
+    """Latency percentile in milliseconds"""
+    return statistics.quantiles(latencies, n=100)[rank - 1] * 1000 if len(latencies) > 1 else float('nan')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=500, help='Concurrent keep-alive connections')
+    parser.add_argument('--duration', type=float, default=15, help='Measured seconds per mode')
+    parser.add_argument('--warmup', type=float, default=3, help='Unmeasured seconds before each measurement')
+    parser.add_argument('--places', type=int, default=10000, help='Places generated into the SQLite database')
+    parser.add_argument('--database-url', help='Database to serve (default: a generated SQLite file)')
+    parser.add_argument('--no-seed', action='store_true', help='Reuse the data already in --database-url')
+    parser.add_argument('--pool-size', type=int, default=10, help='pool_size of each engine (max_overflow is twice it)')
+    parser.add_argument('--response-cache', action='store_true', help='Enable the in-process response cache')
+    parser.add_argument('--db-latency-ms', type=float, default=0, help='Wait added to every SQLite statement')
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES), help='Modes to benchmark')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed of the request mix')
+    parser.add_argument('--serve', choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        if args.db_latency_ms and not args.database_url.startswith('sqlite'):
+            parser.error("--db-latency-ms only applies to SQLite databases")
+        serve(args.serve, args.port, args.database_url, args.pool_size, args.response_cache, args.db_latency_ms)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_url = args.database_url
+        if database_url is None or not args.no_seed:
+            if database_url is not None:
+                parser.error("Only the default SQLite database is generated: seed others first and pass --no-seed")
+            database_url = seed(directory, args.places)
+        paths = request_paths(database_url, 200, args.seed)
+
+        print(f"{args.clients} clients, {args.duration:g}s per mode, pool_size {args.pool_size}, "
+              f"database {database_url.split(':', 1)[0]}, {args.db_latency_ms:g} ms added per statement")
+        print(f"{'mode':<6} {'requests':>9} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7} "
+              f"{'threads':>8} {'RSS MB':>7}")
+        for mode in args.modes:
+            process, port = start_server(mode, args, database_url)
+            try:
+                latencies, errors, peak = asyncio.run(
+                    load(port, process.pid, paths, args.clients, args.duration, args.warmup))
+            finally:
+                process.terminate()
+                process.wait()
+            rss = f"{peak['rss']:.0f}" if 'rss' in peak else '-'
+            print(f"{mode:<6} {len(latencies):>9} {len(latencies) / args.duration:>9.0f} "
+                  f"{percentile(latencies, 50):>8.1f} {percentile(latencies, 95):>8.1f} "
+                  f"{percentile(latencies, 99):>8.1f} {len(errors):>7} {peak.get('threads', '-'):>8} "
+                  f"{rss:>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""Benchmark POST /api/v1/auth/login throughput against the bcrypt pool size
+
+Every client thread logs in repeatedly through its own Flask test client,
+so the request threads compete for the bcrypt hashing slots exactly as they
+would under a login storm.
+
+Usage:
+    python benchmarks/bench_login.py --pool-sizes 1,2,4,8 --clients 16 --logins 400 --rounds 12
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import TestingConfig
+from app import create_app, db
+from app.services import facade
+
+EMAIL = "bench@example.com"
+PASSWORD = "bench-password"
+
+
+def build_app(database_path, rounds, pool_size):
+    """Create an app on a throwaway SQLite file with one known user"""
+    config = type('LoginBenchConfig', (TestingConfig,), {
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{database_path}",
+        'BCRYPT_LOG_ROUNDS': rounds,
+        'BCRYPT_POOL_SIZE': pool_size,
+    })
+    app = create_app(config_class=config)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        facade.create_user({'first_name': "Bench", 'last_name': "User", 'email': EMAIL, 'password': PASSWORD})
+    return app
+
+
+def run(app, clients, logins):
+    """Fire the logins from concurrent clients and return (elapsed, latencies)"""
+    per_client = logins // clients
+
+    def client_loop(_):
+        client = app.test_client()
+        latencies = []
+        for _ in range(per_client):
+            start = time.perf_counter()
+            response = client.post('/api/v1/auth/login', json={'email': EMAIL, 'password': PASSWORD})
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.get_data(as_text=True)
+        return latencies
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        results = list(executor.map(client_loop, range(clients)))
+    elapsed = time.perf_counter() - start
+    return elapsed, [latency for latencies in results for latency in latencies]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pool-sizes', default='1,2,4,8', help='Comma-separated bcrypt pool sizes to compare')
+    parser.add_argument('--clients', type=int, default=16, help='Concurrent client threads')
+    parser.add_argument('--logins', type=int, default=400, help='Total logins per pool size')
+    parser.add_argument('--rounds', type=int, default=12, help='bcrypt work factor')
+    args = parser.parse_args()
+
+    print(f"bcrypt cost {args.rounds}, {args.clients} clients, {args.logins} logins per run, {os.cpu_count()} CPUs")
+    print(f"{'pool':>6} {'logins/s':>10} {'p50 ms':>10} {'p95 ms':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for pool_size in [int(size) for size in args.pool_sizes.split(',')]:
+            app = build_app(os.path.join(directory, f"login_{pool_size}.db"), args.rounds, pool_size)
+            elapsed, latencies = run(app, args.clients, args.logins)
+            quantiles = statistics.quantiles(latencies, n=100)
+            print(f"{pool_size:>6} {len(latencies) / elapsed:>10.1f} "
+                  f"{quantiles[49] * 1000:>10.1f} {quantiles[94] * 1000:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""Benchmark the serialization of a 10k-place list: dict building and JSON encoding
+
+Places are generated into a throwaway SQLite file and loaded once with
+their amenities, so every variant reads the same ORM instances. The script
+compares the former hand-written place dict against the compiled
+serializer, each encoded with the standard json module and with the fast
+encoder of app.encoding (orjson when installed).
+
+Usage:
+    python benchmarks/bench_serialization.py --places 10000 --repeat 20
+"""
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import TestingConfig
+from app import create_app, db
+from app.api.v1.serializers import serializers
+from app.database.generate_data import SyntheticDataGenerator
+from app.database.loader import BatchLoader
+from app.encoding import dumps, orjson
+from app.models.place import Place
+
+
+def hand_written_place(place):
+    """The place dict as endpoints built it before the serializer registry"""
+    return {
+        'id': place.id,
+        'title': place.title,
+        'description': place.description,
+        'price': place.price,
+        'latitude': place.latitude,
+        'longitude': place.longitude,
+        'owner_id': place.owner_id,
+        'amenities': [{'id': amenity.id, 'name': amenity.name} for amenity in place.amenities],
+        'review_count': place.review_count,
+        'average_rating': place.average_rating
+    }
+
+
+VARIANTS = {
+    'hand-written + json': lambda places: json.dumps({'places': [hand_written_place(place) for place in places]}),
+    'serializer + json': lambda places: json.dumps({'places': serializers.dump_many('place', places)}),
+    'hand-written + fast': lambda places: dumps({'places': [hand_written_place(place) for place in places]}),
+    'serializer + fast': lambda places: dumps({'places': serializers.dump_many('place', places)}),
+}
+
+
+def load_places(directory, place_count):
+    """Generate places into a SQLite file and return them loaded with their amenities"""
+    database_path = os.path.join(directory, 'serialization.db')
+    app = create_app(config_class=type('SerializationBenchConfig', (TestingConfig,), {
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{database_path}",
+    }))
+    with app.app_context():
+        db.create_all(bind_key=None)
+    connection = sqlite3.connect(database_path)
+    SyntheticDataGenerator(users=100, places=place_count, amenities=20, reviews_per_place=0,
+                           amenities_per_place=3).load(BatchLoader(connection, placeholder='?'))
+    connection.close()
+
+    context = app.app_context()
+    context.push()
+    places = db.session.scalars(db.select(Place)).all()
+    for place in places:
+        place.amenities  # Load the amenity lists before timing
+    return context, places
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--places', type=int, default=10000, help='Places in the serialized list')
+    parser.add_argument('--repeat', type=int, default=20, help='Timed runs per variant')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        context, places = load_places(directory, args.places)
+        reference = json.loads(VARIANTS['hand-written + json'](places))
+        encoder = f"orjson {orjson.__version__}" if orjson is not None else "json (orjson not installed)"
+        print(f"{len(places)} places, {args.repeat} runs per variant, fast encoder: {encoder}")
+        print(f"{'variant':<22} {'median ms':>10} {'best ms':>10} {'places/s':>12} {'speedup':>8}")
+        baseline = None
+        for name, serialize in VARIANTS.items():
+            assert json.loads(serialize(places)) == reference, name
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                serialize(places)
+                timings.append(time.perf_counter() - start)
+            median = statistics.median(timings)
+            baseline = baseline or median
+            print(f"{name:<22} {median * 1000:>10.1f} {min(timings) * 1000:>10.1f} "
+                  f"{len(places) / median:>12.0f} {baseline / median:>7.1f}x")
+        context.pop()
+
+
+if __name__ == '__main__':
+    main()
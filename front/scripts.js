@@ -118,9 +118,23 @@ function checkAuthentication() {
     }
 }
 
-async function fetchPlaces(token) {
+async function fetchPlaces(token, cursor = null) {
     try {
-        const response = await fetch('http://127.0.0.1:5000/api/v1/places/', {
+        const url = new URL('http://127.0.0.1:5000/api/v1/places/');
+        if (cursor) {
+            url.searchParams.set('cursor', cursor);
+        }
+
+        // Let the API filter by price instead of downloading every place
+        const priceFilter = document.getElementById('price-filter');
+        if (priceFilter && priceFilter.value && priceFilter.value !== 'all') {
+            url.searchParams.set('max_price', priceFilter.value);
+        }
+
+        // Only the fields shown on the cards: skips the amenity lookup on the server
+        url.searchParams.set('fields', 'id,title,price,description,review_count,average_rating');
+
+        const response = await fetch(url, {
             method: 'GET',
             headers: {
                 'Authorization': `Bearer ${token}`,
@@ -129,9 +143,10 @@ async function fetchPlaces(token) {
         });
 
         if (response.ok) {
-            const places = await response.json();
-            console.log('Places fetched:', places);
-            displayPlaces(places);
+            const data = await response.json();
+            console.log('Places fetched:', data.places);
+            displayPlaces(data.places, cursor !== null);
+            displayLoadMore(token, data.next_cursor);
         } else {
             console.error('Failed to fetch places:', response.status);
             // If token is invalid, clear it and show login
@@ -145,11 +160,13 @@ async function fetchPlaces(token) {
     }
 }
 
-function displayPlaces(places) {
+function displayPlaces(places, append = false) {
     const placesList = document.getElementById('places-list');
-    placesList.innerHTML = ''; // Clear current content
+    if (!append) {
+        placesList.innerHTML = ''; // Clear current content
+    }
 
-    if (!places || places.length === 0) {
+    if (!append && (!places || places.length === 0)) {
         placesList.innerHTML = '<p>No places available at the moment.</p>';
         return;
     }
@@ -162,6 +179,7 @@ function displayPlaces(places) {
         placeCard.innerHTML = `
             <h3>${place.title || 'Unnamed Place'}</h3>
             <p><strong>Price per night:</strong> $${place.price || 'N/A'}</p>
+            <p><strong>Rating:</strong> ${place.review_count ? `${'⭐'.repeat(Math.round(place.average_rating))} ${place.average_rating} (${place.review_count} reviews)` : 'No reviews yet'}</p>
             <p>${place.description ? place.description.substring(0, 100) + '...' : 'No description available'}</p>
             <button class="details-button" onclick="viewPlaceDetails('${place.id}')">View Details</button>
         `;
@@ -170,6 +188,29 @@ function displayPlaces(places) {
     });
 }
 
+function displayLoadMore(token, nextCursor) {
+    let loadMoreButton = document.getElementById('load-more');
+
+    if (!nextCursor) {
+        // Last page reached - nothing more to load
+        if (loadMoreButton) {
+            loadMoreButton.remove();
+        }
+        return;
+    }
+
+    if (!loadMoreButton) {
+        loadMoreButton = document.createElement('button');
+        loadMoreButton.id = 'load-more';
+        loadMoreButton.className = 'details-button';
+        loadMoreButton.textContent = 'Load more places';
+        document.getElementById('places-list').after(loadMoreButton);
+    }
+
+    // Fetch the next page using the cursor returned by the API
+    loadMoreButton.onclick = () => fetchPlaces(token, nextCursor);
+}
+
 function loadPriceFilter() {
     const priceFilter = document.getElementById('price-filter');
 
@@ -191,22 +232,12 @@ function loadPriceFilter() {
 }
 
 function filterPlacesByPrice(maxPrice) {
-    const placeCards = document.querySelectorAll('.place-card');
-
-    placeCards.forEach(card => {
-        const price = parseFloat(card.dataset.price);
+    const token = getCookie('token');
+    if (!token) return;
 
-        if (maxPrice === 'all') {
-            card.style.display = 'block';
-        } else {
-            const max = parseFloat(maxPrice);
-            if (price <= max) {
-                card.style.display = 'block';
-            } else {
-                card.style.display = 'none';
-            }
-        }
-    });
+    // Reload the first page; fetchPlaces sends the selected max price to the API
+    console.log('Filtering places by max price:', maxPrice);
+    fetchPlaces(token);
 }
 
 function viewPlaceDetails(placeId) {
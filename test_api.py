@@ -0,0 +1,1220 @@
+from contextlib import contextmanager
+from sqlalchemy import event
+from config import TestingConfig
+from app import create_app, db
+from app.services import facade
+from app.models.user import User
+from app.models.place import Place
+from app.models.review import Review
+from app.models.amenity import Amenity
+
+
+# Create a dedicated app backed by an in-memory SQLite database
+app = create_app(config_class='config.TestingConfig')
+client = app.test_client()
+
+
+def reset_database():
+    """Drop and recreate all tables for a clean test run
+
+    Only the default bind is reset: apps created by other tests may have
+    registered binds (e.g. a replica) this app does not configure.
+    """
+    with app.app_context():
+        db.drop_all(bind_key=None)
+        db.create_all(bind_key=None)
+
+
+def create_owner(email="owner@example.com"):
+    """Persist a user that can own places"""
+    owner = User(first_name="Olivia", last_name="Owner", email=email, password="password123")
+    db.session.add(owner)
+    db.session.commit()
+    return owner
+
+
+@contextmanager
+def count_queries_on(engine):
+    """Collect the SQL statements an engine executes inside the block"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+
+
+def count_queries():
+    """Collect the SQL statements executed by the test app inside the block"""
+    with app.app_context():
+        engine = db.engine
+    return count_queries_on(engine)
+
+
+def create_places(owner, count):
+    """Persist a number of places owned by the given user"""
+    places = [
+        Place(title=f"Place {i}", description="", price=50 + i, latitude=0, longitude=0, owner=owner)
+        for i in range(count)
+    ]
+    db.session.add_all(places)
+    db.session.commit()
+    return places
+
+
+# ==================== PAGINATION TESTS ====================
+
+
+def test_places_keyset_pagination():
+    """Walk the place list page by page using next_cursor"""
+    print("\n--- Testing Place Keyset Pagination ---")
+    reset_database()
+    with app.app_context():
+        owner = create_owner()
+        expected_ids = {place.id for place in create_places(owner, 7)}
+
+    seen_ids = []
+    cursor = None
+    pages = 0
+    while True:
+        query = {'limit': 3}
+        if cursor:
+            query['cursor'] = cursor
+        response = client.get('/api/v1/places/', query_string=query)
+        assert response.status_code == 200
+        body = response.get_json()
+        assert len(body['places']) <= 3
+        seen_ids.extend(place['id'] for place in body['places'])
+        pages += 1
+        cursor = body['next_cursor']
+        if not cursor:
+            break
+
+    assert pages == 3
+    assert len(seen_ids) == len(set(seen_ids))
+    assert set(seen_ids) == expected_ids
+    print("✓ Place keyset pagination test passed!")
+
+
+def test_places_pagination_rejects_bad_input():
+    """Reject out-of-range limits and malformed cursors"""
+    print("\n--- Testing Place Pagination Validation ---")
+    reset_database()
+
+    assert client.get('/api/v1/places/', query_string={'limit': 0}).status_code == 400
+    assert client.get('/api/v1/places/', query_string={'limit': 1000}).status_code == 400
+    assert client.get('/api/v1/places/', query_string={'cursor': 'not-a-cursor'}).status_code == 400
+    print("✓ Place pagination validation test passed!")
+
+
+# ==================== QUERY COUNT TESTS ====================
+
+
+def seed_catalog(place_count):
+    """Persist places with amenities, one review per place and every review on the first place"""
+    reset_database()
+    with app.app_context():
+        owner = create_owner()
+        wifi = Amenity(name="WiFi")
+        pool = Amenity(name="Pool")
+        places = create_places(owner, place_count)
+        for i, place in enumerate(places):
+            place.add_amenity(wifi)
+            place.add_amenity(pool)
+            reviewer = User(first_name="Rita", last_name="Reviewer", email=f"reviewer{i}@example.com", password="password123")
+            db.session.add(Review(text="Lovely", rating=4, place=place, user=reviewer))
+            if i > 0:
+                db.session.add(Review(text="Also lovely", rating=5, place=places[0], user=reviewer))
+        db.session.commit()
+        return places[0].id
+
+
+def endpoint_query_counts(place_count):
+    """Return the number of queries issued by each read endpoint"""
+    place_id = seed_catalog(place_count)
+    counts = {}
+    for url in ['/api/v1/places/?limit=100', f'/api/v1/places/{place_id}',
+                f'/api/v1/places/{place_id}/reviews', '/api/v1/reviews/',
+                '/api/v1/amenities/', '/api/v1/users/']:
+        with count_queries() as statements:
+            assert client.get(url).status_code == 200
+        counts[url.replace(place_id, '<place_id>')] = len(statements)
+    return counts
+
+
+def test_list_endpoints_query_count_is_constant():
+    """Serializing more rows must not issue more queries"""
+    print("\n--- Testing Query Counts Of Read Endpoints ---")
+    small = endpoint_query_counts(2)
+    large = endpoint_query_counts(20)
+
+    assert small == large, f"query count grew with rows: {small} -> {large}"
+    assert large['/api/v1/places/?limit=100'] <= 2
+    assert large['/api/v1/reviews/'] == 1
+    assert large['/api/v1/places/<place_id>'] == 2
+    print(f"✓ Query counts are constant: {large}")
+
+
+# ==================== GEOSPATIAL SEARCH TESTS ====================
+
+
+def create_located_places(owner, locations):
+    """Persist one place per (title, latitude, longitude) tuple"""
+    places = [
+        Place(title=title, description="", price=100, latitude=latitude, longitude=longitude, owner=owner)
+        for title, latitude, longitude in locations
+    ]
+    db.session.add_all(places)
+    db.session.commit()
+
+
+def test_places_radius_search():
+    """Find places around a point, nearest first, within the radius only"""
+    print("\n--- Testing Place Radius Search ---")
+    reset_database()
+    with app.app_context():
+        create_located_places(create_owner(), [
+            ("Tirana", 41.3275, 19.8187),
+            ("Durres", 41.3245, 19.4531),
+            ("Vlore", 40.4656, 19.4914),
+            ("Paris", 48.8566, 2.3522),
+        ])
+
+    response = client.get('/api/v1/places/search', query_string={'lat': 41.33, 'lng': 19.82, 'radius_km': 50})
+    assert response.status_code == 200
+    places = response.get_json()['places']
+    assert [place['title'] for place in places] == ["Tirana", "Durres"]
+    assert places[0]['distance_km'] < places[1]['distance_km'] <= 50
+
+    response = client.get('/api/v1/places/search', query_string={'lat': 41.33, 'lng': 19.82, 'radius_km': 0})
+    assert response.status_code == 400
+    print("✓ Place radius search test passed!")
+
+
+def test_places_bbox_search():
+    """Find places inside a bounding box, including one crossing the antimeridian"""
+    print("\n--- Testing Place Bounding Box Search ---")
+    reset_database()
+    with app.app_context():
+        create_located_places(create_owner(), [
+            ("Tirana", 41.3275, 19.8187),
+            ("Fiji", -17.7134, 178.0650),
+            ("Samoa", -13.7590, -172.1046),
+        ])
+
+    response = client.get('/api/v1/places/search', query_string={
+        'min_lat': 40, 'min_lng': 19, 'max_lat': 42, 'max_lng': 20})
+    assert response.status_code == 200
+    assert [place['title'] for place in response.get_json()['places']] == ["Tirana"]
+
+    response = client.get('/api/v1/places/search', query_string={
+        'min_lat': -20, 'min_lng': 175, 'max_lat': -10, 'max_lng': -170})
+    assert response.status_code == 200
+    assert sorted(place['title'] for place in response.get_json()['places']) == ["Fiji", "Samoa"]
+
+    assert client.get('/api/v1/places/search').status_code == 400
+    print("✓ Place bounding box search test passed!")
+
+
+# ==================== PRICE FILTER TESTS ====================
+
+
+def test_places_price_filter_and_sort():
+    """Filter the place list by price and walk it in price order"""
+    print("\n--- Testing Place Price Filter And Sort ---")
+    reset_database()
+    with app.app_context():
+        create_places(create_owner(), 10)  # prices 50..59
+
+    prices = []
+    cursor = None
+    while True:
+        query = {'min_price': 52, 'max_price': 57, 'sort': '-price', 'limit': 4}
+        if cursor:
+            query['cursor'] = cursor
+        body = client.get('/api/v1/places/', query_string=query).get_json()
+        prices.extend(place['price'] for place in body['places'])
+        cursor = body['next_cursor']
+        if not cursor:
+            break
+
+    assert prices == [57, 56, 55, 54, 53, 52]
+    assert client.get('/api/v1/places/', query_string={'sort': 'title'}).status_code == 400
+    assert client.get('/api/v1/places/', query_string={'min_price': 60, 'max_price': 10}).status_code == 400
+    print("✓ Place price filter and sort test passed!")
+
+
+# ==================== RATING AGGREGATE TESTS ====================
+
+
+def test_place_rating_aggregates():
+    """Keep review_count, rating_sum and the histogram in step with review writes"""
+    print("\n--- Testing Place Rating Aggregates ---")
+    reset_database()
+    with app.app_context():
+        owner = create_owner()
+        place_id = create_places(owner, 1)[0].id
+        reviewers = [create_owner(f"guest{i}@example.com").id for i in range(3)]
+
+        first = facade.create_review({'text': "Great", 'rating': 5, 'place_id': place_id, 'user_id': reviewers[0]})
+        facade.create_review({'text': "Fine", 'rating': 3, 'place_id': place_id, 'user_id': reviewers[1]})
+        last = facade.create_review({'text': "Poor", 'rating': 1, 'place_id': place_id, 'user_id': reviewers[2]})
+        facade.update_review(first.id, {'rating': 4})
+        facade.delete_review(last.id)
+
+        place = facade.get_place(place_id)
+        assert place.review_count == 2
+        assert place.rating_sum == 7
+        assert place.average_rating == 3.5
+        assert place.rating_histogram == {'1': 0, '2': 0, '3': 1, '4': 1, '5': 0}
+
+        place.review_count, place.rating_sum, place.rating_4_count = 0, 0, 9
+        db.session.commit()
+        assert facade.recompute_place_ratings(place_id) == 1
+        place = facade.get_place(place_id)
+        assert (place.review_count, place.rating_sum) == (2, 7)
+        assert place.rating_histogram['4'] == 1
+
+    body = client.get(f'/api/v1/places/{place_id}').get_json()
+    assert (body['review_count'], body['average_rating']) == (2, 3.5)
+    assert body['rating_histogram']['3'] == 1
+    print("✓ Place rating aggregates test passed!")
+
+
+# ==================== AMENITY TESTS ====================
+
+
+def test_amenity_names_are_unique_ignoring_case():
+    """Reject amenity names that only differ by case, on create and on rename"""
+    print("\n--- Testing Case-Insensitive Amenity Uniqueness ---")
+    reset_database()
+    with app.app_context():
+        facade.create_amenity({'name': "WiFi"})
+        parking = facade.create_amenity({'name': "Parking"})
+
+        for create in (lambda: facade.create_amenity({'name': "wifi"}),
+                       lambda: facade.update_amenity(parking.id, {'name': "WIFI"})):
+            try:
+                create()
+                raise AssertionError("duplicate amenity name was accepted")
+            except ValueError:
+                pass
+
+        assert facade.update_amenity(parking.id, {'name': "PARKING"}).name == "PARKING"
+        assert facade.amenity_repo.get_amenity_by_name("parking").id == parking.id
+    print("✓ Case-insensitive amenity uniqueness test passed!")
+
+
+# ==================== REVIEW TESTS ====================
+
+
+def test_duplicate_review_is_rejected_without_loading_reviews():
+    """Detect an existing review with one indexed query, however many reviews exist"""
+    print("\n--- Testing Duplicate Review Detection ---")
+    reset_database()
+    with app.app_context():
+        place_id = create_places(create_owner(), 1)[0].id
+        guests = [create_owner(f"guest{i}@example.com").id for i in range(6)]
+        for guest_id in guests[:5]:
+            facade.create_review({'text': "Nice", 'rating': 4, 'place_id': place_id, 'user_id': guest_id})
+
+        with count_queries() as statements:
+            try:
+                facade.create_review({'text': "Again", 'rating': 2, 'place_id': place_id, 'user_id': guests[0]})
+                raise AssertionError("duplicate review was accepted")
+            except ValueError as e:
+                assert str(e) == "You have already reviewed this place"
+        # User and place row lookups plus a single EXISTS probe,
+        # independent of the review count
+        assert len(statements) <= 3, statements
+        assert "EXISTS" in statements[-1]
+        assert not any("FROM review" in statement for statement in statements[:-1])
+    print("✓ Duplicate review detection test passed!")
+
+
+# ==================== RESPONSE CACHE TESTS ====================
+
+
+class CachedTestingConfig(TestingConfig):
+    RESPONSE_CACHE_ENABLED = True
+
+
+def test_response_cache_etag_and_invalidation():
+    """Serve repeated reads from the cache, answer 304 to known ETags and drop entries on writes"""
+    print("\n--- Testing Response Cache ---")
+    cached_app = create_app(config_class=CachedTestingConfig)
+    cached_client = cached_app.test_client()
+    with cached_app.app_context():
+        db.create_all()
+        facade.create_amenity({'name': "WiFi"})
+
+        first = cached_client.get('/api/v1/amenities/')
+        assert first.status_code == 200 and first.headers.get('ETag')
+        with count_queries_on(db.engine) as statements:
+            second = cached_client.get('/api/v1/amenities/')
+        assert second.get_data() == first.get_data()
+        assert statements == []
+
+        not_modified = cached_client.get('/api/v1/amenities/', headers={'If-None-Match': first.headers['ETag']})
+        assert not_modified.status_code == 304
+        assert not_modified.get_data() == b''
+
+        facade.create_amenity({'name': "Pool"})
+        refreshed = cached_client.get('/api/v1/amenities/', headers={'If-None-Match': first.headers['ETag']})
+        assert refreshed.status_code == 200
+        assert sorted(amenity['name'] for amenity in refreshed.get_json()) == ["Pool", "WiFi"]
+    print("✓ Response cache test passed!")
+
+
+# ==================== AUTHENTICATION TESTS ====================
+
+
+def test_login_rehashes_outdated_password_cost():
+    """Upgrade a stored hash to the configured bcrypt cost on successful login"""
+    print("\n--- Testing Password Rehash On Login ---")
+    import bcrypt as bcrypt_lib
+    reset_database()
+    with app.app_context():
+        user = create_owner("legacy@example.com")
+        user.password = bcrypt_lib.hashpw(b"password123", bcrypt_lib.gensalt(5)).decode('utf-8')
+        db.session.commit()
+
+    assert client.post('/api/v1/auth/login', json={'email': "legacy@example.com", 'password': "wrong"}).status_code == 401
+    response = client.post('/api/v1/auth/login', json={'email': "legacy@example.com", 'password': "password123"})
+    assert response.status_code == 200
+
+    with app.app_context():
+        stored = facade.get_user_by_email("legacy@example.com").password
+        assert stored.startswith(f"$2b${app.config['BCRYPT_LOG_ROUNDS']:02d}$")
+        assert facade.authenticate_user("legacy@example.com", "password123") is not None
+    print("✓ Password rehash on login test passed!")
+
+
+# ==================== BULK IMPORT TESTS ====================
+
+
+def admin_headers():
+    """Persist an admin user and return the Authorization header of its token"""
+    with app.app_context():
+        admin = User(first_name="Ada", last_name="Admin", email="admin@example.com", password="password123",
+                     is_admin=True)
+        db.session.add(admin)
+        db.session.commit()
+    response = client.post('/api/v1/auth/login', json={'email': "admin@example.com", 'password': "password123"})
+    return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+
+def test_bulk_import_reports_errors_per_row():
+    """Import valid rows in batches and report each invalid one by index"""
+    print("\n--- Testing Bulk Import ---")
+    import json
+    reset_database()
+    headers = admin_headers()
+    app.config['BULK_IMPORT_BATCH_SIZE'] = 2
+    try:
+        amenities = [{'name': "WiFi"}, {'name': "Pool"}, {'name': "wifi"}, {'name': ""}]
+        report = client.post('/api/v1/admin/import/amenities', json=amenities, headers=headers).get_json()
+        assert (report['imported'], report['failed']) == (2, 2)
+        assert [error['index'] for error in report['errors']] == [2, 3]
+
+        with app.app_context():
+            owner_id = create_owner().id
+            wifi_id = facade.amenity_repo.get_amenity_by_name("wifi").id
+        places = [
+            {'title': "Loft", 'price': 80, 'latitude': 48.85, 'longitude': 2.35, 'owner_id': owner_id,
+             'amenity_ids': [wifi_id]},
+            {'title': "Cabin", 'price': -5, 'latitude': 45.0, 'longitude': 6.0},
+            {'title': "Villa", 'price': 200, 'latitude': 43.7, 'longitude': 7.26, 'owner_id': "missing"},
+            {'title': "Studio", 'price': 40, 'latitude': 45.76, 'longitude': 4.83},
+        ]
+        report = client.post('/api/v1/admin/import/places', json=places, headers=headers).get_json()
+        assert (report['imported'], report['failed']) == (2, 2)
+        assert report['errors'] == [{'index': 1, 'error': "Price must be a positive value"},
+                                    {'index': 2, 'error': "Owner not found"}]
+
+        with app.app_context():
+            loft = facade.place_repo.get_by_attribute('title', "Loft")
+            assert [amenity.name for amenity in loft.amenities] == ["WiFi"]
+            assert loft.grid_cell == Place.grid_cell_for(48.85, 2.35)
+            loft_id = loft.id
+            guest_id = create_owner("guest@example.com").id
+        reviews = [
+            {'text': "Lovely", 'rating': 5, 'place_id': loft_id, 'user_id': guest_id},
+            {'text': "Again", 'rating': 1, 'place_id': loft_id, 'user_id': guest_id},
+            {'text': "Mine", 'rating': 4, 'place_id': loft_id, 'user_id': owner_id},
+        ]
+        body = "\n".join(json.dumps(review) for review in reviews) + "\nnot json\n"
+        report = client.post('/api/v1/admin/import/reviews', data=body, headers=headers,
+                             content_type='application/x-ndjson').get_json()
+        assert (report['imported'], report['failed']) == (1, 3)
+        assert [error['error'] for error in report['errors']] == [
+            "You have already reviewed this place", "You cannot review your own place", "Invalid JSON"]
+
+        with app.app_context():
+            loft = facade.get_place(loft_id)
+            assert (loft.review_count, loft.rating_sum, loft.rating_5_count) == (1, 5, 1)
+    finally:
+        app.config['BULK_IMPORT_BATCH_SIZE'] = TestingConfig.BULK_IMPORT_BATCH_SIZE
+
+    assert client.post('/api/v1/admin/import/users', json=[], headers=headers).status_code == 400
+    assert client.post('/api/v1/admin/import/places', json={}, headers=headers).status_code == 400
+    print("✓ Bulk import test passed!")
+
+
+# ==================== UNIT OF WORK TESTS ====================
+
+
+def test_facade_write_commits_once():
+    """Commit each facade write once, and nothing when it fails or its batch fails"""
+    print("\n--- Testing Unit Of Work ---")
+    from app.persistence.unit_of_work import after_commit, transaction
+    reset_database()
+    with app.app_context():
+        place_id = create_places(create_owner(), 1)[0].id
+        guest_id = create_owner("guest@example.com").id
+
+        commits = []
+
+        def record_commit(conn):
+            commits.append(conn)
+
+        event.listen(db.engine, 'commit', record_commit)
+        try:
+            facade.create_review({'text': "Great", 'rating': 5, 'place_id': place_id, 'user_id': guest_id})
+            assert len(commits) == 1
+
+            # A caller-defined batch commits once for all its facade calls, after-commit hooks included
+            called = []
+            with transaction():
+                facade.create_amenity({'name': "WiFi"})
+                facade.create_amenity({'name': "Pool"})
+                after_commit(called.append, "done")
+                assert called == []
+            assert len(commits) == 2 and called == ["done"]
+
+            # A failure anywhere in the batch rolls back every write of the batch
+            try:
+                with transaction():
+                    facade.create_amenity({'name': "Sauna"})
+                    after_commit(called.append, "rolled back")
+                    facade.create_amenity({'name': "wifi"})
+                raise AssertionError("duplicate amenity name was accepted")
+            except ValueError:
+                pass
+            assert len(commits) == 2 and called == ["done"]
+            assert facade.amenity_repo.get_amenity_by_name("Sauna") is None
+        finally:
+            event.remove(db.engine, 'commit', record_commit)
+    print("✓ Unit of work test passed!")
+
+
+# ==================== ENTITY CACHE TESTS ====================
+
+
+class EntityCachedTestingConfig(TestingConfig):
+    ENTITY_CACHE_ENABLED = True
+
+
+def test_entity_cache_serves_repeated_lookups():
+    """Serve primary-key lookups of later requests from the cache and evict rows on writes"""
+    print("\n--- Testing Entity Cache ---")
+    cached_app = create_app(config_class=EntityCachedTestingConfig)
+    with cached_app.app_context():
+        db.create_all()
+        engine = db.engine
+        owner_id = facade.create_user({'first_name': "Olivia", 'last_name': "Owner",
+                                       'email': "owner@example.com", 'password': "password123"}).id
+        guest_id = facade.create_user({'first_name': "Gus", 'last_name': "Guest",
+                                       'email': "guest@example.com", 'password': "password123"}).id
+        place_id = facade.create_place({'title': "Loft", 'price': 80, 'latitude': 48.85,
+                                        'longitude': 2.35, 'owner_id': owner_id}).id
+
+    # Each app context stands for a request with a fresh session
+    with cached_app.app_context():
+        assert facade.get_place(place_id).title == "Loft"
+    with cached_app.app_context(), count_queries_on(engine) as statements:
+        place = facade.get_place(place_id)
+        assert (place.title, place.owner_id, place.review_count) == ("Loft", owner_id, 0)
+        assert facade.get_place(place_id) is place
+    assert statements == []
+
+    with cached_app.app_context():
+        facade.update_place(place_id, {'title': "Attic"})
+        facade.create_review({'text': "Great", 'rating': 5, 'place_id': place_id, 'user_id': guest_id})
+    with cached_app.app_context():
+        place = facade.get_place(place_id)
+        assert (place.title, place.review_count, place.average_rating) == ("Attic", 1, 5.0)
+
+    with cached_app.app_context():
+        facade.create_user({'first_name': "Ada", 'last_name': "Admin", 'email': "admin@example.com",
+                            'password': "password123", 'is_admin': True})
+    cached_client = cached_app.test_client()
+    token = cached_client.post('/api/v1/auth/login', json={'email': "admin@example.com",
+                                                           'password': "password123"}).get_json()['access_token']
+    models = cached_client.get('/api/v1/admin/entity-cache',
+                               headers={'Authorization': f"Bearer {token}"}).get_json()['models']
+    assert 'User' not in models
+    stats = models['Place']
+    assert stats['size'] == 1
+    assert stats['hits'] >= 2 and stats['misses'] >= 2
+    print("✓ Entity cache test passed!")
+
+
+# ==================== CONNECTION POOL TESTS ====================
+
+
+def test_pool_metrics_report_saturation():
+    """Report checked-out connections, checkout waits and timeouts of a saturated pool"""
+    print("\n--- Testing Connection Pool Metrics ---")
+    import tempfile
+    from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+    from app.persistence.pool import InstrumentedQueuePool, pool_metrics
+
+    with tempfile.TemporaryDirectory() as directory:
+        pooled_app = create_app(config_class=type('PooledTestingConfig', (TestingConfig,), {
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{directory}/pool.db",
+            'SQLALCHEMY_ENGINE_OPTIONS': {'pool_size': 1, 'max_overflow': 0, 'pool_timeout': 1},
+        }))
+        with pooled_app.app_context():
+            engine = db.engine
+            assert isinstance(engine.pool, InstrumentedQueuePool)
+            held = engine.connect()
+            try:
+                engine.connect()
+                raise AssertionError("checkout succeeded on a saturated pool")
+            except PoolTimeoutError:
+                pass
+            metrics = pool_metrics(engine)
+            assert (metrics['size'], metrics['checked_out'], metrics['timeouts']) == (1, 1, 1)
+            assert metrics['wait_ms_max'] >= 1000
+            held.close()
+            assert pool_metrics(engine)['checked_out'] == 0
+            engine.dispose()
+
+        with pooled_app.app_context():
+            db.create_all()
+            facade.create_user({'first_name': "Ada", 'last_name': "Admin", 'email': "admin@example.com",
+                                'password': "password123", 'is_admin': True})
+        pooled_client = pooled_app.test_client()
+        token = pooled_client.post('/api/v1/auth/login', json={'email': "admin@example.com",
+                                                               'password': "password123"}).get_json()['access_token']
+        response = pooled_client.get('/api/v1/admin/db-pool', headers={'Authorization': f"Bearer {token}"})
+        assert response.status_code == 200
+        assert response.get_json()['pool_class'] == "InstrumentedQueuePool"
+        assert response.get_json()['checkouts'] >= 1
+        with pooled_app.app_context():
+            db.engine.dispose()
+    print("✓ Connection pool metrics test passed!")
+
+
+def test_reads_go_to_replica_outside_read_your_writes_window():
+    """Serve reads from the replica, except a client's own reads right after it wrote"""
+    print("\n--- Testing Read Replica Routing ---")
+    import shutil
+    import tempfile
+    from app.persistence.unit_of_work import transaction
+
+    with tempfile.TemporaryDirectory() as directory:
+        primary, replica = f"{directory}/primary.db", f"{directory}/replica.db"
+        replicated_app = create_app(config_class=type('ReplicatedTestingConfig', (TestingConfig,), {
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{primary}",
+            'SQLALCHEMY_BINDS': {'replica': f"sqlite:///{replica}"},
+            'REPLICA_BIND': 'replica',
+            'READ_YOUR_WRITES_SECONDS': 60,
+        }))
+        with replicated_app.app_context():
+            db.create_all()
+            db.metadata.create_all(db.engines['replica'])
+            facade.create_user({'first_name': "Olive", 'last_name': "Owner", 'email': "owner@example.com",
+                                'password': "password123"})
+        replicated_client = replicated_app.test_client()
+        token = replicated_client.post('/api/v1/auth/login', json={'email': "owner@example.com",
+                                                                   'password': "password123"}).get_json()['access_token']
+        headers = {'Authorization': f"Bearer {token}"}
+
+        response = replicated_client.post('/api/v1/places/', headers=headers, json={
+            'title': "Loft", 'description': "", 'price': 80.0, 'latitude': 48.85, 'longitude': 2.35})
+        assert response.status_code == 201
+        place_id = response.get_json()['id']
+
+        # The replica has not caught up: only the writer reads the new place
+        assert replicated_client.get(f'/api/v1/places/{place_id}', headers=headers).status_code == 200
+        assert replicated_client.get(f'/api/v1/places/{place_id}').status_code == 404
+
+        with replicated_app.app_context():
+            db.engines['replica'].dispose()
+            shutil.copyfile(primary, replica)
+        assert replicated_client.get(f'/api/v1/places/{place_id}').status_code == 200
+
+        # Once the window is over, the writer reads from the replica as well
+        replicated_app.config['READ_YOUR_WRITES_SECONDS'] = 0
+        response = replicated_client.post('/api/v1/places/', headers=headers, json={
+            'title': "Studio", 'description': "", 'price': 50.0, 'latitude': 48.86, 'longitude': 2.34})
+        assert response.status_code == 201
+        assert replicated_client.get(f"/api/v1/places/{response.get_json()['id']}", headers=headers).status_code == 404
+        with replicated_app.app_context():
+            assert facade.get_place(response.get_json()['id']) is None
+            # Reads made by a unit of work stay on the primary
+            with transaction():
+                assert facade.get_place(response.get_json()['id']) is not None
+            db.engine.dispose()
+            db.engines['replica'].dispose()
+    print("✓ Read replica routing test passed!")
+
+
+def test_request_profiling_reports_queries_and_slow_requests(caplog):
+    """Send per-request query counts in Server-Timing and log slow requests with their facade methods"""
+    print("\n--- Testing Request Profiling ---")
+    with app.app_context():
+        reset_database()
+        create_places(create_owner(), 3)
+        with count_queries() as statements:
+            client.get('/api/v1/places/')
+        expected = len(statements)
+
+    app.config['SLOW_REQUEST_MS'] = 0
+    try:
+        with caplog.at_level('WARNING', logger='app.requests'):
+            response = client.get('/api/v1/places/')
+    finally:
+        app.config['SLOW_REQUEST_MS'] = TestingConfig.SLOW_REQUEST_MS
+    assert response.status_code == 200
+    server_timing = response.headers['Server-Timing']
+    assert server_timing.startswith(f'db;desc="{expected} queries";dur=')
+    assert ', total;dur=' in server_timing
+
+    [record] = [record for record in caplog.records if record.name == 'app.requests']
+    assert "GET /api/v1/places/" in record.getMessage()
+    assert f"HBnBFacade.get_places_page ({expected} queries" in record.getMessage()
+    print("✓ Request profiling test passed!")
+
+
+def test_batch_loader_and_synthetic_data():
+    """Stream SQL with semicolons in strings, merge INSERTs, and load consistent synthetic rows"""
+    print("\n--- Testing Batch Loader and Synthetic Data ---")
+    import io
+    import sqlite3
+    import tempfile
+    from app.database.loader import BatchLoader
+    from app.database.generate_data import SyntheticDataGenerator
+
+    with tempfile.TemporaryDirectory() as directory:
+        seeded_app = create_app(config_class=type('SeededTestingConfig', (TestingConfig,), {
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{directory}/seed.db",
+        }))
+        with seeded_app.app_context():
+            db.create_all(bind_key=None)
+            db.engine.dispose()
+
+        connection = sqlite3.connect(f"{directory}/seed.db")
+        loader = BatchLoader(connection, batch_rows=2, placeholder='?')
+        script = io.StringIO(
+            "-- Amenities; one row per statement\n"
+            "INSERT INTO amenity (id, name, name_key, created_at, updated_at) VALUES "
+            "('a1', 'Bed; Breakfast', 'bed; breakfast', '2024-01-01', '2024-01-01');\n"
+            "INSERT INTO amenity (id, name, name_key, created_at, updated_at) VALUES "
+            "('a2', 'Chef''s kitchen', 'chef''s kitchen', '2024-01-01', '2024-01-01');\n"
+            "/* ; */ INSERT INTO amenity (id, name, name_key, created_at, updated_at) VALUES "
+            "('a3', 'Sauna', 'sauna', '2024-01-01', '2024-01-01');\n"
+        )
+        assert loader.execute_sql(script) == 3
+        assert loader.statements == 2  # Two merged INSERTs of at most batch_rows statements
+        csv_rows = io.StringIO("id,name,name_key,created_at,updated_at\n"
+                               "a4,\"Pool, heated\",\"pool, heated\",2024-01-01,2024-01-01\n")
+        assert loader.load_csv('amenity', csv_rows) == 1
+
+        generator = SyntheticDataGenerator(users=20, places=50, amenities=5, reviews_per_place=3, seed=7)
+        counts = generator.load(BatchLoader(connection, batch_rows=16, commit_rows=40, placeholder='?'))
+        assert counts == {'user': 20, 'amenity': 5, 'place': 50, 'review': 150, 'place_amenity': 150}
+        connection.close()
+
+        with seeded_app.app_context():
+            names = {amenity.name for amenity in facade.get_all_amenities()}
+            assert {"Bed; Breakfast", "Chef's kitchen", "Pool, heated", "Sauna"} <= names
+            for place in facade.get_all_places():
+                reviews = facade.get_reviews_by_place(place.id)
+                assert place.review_count == len(reviews) == 3
+                assert place.rating_sum == sum(review.rating for review in reviews)
+                assert all(review.user_id != place.owner_id for review in reviews)
+                assert place.grid_cell == Place.grid_cell_for(place.latitude, place.longitude)
+            db.engine.dispose()
+    print("✓ Batch loader and synthetic data test passed!")
+
+
+def test_serializers_read_loaded_and_expired_instances_alike(monkeypatch):
+    """Serialize from the instance state, falling back to attribute loading for expired rows"""
+    print("\n--- Testing Compiled Serializers ---")
+    from app.api.v1.serializers import serializers
+
+    with app.app_context():
+        reset_database()
+        place = create_places(create_owner(), 1)[0]
+        sauna = facade.create_amenity({'name': "Sauna"})
+        place.amenities.append(sauna)
+        db.session.commit()
+        place = db.session.get(Place, place.id)
+
+        loaded = serializers.dump('place_detail', place)
+        assert loaded['amenities'] == [{'id': place.amenities[0].id, 'name': "Sauna"}]
+        assert loaded['owner']['first_name'] == place.owner.first_name
+        assert loaded['rating_histogram'] == {'1': 0, '2': 0, '3': 0, '4': 0, '5': 0}
+
+        db.session.expire_all()
+        assert serializers.dump('place_detail', place) == loaded
+
+    response = client.get(f"/api/v1/places/{place.id}")
+    assert response.get_json() == {**loaded, 'reviews': [], 'reviews_next_cursor': None}
+
+    # Field subsets are compiled once whatever the key order, and only the recent ones are kept
+    from app.api.v1 import serializers as serializers_module
+    detail = serializers['place_detail']
+    assert detail.only(['title', 'price']) is detail.only(['price', 'title', 'price'])
+    monkeypatch.setattr(serializers_module, 'MAX_SUBSETS', 2)
+    title = detail.only(['title'])
+    detail.only(['price'])
+    assert detail.only(['title']) is title
+    detail.only(['latitude'])
+    assert list(detail._subsets) == [('title',), ('latitude',)]
+    print("✓ Compiled serializers test passed!")
+
+
+# ==================== SPARSE FIELDSET TESTS ====================
+
+
+def test_sparse_fieldsets_load_only_requested_columns():
+    """fields= trims the payload and the columns and relationships loaded"""
+    print("\n--- Testing Sparse Fieldsets ---")
+    place_id = seed_catalog(3)
+
+    with count_queries() as statements:
+        response = client.get('/api/v1/places/?fields=id,title,price&sort=price')
+    assert response.status_code == 200
+    places = response.get_json()['places']
+    assert [sorted(place) for place in places] == [['id', 'price', 'title']] * 3
+    assert len(statements) == 1, statements
+    assert "description" not in statements[0] and "amenity" not in statements[0]
+
+    full = client.get(f'/api/v1/places/{place_id}').get_json()
+    with count_queries() as statements:
+        response = client.get(f'/api/v1/places/{place_id}?fields=title,owner,average_rating')
+    assert response.get_json() == {key: full[key] for key in ('title', 'owner', 'average_rating')}
+    assert len(statements) == 1, statements  # The place joined with its owner's three columns
+    assert "FROM review" not in statements[0] and "amenity" not in statements[0]
+    assert "email" not in statements[0] and "password" not in statements[0]
+
+    response = client.get(f'/api/v1/places/{place_id}?fields=reviews')
+    assert response.get_json() == {'reviews': full['reviews'], 'reviews_next_cursor': None}
+
+    response = client.get('/api/v1/users/?fields=email')
+    assert all(list(user) == ['email'] for user in response.get_json())
+
+    response = client.get('/api/v1/places/?fields=id,secret')
+    assert response.status_code == 400
+    assert "secret" in response.get_json()['error']
+    print("✓ Sparse fieldsets test passed!")
+
+
+# ==================== FULL-TEXT SEARCH TESTS ====================
+
+
+def test_places_text_search_is_ranked_paginated_and_kept_in_sync():
+    """Search titles, descriptions and reviews through the FTS index as places change"""
+    print("\n--- Testing Full-Text Search ---")
+    reset_database()
+    with app.app_context():
+        owner = create_owner()
+        guest = User(first_name="Gus", last_name="Guest", email="guest@example.com", password="password123")
+        db.session.add(guest)
+        places = [Place(title=title, description=description, price=80, latitude=0, longitude=0, owner=owner)
+                  for title, description in [
+                      ("Beach House", "Steps from the beach"),
+                      ("Mountain Cabin", "Quiet forest retreat"),
+                      ("City Loft", "Close to the beach bars"),
+                      ("Garden Studio", "Green and calm"),
+                  ]]
+        db.session.add_all(places)
+        db.session.commit()
+        ids = [place.id for place in places]
+        facade.create_review({'text': "Great view of the beach", 'rating': 5,
+                              'user_id': guest.id, 'place_id': ids[3]})
+
+    def search(query, **params):
+        response = client.get('/api/v1/places/search', query_string={'q': query, **params})
+        assert response.status_code == 200, response.get_json()
+        return response.get_json()
+
+    results = search("beach")['places']
+    assert [place['id'] for place in results][:1] == [ids[0]]  # Title and description match
+    assert {place['id'] for place in results} == {ids[0], ids[2], ids[3]}
+    assert all(results[i]['relevance'] >= results[i + 1]['relevance'] for i in range(len(results) - 1))
+
+    first = search("beach", limit=2, fields='id')
+    second = search("beach", limit=2, cursor=first['next_cursor'], fields='id')
+    assert [place['id'] for place in first['places'] + second['places']] == [place['id'] for place in results]
+    assert second['next_cursor'] is None
+
+    # Operators of the FTS query syntax are searched as plain words
+    assert search('quiet" OR NEAR(')['places'][0]['id'] == ids[1]
+
+    with app.app_context():
+        facade.update_place(ids[1], {'title': "Beach Cabin"})
+        facade.delete_place(ids[2])
+    assert {place['id'] for place in search("beach")['places']} == {ids[0], ids[1], ids[3]}
+    assert search("forest retreat")['places'][0]['id'] == ids[1]
+
+    assert client.get('/api/v1/places/search?q=%20!').status_code == 400
+    with app.app_context():
+        assert facade.rebuild_search_index() == ['place', 'review']
+    assert len(search("beach")['places']) == 3
+    print("✓ Full-text search test passed!")
+
+
+# ==================== AMENITY FILTER TESTS ====================
+
+
+class AmenityIndexedTestingConfig(TestingConfig):
+    AMENITY_INDEX_ENABLED = True
+
+
+def test_places_amenity_filter_uses_bitmap_index(monkeypatch):
+    """Filter places having all amenities, through the bitmap index and through SQL alike"""
+    print("\n--- Testing Amenity Filter ---")
+    import app.persistence.place_repository as place_repository
+
+    indexed_app = create_app(config_class=AmenityIndexedTestingConfig)
+    indexed_client = indexed_app.test_client()
+    with indexed_app.app_context():
+        db.create_all(bind_key=None)
+        owner = create_owner()
+        wifi, pool, parking = (Amenity(name=name) for name in ("WiFi", "Pool", "Parking"))
+        places = create_places(owner, 12)
+        for i, place in enumerate(places):
+            for amenity, divisor in ((wifi, 1), (pool, 2), (parking, 3)):
+                if i % divisor == 0:
+                    place.add_amenity(amenity)
+        db.session.commit()
+        ids = [place.id for place in places]
+        wifi_id, pool_id, parking_id = wifi.id, pool.id, parking.id
+
+    def filtered(test_client, amenities, **params):
+        listed, cursor = [], None
+        while True:
+            query = {'amenities': amenities, 'limit': 2, 'sort': 'price', 'fields': 'id', **params}
+            if cursor:
+                query['cursor'] = cursor
+            response = test_client.get('/api/v1/places/', query_string=query)
+            assert response.status_code == 200, response.get_json()
+            listed += [place['id'] for place in response.get_json()['places']]
+            cursor = response.get_json()['next_cursor']
+            if cursor is None:
+                return listed
+
+    every_sixth = [ids[i] for i in range(0, 12, 6)]
+    assert filtered(indexed_client, f"{pool_id},{parking_id}") == every_sixth
+    monkeypatch.setattr(place_repository, 'MAX_FILTER_IDS', 0)  # Walk the list instead of an id list
+    assert filtered(indexed_client, f"{pool_id},{parking_id}") == every_sixth
+    assert filtered(indexed_client, f"{wifi_id},{pool_id}", max_price=56) == [ids[0], ids[2], ids[4], ids[6]]
+
+    # Links are applied to the index as their transaction commits
+    with indexed_app.app_context():
+        facade.add_amenity_to_place(facade.get_place(ids[1]), facade.get_amenity(parking_id))
+        facade.add_amenity_to_place(facade.get_place(ids[1]), facade.get_amenity(pool_id))
+        facade.delete_place(ids[6])
+    assert filtered(indexed_client, f"{pool_id},{parking_id}") == [ids[0], ids[1]]
+
+    # Without the index, SQL selects the same places
+    indexed_app.config['AMENITY_INDEX_ENABLED'] = False
+    assert filtered(indexed_client, f"{pool_id},{parking_id}") == [ids[0], ids[1]]
+
+    response = indexed_client.get('/api/v1/places/?amenities=missing')
+    assert response.status_code == 400 and "missing" in response.get_json()['error']
+    print("✓ Amenity filter test passed!")
+
+
+def test_amenity_index_builds_once_under_concurrent_first_use():
+    """Requests arriving during the first build filter with SQL instead of building again"""
+    print("\n--- Testing Amenity Index Cold Start ---")
+    import tempfile
+    import threading
+    import time
+
+    with tempfile.TemporaryDirectory() as directory:
+        cold_app = create_app(config_class=type('ColdIndexTestingConfig', (AmenityIndexedTestingConfig,), {
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{directory}/hbnb.db",
+        }))
+        with cold_app.app_context():
+            db.create_all(bind_key=None)
+            wifi = Amenity(name="WiFi")
+            places = create_places(create_owner(), 6)
+            for place in places[::2]:
+                place.add_amenity(wifi)
+            db.session.commit()
+            wifi_id, expected = wifi.id, sorted(place.id for place in places[::2])
+            engine = db.engine
+
+        builds = []
+
+        def slow_build(conn, cursor, statement, parameters, context, executemany):
+            if "FROM place_amenity" in statement and "GROUP BY" not in statement:
+                builds.append(statement)
+                time.sleep(0.3)  # Keep the build running while the other requests arrive
+
+        listed, start = [], threading.Barrier(8)
+
+        def request_places():
+            start.wait()
+            response = cold_app.test_client().get(f'/api/v1/places/?amenities={wifi_id}&fields=id')
+            listed.append(sorted(place['id'] for place in response.get_json()['places']))
+
+        event.listen(engine, 'before_cursor_execute', slow_build)
+        try:
+            threads = [threading.Thread(target=request_places) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            event.remove(engine, 'before_cursor_execute', slow_build)
+            engine.dispose()
+        assert len(builds) == 1, builds
+        assert listed == [expected] * 8
+    print("✓ Amenity index cold start test passed!")
+
+
+# ==================== PLACE DETAIL TESTS ====================
+
+
+def test_place_detail_takes_two_statements():
+    """The place with owner and amenities, then the latest reviews with their authors"""
+    print("\n--- Testing Place Detail Round Trips ---")
+    place_id = seed_catalog(30)  # 29 reviews of the first place, each by another author
+    page_size = app.config['DEFAULT_PAGE_SIZE']
+
+    with count_queries() as statements:
+        response = client.get(f'/api/v1/places/{place_id}')
+    assert response.status_code == 200
+    assert len(statements) == 2, statements
+    place = response.get_json()
+    assert place['owner']['first_name'] == "Olivia"
+    assert sorted(amenity['name'] for amenity in place['amenities']) == ["Pool", "WiFi"]
+    assert len(place['reviews']) == page_size
+    assert all(review['user']['last_name'] == "Reviewer" for review in place['reviews'])
+    created = [review['created_at'] for review in place['reviews']]
+    assert created == sorted(created, reverse=True)  # Most recent first
+
+    with count_queries() as statements:
+        assert client.get(f'/api/v1/places/{place_id}?fields=title,owner').status_code == 200
+    assert len(statements) == 1, statements
+    with count_queries() as statements:
+        assert client.get('/api/v1/places/missing').status_code == 404
+    assert len(statements) == 1, statements
+    print("✓ Place detail round trips test passed!")
+
+
+# ==================== PLACE REVIEW PAGINATION TESTS ====================
+
+
+def test_place_reviews_keyset_pagination_sort_and_rating_filter():
+    """Walk a place's reviews page by page in every order, optionally for one rating"""
+    print("\n--- Testing Place Review Pagination ---")
+    reset_database()
+    with app.app_context():
+        owner = create_owner()
+        place = create_places(owner, 1)[0]
+        for i in range(25):
+            reviewer = User(first_name="Rita", last_name="Reviewer", email=f"reviewer{i}@example.com",
+                            password="password123")
+            db.session.add(Review(text=f"Review {i}", rating=i % 5 + 1, place=place, user=reviewer))
+            db.session.commit()  # One created_at per review
+        place_id = place.id
+
+    def walk(**params):
+        listed, cursor = [], None
+        while True:
+            query = {'limit': 7, **params, **({'cursor': cursor} if cursor else {})}
+            response = client.get(f'/api/v1/places/{place_id}/reviews', query_string=query)
+            assert response.status_code == 200, response.get_json()
+            listed += [(review['rating'], review['created_at'], review['text']) for review in response.get_json()['reviews']]
+            cursor = response.get_json()['next_cursor']
+            if cursor is None:
+                return listed
+
+    newest_first = walk()
+    assert [text for _, _, text in newest_first] == [f"Review {i}" for i in reversed(range(25))]
+    assert walk(sort='created_at') == newest_first[::-1]
+    assert walk(sort='-rating') == sorted(newest_first, reverse=True)
+    assert walk(sort='rating') == sorted(newest_first)
+    assert walk(rating=5) == [review for review in newest_first if review[0] == 5]
+    assert walk(rating=2, sort='created_at') == [review for review in newest_first if review[0] == 2][::-1]
+    sparse = client.get(f'/api/v1/places/{place_id}/reviews?fields=text&sort=-rating&limit=2').get_json()
+    assert sparse['reviews'] == [{'text': text} for _, _, text in sorted(newest_first, reverse=True)[:2]]
+
+    detail = client.get(f'/api/v1/places/{place_id}').get_json()
+    assert [review['text'] for review in detail['reviews']] == \
+        [text for _, _, text in newest_first[:app.config['DEFAULT_PAGE_SIZE']]]
+    page = client.get(f'/api/v1/places/{place_id}/reviews',
+                      query_string={'cursor': detail['reviews_next_cursor']}).get_json()
+    assert [review['text'] for review in page['reviews']] == \
+        [text for _, _, text in newest_first[app.config['DEFAULT_PAGE_SIZE']:]]
+
+    assert client.get(f'/api/v1/places/{place_id}/reviews?rating=6').status_code == 400
+    assert client.get(f'/api/v1/places/{place_id}/reviews?sort=text').status_code == 400
+    assert client.get('/api/v1/places/missing/reviews').status_code == 404
+    print("✓ Place review pagination test passed!")
+
+
+# ==================== WRITE-ONLY COLLECTION TESTS ====================
+
+
+def test_review_writes_never_load_the_place_reviews():
+    """Add, delete and cascade reviews without loading a place's review collection"""
+    print("\n--- Testing Write-Only Review Collections ---")
+    place_id = seed_catalog(30)  # 30 reviews of the first place
+    with app.app_context():
+        guest_id = create_owner("guest@example.com").id
+        review_count = facade.get_place(place_id).review_count
+        with count_queries() as statements:
+            review = facade.create_review({'text': "Late", 'rating': 3, 'place_id': place_id, 'user_id': guest_id})
+        review_id = review.id
+        loads = [statement for statement in statements
+                 if statement.lstrip().startswith("SELECT") and "FROM review" in statement]
+        assert all("EXISTS" in statement for statement in loads), loads
+
+        with count_queries() as statements:
+            assert facade.delete_review(review_id)
+        assert not any("WHERE ? = review.place_id" in statement or "WHERE ? = review.user_id" in statement
+                       for statement in statements), statements
+        assert facade.get_place(place_id).review_count == review_count
+
+        owner_id = facade.get_place(place_id).owner_id
+        assert facade.get_review(review_id) is None
+        assert len(facade.review_repo.get_reviews_by_place(place_id)) == 30
+        assert facade.delete_place(place_id)
+        assert facade.review_repo.get_reviews_by_place(place_id) == []
+        assert facade.get_user(owner_id) is not None
+    assert client.get(f'/api/v1/places/{place_id}').status_code == 404
+    print("✓ Write-only review collections test passed!")
+
+
+def test_review_rating_changes_use_the_current_row():
+    """Compute rating deltas from the stored review, not from a stale copy in the session"""
+    print("\n--- Testing Review Rating Deltas ---")
+    from sqlalchemy import update
+    reset_database()
+    with app.app_context():
+        place_id = create_places(create_owner(), 1)[0].id
+        guest_id = create_owner("guest@example.com").id
+        review_id = facade.create_review({'text': "Great", 'rating': 5, 'place_id': place_id,
+                                          'user_id': guest_id}).id
+
+    def rerate_behind_the_session(old, new):
+        """Load the review, then change its rating as another writer would; return the stale copy"""
+        review = facade.get_review(review_id)
+        assert review.rating == old
+        db.session.execute(update(Review).where(Review.id == review_id).values(rating=new),
+                           execution_options={'synchronize_session': False})
+        db.session.execute(update(Place).where(Place.id == place_id).values(
+            rating_sum=Place.rating_sum - old + new,
+            **{f'rating_{old}_count': 0, f'rating_{new}_count': 1}))
+        return review
+
+    with app.app_context():
+        stale = rerate_behind_the_session(5, 3)
+        assert facade.update_review(review_id, {'rating': 4}) is stale
+    with app.app_context():
+        place = facade.get_place(place_id)
+        assert (place.review_count, place.rating_sum) == (1, 4)
+        assert place.rating_histogram == {'1': 0, '2': 0, '3': 0, '4': 1, '5': 0}
+
+    with app.app_context():
+        stale = rerate_behind_the_session(4, 2)
+        assert facade.delete_review(review_id) and stale.rating == 2
+    with app.app_context():
+        place = facade.get_place(place_id)
+        assert (place.review_count, place.rating_sum) == (0, 0)
+        assert set(place.rating_histogram.values()) == {0}
+    print("✓ Review rating deltas test passed!")
+
+
+# ==================== ASGI MODE TESTS ====================
+
+
+def test_asgi_mode_serves_reads_on_the_async_engine():
+    """Serve concurrent read requests through the async driver and the others through the threaded one"""
+    print("\n--- Testing ASGI Async Mode ---")
+    import asyncio
+    import json
+    import tempfile
+    import pytest
+    pytest.importorskip('aiosqlite')
+    pytest.importorskip('greenlet')
+    from sqlalchemy.engine import Engine
+    from app.asgi import AsyncReadApp
+
+    with tempfile.TemporaryDirectory() as directory:
+        async_app = create_app(config_class=type('AsyncTestingConfig', (TestingConfig,), {
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{directory}/hbnb.db",
+            'AMENITY_INDEX_ENABLED': True,
+        }))
+        with async_app.app_context():
+            db.create_all(bind_key=None)
+            owner = facade.create_user({'first_name': "Olive", 'last_name': "Owner", 'email': "owner@example.com",
+                                        'password': "password123"})
+            guest = facade.create_user({'first_name': "Gus", 'last_name': "Guest", 'email': "guest@example.com",
+                                        'password': "password123"})
+            wifi = facade.create_amenity({'name': "WiFi"})
+            place = facade.create_place({'title': "Loft", 'description': "", 'price': 80.0, 'latitude': 48.85,
+                                         'longitude': 2.35, 'owner_id': owner.id, 'amenities': [wifi.id]})
+            review = facade.create_review({'text': "Great", 'rating': 5, 'place_id': place.id, 'user_id': guest.id})
+            paths = ['/api/v1/places/', f'/api/v1/places/?amenities={wifi.id}', f'/api/v1/places/{place.id}',
+                     f'/api/v1/places/{place.id}/reviews', f'/api/v1/reviews/{review.id}', '/api/v1/amenities/',
+                     '/api/v1/places/missing']
+        expected = {path: (response.status_code, response.get_json())
+                    for path in paths for response in [async_app.test_client().get(path)]}
+        asgi_app = AsyncReadApp(async_app)
+
+        async def get(path):
+            path, _, query = path.partition('?')
+            messages = []
+
+            async def receive():
+                return {'type': 'http.request', 'body': b''}
+
+            async def send(message):
+                messages.append(message)
+
+            await asgi_app({'type': 'http', 'method': 'GET', 'path': path, 'query_string': query.encode(),
+                            'headers': [(b'host', b'localhost')], 'http_version': '1.1'}, receive, send)
+            return messages[0]['status'], json.loads(messages[1]['body'])
+
+        async def serve(requested):
+            return await asyncio.gather(*(get(path) for path in requested))
+
+        drivers = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            drivers.append(conn.dialect.driver)
+
+        event.listen(Engine, 'before_cursor_execute', record)
+        try:
+            loop = asyncio.new_event_loop()
+            responses = loop.run_until_complete(serve(paths * 5))
+            assert dict(zip(paths, responses[:len(paths)])) == expected
+            assert responses == responses[:len(paths)] * 5
+            assert drivers and set(drivers) == {'aiosqlite'}, set(drivers)
+
+            del drivers[:]
+            status, users = loop.run_until_complete(get('/api/v1/users/'))
+            assert status == 200 and {user['email'] for user in users} == {"owner@example.com", "guest@example.com"}
+            assert set(drivers) == {'pysqlite'}
+            loop.run_until_complete(asgi_app.dispose())
+            loop.close()
+        finally:
+            event.remove(Engine, 'before_cursor_execute', record)
+            with async_app.app_context():
+                db.engine.dispose()
+    print("✓ ASGI async mode test passed!")
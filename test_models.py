@@ -5,6 +5,7 @@ from app.models.review import Review
 from app.models.amenity import Amenity
 import time
 from datetime import datetime
+from sqlalchemy import inspect
 
 
 # Create app and push context for all tests
@@ -232,7 +233,7 @@ def test_place_creation():
         assert place.latitude == 37.7749
         assert place.longitude == -122.4194
         assert place.owner == owner
-        assert len(place.reviews) == 0
+        assert not inspect(place).attrs.reviews.history.added  # Write-only: no review pending
         assert len(place.amenities) == 0
         print("✓ Place creation test passed!")
     except AssertionError as e:
@@ -370,8 +371,7 @@ def test_review_creation():
         assert review.rating == 5
         assert review.place == place
         assert review.user == reviewer
-        if hasattr(place, 'reviews') and place.reviews is not None:
-            assert len(place.reviews) >= 1
+        assert review in inspect(place).attrs.reviews.history.added
         print("✓ Review creation and relationship test passed!")
     except AssertionError as e:
         print(f"✗ Review creation test failed: {e}")
@@ -461,10 +461,8 @@ def test_multiple_reviews_same_place():
             review = Review(text=f"Review {i+1}", rating=i+3, place=place, user=reviewer)
             place.add_review(review)
         
-        if hasattr(place, 'reviews') and place.reviews is not None:
-            print(f"✓ Multiple reviews for same place test passed! ({len(place.reviews)} reviews)")
-        else:
-            print("✓ Multiple reviews created successfully!")
+        pending = set(inspect(place).attrs.reviews.history.added)
+        print(f"✓ Multiple reviews for same place test passed! ({len(pending)} reviews)")
     except AssertionError as e:
         print(f"✗ Multiple reviews test failed: {e}")
     except Exception as e: